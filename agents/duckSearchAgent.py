@@ -1,4 +1,10 @@
+import os
+import re
 import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
 from pydantic import BaseModel, ValidationError, HttpUrl
 from duckduckgo_search import DDGS
 
@@ -33,6 +39,29 @@ class DuckDuckGoSearch:
         self.query = query
         self.max_results = max_results
 
+    def search(self) -> list:
+        """
+        Perform the search using DuckDuckGo and return the validated results.
+
+        :return: A list of dictionaries with the 'title' and 'link' of each result.
+        :raises Exception: Any request-related error raised by DuckDuckGo.
+        """
+        results = DDGS().text(self.query, max_results=self.max_results)
+
+        # Extract and validate results using Pydantic
+        validated_results = []
+        for result in results:
+            title = result.get('title', 'No title')
+            link = result.get('href', '')
+
+            # Validate each result
+            try:
+                validated_result = DuckDuckGoSearchResult(title=title, link=link)
+                validated_results.append(validated_result.to_dict())  # Use `to_dict` to serialize correctly
+            except ValidationError as ve:
+                print(f"Skipping invalid result: {ve}")
+        return validated_results
+
     def perform_search(self) -> str:
         """
         Perform the search using DuckDuckGo and return the validated results as a JSON object.
@@ -41,28 +70,171 @@ class DuckDuckGoSearch:
         :return: A JSON object containing validated search results with titles and corresponding links.
         """
         try:
-            results = DDGS().text(self.query, max_results=self.max_results)
-            
-            # Extract and validate results using Pydantic
-            validated_results = []
-            for result in results:
-                title = result.get('title', 'No title')
-                link = result.get('href', '')
-                
-                # Validate each result
-                try:
-                    validated_result = DuckDuckGoSearchResult(title=title, link=link)
-                    validated_results.append(validated_result.to_dict())  # Use `to_dict` to serialize correctly
-                except ValidationError as ve:
-                    print(f"Skipping invalid result: {ve}")
-
             # Return the results as a JSON object
-            return json.dumps(validated_results, indent=4)
+            return json.dumps(self.search(), indent=4)
 
         except Exception as e:
             return json.dumps({"error": "An error occurred while performing the search.", "details": str(e)}, indent=4)
 
 
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query so trivially different spellings share a cache entry.
+
+    :param query: The raw search query.
+    :return: The query lower-cased, trimmed and with whitespace collapsed.
+    """
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchService:
+    """
+    Cached and throttled access to DuckDuckGo.
+
+    Results are kept in an in-process TTL cache keyed by the normalized query and the number
+    of results, so reruns of the same analysis never hit DuckDuckGo again. Requests that do go
+    out are capped in number and spaced by a minimum interval to avoid being rate limited, and
+    concurrent searches for the same key share a single request.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 512, max_concurrency: int = 2,
+                 min_interval: float = 0.5):
+        """
+        Initialize the search service.
+
+        :param ttl: Seconds a cached result list stays valid.
+        :param max_entries: Maximum number of cached queries, the oldest are evicted first.
+        :param max_concurrency: Maximum number of requests in flight to DuckDuckGo.
+        :param min_interval: Minimum seconds between two requests to DuckDuckGo.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.min_interval = min_interval
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.throttle_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self.last_request = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key):
+        """Return a cached result list if it is still fresh."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return results
+
+    def _put(self, key, results):
+        """Store a result list, evicting the oldest entries beyond `max_entries`."""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), results)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _fetch(self, query: str, max_results: int) -> list:
+        """Send one throttled request to DuckDuckGo."""
+        with self.slots:
+            with self.throttle_lock:
+                wait = self.last_request + self.min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                self.last_request = time.monotonic()
+            return DuckDuckGoSearch(query, max_results).search()
+
+    def search(self, query: str, max_results: int) -> list:
+        """
+        Search DuckDuckGo, serving the result from the cache when possible.
+
+        :param query: The search query.
+        :param max_results: The maximum number of results to retrieve.
+        :return: A list of dictionaries with the 'title' and 'link' of each result.
+        :raises Exception: Any request-related error; failures are never cached.
+        """
+        key = (normalize_query(query), max_results)
+        results = self._get(key)
+        if results is not None:
+            self.hits += 1
+            return list(results)
+        self.misses += 1
+        results = self._fetch(query, max_results)
+        self._put(key, results)
+        return list(results)
+
+    async def asearch(self, query: str, max_results: int) -> list:
+        """
+        Search without blocking the event loop; identical concurrent searches share one request.
+
+        :param query: The search query.
+        :param max_results: The maximum number of results to retrieve.
+        :return: A list of dictionaries with the 'title' and 'link' of each result.
+        """
+        key = (normalize_query(query), max_results)
+        results = self._get(key)
+        if results is not None:
+            self.hits += 1
+            return list(results)
+
+        loop = asyncio.get_running_loop()
+        pending = self.in_flight.get((loop, key))
+        if pending is None:
+            pending = asyncio.ensure_future(asyncio.to_thread(self.search, query, max_results))
+            self.in_flight[(loop, key)] = pending
+            pending.add_done_callback(lambda _: self.in_flight.pop((loop, key), None))
+        return list(await asyncio.shield(pending))
+
+    async def asearch_many(self, queries: dict, max_results: int) -> dict:
+        """
+        Run several searches concurrently, in a single round trip.
+
+        :param queries: Search queries keyed by an arbitrary label.
+        :param max_results: The maximum number of results per query.
+        :return: For every label, either the result list or the exception its search raised.
+        """
+        labels = list(queries)
+        results = await asyncio.gather(*(self.asearch(queries[label], max_results) for label in labels),
+                                       return_exceptions=True)
+        return dict(zip(labels, results))
+
+    def stats(self) -> dict:
+        """
+        Report cache usage.
+
+        :return: Hits, misses and hit rate of the search cache.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_default_service = None
+_default_service_lock = threading.Lock()
+
+
+def get_search_service() -> SearchService:
+    """
+    Return the process-wide search service.
+
+    Configured through SEARCH_CACHE_TTL_MINUTES, SEARCH_MAX_CONCURRENCY and SEARCH_MIN_INTERVAL.
+    """
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None:
+            _default_service = SearchService(
+                ttl=float(os.getenv("SEARCH_CACHE_TTL_MINUTES", "60")) * 60,
+                max_concurrency=int(os.getenv("SEARCH_MAX_CONCURRENCY", "2")),
+                min_interval=float(os.getenv("SEARCH_MIN_INTERVAL", "0.5")),
+            )
+        return _default_service
+
+
 
 # # Example usage
 # if __name__ == "__main__":
@@ -3,7 +3,7 @@ import json
 import yaml
 from dotenv import load_dotenv
 from agents.g2ReviewAgent import G2Scraper
-from modules.llm import GroqClient, GroqCompletion
+from modules.llm import GroqCompletion, get_groq_client
 from agents.duckSearchAgent import DuckDuckGoSearch
 from pydantic import BaseModel, ValidationError
 
@@ -15,7 +15,7 @@ class NameExtractorAgent:
     """
 
     def __init__(self, api_key, llm_model, prompts_file):
-        self.groq_client = GroqClient(api_key)
+        self.groq_client = get_groq_client(api_key)
         self.llm_model = llm_model
         self.prompts = self.load_prompts(prompts_file)
 
@@ -33,8 +33,22 @@ class NameExtractorAgent:
         """Retrieve the prompt template by key."""
         return self.prompts[key]["template"]
 
-    def call_llm(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template):
-        """Call the LLM and return the result."""
+    def validate(self, result):
+        """Return True when an LLM response parses into the expected output."""
+        try:
+            self.ProductCompanyOutput(**json.loads(result))
+            return True
+        except (json.JSONDecodeError, ValidationError, TypeError):
+            return False
+
+    def call_llm(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template,
+                 use_cache=True):
+        """
+        Call the LLM and return the result.
+
+        Only responses that pass `validate` are cached, and retries pass `use_cache=False` so
+        they ask the model again instead of replaying the response that just failed.
+        """
         groq_completion = GroqCompletion(
             self.groq_client,
             LLMmodel,
@@ -47,7 +61,7 @@ class NameExtractorAgent:
             stream,
             stop
         )
-        return groq_completion.create_completion()
+        return groq_completion.create_completion(validate=self.validate, use_cache=use_cache)
 
     def process_request(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_key, max_attempts=3):
         """
@@ -74,7 +88,8 @@ class NameExtractorAgent:
         prompt_template = self.get_prompt_template(prompt_key)
 
         while attempts < max_attempts:
-            result = self.call_llm(LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template)
+            result = self.call_llm(LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template,
+                                   use_cache=attempts == 0)
 
             try:
                 result_json = json.loads(result)
@@ -1,80 +1,242 @@
 import os
-from urllib.parse import quote_plus
-from urllib.request import urlopen
+import io
 import json
-import time
+import random
+import asyncio
+from urllib.parse import quote_plus
+from modules.httpClient import get_http_client
+from modules.g2Cache import get_g2_cache
+from modules.llm import run_sync
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # Fall back to parsing the whole response
+    ijson = None
+
+# Fields of the G2 payload the analysis uses; everything else (the reviews themselves) is skipped
+G2_FIELDS = ["productName", "productLink", "productDescription", "starRating", "reviewsCount",
+             "discussionsCount", "ratings", "sentiments"]
+
+SCALAR_EVENTS = {"null", "boolean", "integer", "double", "number", "string"}
+
+
+class FieldProjector:
+    """
+    Builds a few top-level fields of `prefix` from a stream of ijson events.
+
+    Only the projected fields are turned into Python objects, so large review lists are never
+    materialized, and `done` turns True as soon as every field was seen.
+
+    Attributes:
+        fields (list): Keys to keep under `prefix`.
+        prefix (str): The object holding the fields.
+        projected (dict): The fields completed so far.
+    """
+
+    def __init__(self, fields=G2_FIELDS, prefix="body"):
+        """
+        Initialize the projector.
+
+        Args:
+            fields (list): Keys to keep under `prefix`.
+            prefix (str): The object holding the fields.
+        """
+        self.fields = fields
+        self.prefix = prefix
+        self.wanted = set(fields)
+        self.builders = {}
+        self.projected = {}
+
+    @property
+    def done(self):
+        """Whether every wanted field was completed."""
+        return len(self.projected) == len(self.wanted)
+
+    def feed(self, events):
+        """
+        Consume `(path, event, value)` ijson events.
+
+        Returns:
+            bool: True once every wanted field is complete.
+        """
+        for path, event, value in events:
+            parts = path.split(".", 2)
+            if len(parts) < 2 or parts[0] != self.prefix or parts[1] not in self.wanted:
+                continue
+            field = parts[1]
+            builder = self.builders.setdefault(field, ObjectBuilder())
+            builder.event(event, value)
+            # The field is complete once its own scalar or closing bracket is seen
+            if len(parts) == 2 and (event in SCALAR_EVENTS or event in ("end_map", "end_array")):
+                self.projected[field] = builder.value
+                if self.done:
+                    return True
+        return False
+
+    def result(self):
+        """The projected fields that were present, in the order of `fields`."""
+        return {field: self.projected[field] for field in self.fields if field in self.projected}
+
+
+def project_fields(data: bytes, fields=G2_FIELDS, prefix="body") -> dict:
+    """
+    Extract a few top-level fields of `prefix` from a JSON document.
+
+    Args:
+        data (bytes): The raw JSON document.
+        fields (list): Keys to keep under `prefix`.
+        prefix (str): The object holding the fields.
+
+    Returns:
+        dict: The projected fields that were present in the document.
+    """
+    if ijson is None:
+        body = json.loads(data).get(prefix, {})
+        return {field: body[field] for field in fields if field in body}
+
+    projector = FieldProjector(fields, prefix)
+    projector.feed(ijson.parse(io.BytesIO(data), use_float=True))
+    return projector.result()
+
+
+async def aproject_fields(chunks, fields=G2_FIELDS, prefix="body") -> dict:
+    """
+    Extract a few top-level fields of `prefix` from a JSON document streamed in byte chunks.
+
+    With ijson installed every chunk is pushed into an incremental parser as it arrives, and
+    reading stops as soon as all fields were seen, so the rest of the body is never downloaded.
+
+    Args:
+        chunks: Async iterator of bytes, such as `httpx.Response.aiter_bytes()`.
+        fields (list): Keys to keep under `prefix`.
+        prefix (str): The object holding the fields.
+
+    Returns:
+        dict: The projected fields that were present in the document.
+    """
+    if ijson is None:
+        return project_fields(b"".join([chunk async for chunk in chunks]), fields, prefix)
+
+    projector = FieldProjector(fields, prefix)
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events, use_float=True)
+    async for chunk in chunks:
+        parser.send(chunk)
+        if projector.feed(events):
+            break
+        del events[:]
+    else:
+        parser.close()
+        projector.feed(events)
+    return projector.result()
+
 
 class G2Scraper:
     """
     A class to scrape product reviews from G2 using the Crawlbase API.
-    
+
+    Requests go through the shared HTTP connection pool, are retried with exponential backoff
+    and jitter, and each response is streamed through an incremental JSON parser: only the
+    projected fields are built and cached, and the download stops once they were all read.
+
     Attributes:
         api_token (str): The API token for accessing the Crawlbase API.
+        timeout (float): Seconds to wait for each request.
+        retries (int): Number of attempts before giving up.
+        backoff (float): Base delay of the exponential backoff, in seconds.
     """
 
-    def __init__(self):
+    def __init__(self, timeout: float = None, retries: int = 3, backoff: float = 1.0):
         """
         Initializes the G2Scraper class by loading the API token from environment variables.
+
+        Args:
+            timeout (float): Seconds to wait for each request; G2_TIMEOUT or 90 by default.
+            retries (int): Number of attempts before giving up.
+            backoff (float): Base delay of the exponential backoff, in seconds.
         """
         self.api_token = os.getenv('CRAWLBASE_API_KEY')
         if not self.api_token:
             raise ValueError("API token not found. Please set the 'CRAWLBASE_API_TOKEN' environment variable.")
+        self.timeout = float(os.getenv("G2_TIMEOUT", "90")) if timeout is None else timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def _api_url(self, product_url: str) -> str:
+        """Build the Crawlbase request URL; the response is compact JSON, not pretty-printed."""
+        return (f'https://api.crawlbase.com/?token={self.api_token}&format=json'
+                f'&scraper=g2-product-reviews&url={quote_plus(product_url)}')
 
-    def fetch_reviews(self, product_url: str) -> dict:
+    def _delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, so concurrent retries do not hit the API in lockstep."""
+        delay = self.backoff * 2 ** attempt
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def afetch_reviews(self, product_url: str, fields=G2_FIELDS) -> dict:
         """
-        Fetches reviews for the given product URL from G2 with retry mechanism.
+        Fetches the projected review fields of a product without blocking the event loop.
 
         Args:
             product_url (str): The G2 product reviews page URL.
+            fields (list): Fields of the payload body to keep.
 
         Returns:
-            dict: Parsed JSON response containing product reviews.
+            dict: The requested fields of the product reviews payload.
         """
-        encoded_url = quote_plus(product_url)
-        api_url = (f'https://api.crawlbase.com/?token={self.api_token}&format=json&pretty=true'
-                   f'&scraper=g2-product-reviews&url={encoded_url}')
-        
-        retries = 3
-        for attempt in range(retries):
+        cache = get_g2_cache()
+        if cache is not None:
+            cached = cache.get(product_url)
+            if cached is not None and all(field in cached for field in fields):
+                return {field: cached[field] for field in fields}
+
+        for attempt in range(self.retries):
             try:
-                with urlopen(api_url) as handler:
-                    if handler.status != 200:
-                        raise RuntimeError(f"Request failed with status code {handler.status}")
-                    response_data = handler.read()
-                return json.loads(response_data)
+                async with get_http_client().stream("GET", self._api_url(product_url),
+                                                    timeout=self.timeout) as response:
+                    if response.status_code != 200:
+                        raise RuntimeError(f"Request failed with status code {response.status_code}")
+                    projected = await aproject_fields(response.aiter_bytes(), fields)
+                if not projected:
+                    raise RuntimeError("Response does not contain any product data")
+                break
 
             except Exception as e:
-                if attempt < retries - 1:
+                if attempt < self.retries - 1:
                     print(f"Attempt {attempt + 1} failed: {e}. Retrying...")
-                    time.sleep(2)  # Wait before retrying
+                    await asyncio.sleep(self._delay(attempt))  # Back off before retrying
                 else:
-                    raise RuntimeError(f"Failed to fetch reviews after {retries} attempts: {e}")
+                    raise RuntimeError(f"Failed to fetch reviews after {self.retries} attempts: {e}")
+
+        if cache is not None:
+            cache.put(product_url, projected)
+        return projected
+
+    def fetch_reviews(self, product_url: str, fields=G2_FIELDS) -> dict:
+        """
+        Fetches the projected review fields of a product from synchronous code.
+
+        Args:
+            product_url (str): The G2 product reviews page URL.
+            fields (list): Fields of the payload body to keep.
+
+        Returns:
+            dict: The requested fields of the product reviews payload.
+        """
+        return run_sync(self.afetch_reviews(product_url, fields))
 
 # if __name__ == "__main__":
 #     # Example usage
 #     try:
 #         scraper = G2Scraper()
 #         product_url = 'https://www.g2.com/products/ringex/reviews'
-#         reviews = scraper.fetch_reviews(product_url)
-
-#         result = {
-#             "productName": reviews['body']['productName'],
-#             "productLink": reviews['body']['productLink'],
-#             "productDescription": reviews['body']['productDescription'],    
-#             "starRating": reviews['body']['starRating'],
-#             "reviewsCount": reviews['body']['reviewsCount'],
-#             "discussionsCount": reviews['body']['discussionsCount'],
-#             "ratings": reviews['body']['ratings'],
-#             "sentiments": reviews['body']['sentiments']
-#         }
+#         # Only the G2_FIELDS of the payload body are returned, without the `body` wrapper
+#         result = scraper.fetch_reviews(product_url)
 
 #         # Output the result
 #         print(json.dumps(result, indent=4))
 
 #         # Save JSON response to a file
-#         with open('reviews.json', 'w') as json_file:
-#             json.dump(reviews, json_file, indent=4)
-
 #         with open('results.json', 'w') as json_file:
 #             json.dump(result, json_file, indent=4)
 
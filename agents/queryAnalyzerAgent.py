@@ -2,7 +2,7 @@ import os
 import json
 import yaml
 from dotenv import load_dotenv
-from modules.llm import GroqClient, GroqCompletion
+from modules.llm import GroqCompletion, get_groq_client
 from pydantic import BaseModel, ValidationError, Field
 
 load_dotenv()
@@ -13,7 +13,7 @@ class QueryAnalyzerAgent:
     """
 
     def __init__(self, api_key, llm_model, prompts_file):
-        self.groq_client = GroqClient(api_key)
+        self.groq_client = get_groq_client(api_key)
         self.llm_model = llm_model
         self.prompts = self.load_prompts(prompts_file)
 
@@ -37,12 +37,26 @@ class QueryAnalyzerAgent:
         """Retrieve the prompt template by key."""
         return self.prompts[key]["template"]
 
-    def call_llm(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template):
-        """Call the LLM and return the result."""
+    def validate(self, result):
+        """Return True when an LLM response parses into the expected output."""
+        try:
+            self.ProductCompanyOutput(**json.loads(result))
+            return True
+        except (json.JSONDecodeError, ValidationError, TypeError):
+            return False
+
+    def call_llm(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template,
+                 use_cache=True):
+        """
+        Call the LLM and return the result.
+
+        Only responses that pass `validate` are cached, and retries pass `use_cache=False` so
+        they ask the model again instead of replaying the response that just failed.
+        """
         groq_completion = GroqCompletion(
             self.groq_client, LLMmodel, domain, prompt_template, query, temperature, max_tokens, top_p, stream, stop
         )
-        return groq_completion.create_completion()
+        return groq_completion.create_completion(validate=self.validate, use_cache=use_cache)
 
     def process_request(self, LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_key, max_attempts=3):
         """
@@ -70,7 +84,8 @@ class QueryAnalyzerAgent:
         while attempts < max_attempts:
             
             try:
-                result = self.call_llm(LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template)
+                result = self.call_llm(LLMmodel, domain, query, temperature, max_tokens, top_p, stream, stop, prompt_template,
+                                       use_cache=attempts == 0)
                 result_json = json.loads(result)
                 validated_output = self.ProductCompanyOutput(**result_json)
                 break  # Exit the loop if validation is successful
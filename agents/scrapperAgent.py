@@ -1,12 +1,181 @@
+import os
 import asyncio
 import nest_asyncio
 import re
-from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CacheMode
+import lxml.html
+from crawl4ai import CrawlerRunConfig, CacheMode
 from crawl4ai.content_filter_strategy import PruningContentFilter
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
+from modules.crawlCache import get_crawl_cache
+from modules.httpClient import get_http_client
+from modules.validator import get_result_router
+from modules.browserPool import get_crawler_pool, close_crawler_pool
+
+# Seconds a single page may take to render in the browser
+CRAWL_PAGE_TIMEOUT = float(os.getenv("CRAWL_PAGE_TIMEOUT", "45"))
 
 nest_asyncio.apply()
 
+class StaticPageFetcher:
+    """
+    Fast path for server-rendered pages: a pooled HTTP GET plus lxml main-content extraction.
+
+    The fetcher returns None whenever the page looks like it needs a real browser (a JavaScript
+    application shell, a bot wall or an almost empty extraction), so the caller can escalate to
+    the headless crawler.
+
+    Attributes:
+        min_text_length (int): Minimum characters of extracted text to accept the static result.
+    """
+
+    # Elements that never hold the main content
+    NOISE_TAGS = ['script', 'style', 'noscript', 'nav', 'footer', 'aside', 'header', 'form',
+                  'iframe', 'svg', 'button', 'template']
+    BLOCK_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'blockquote', 'pre', 'tr'}
+    MAIN_XPATH = '//article | //main | //*[@role="main"]'
+    JS_SHELL_PATTERN = re.compile(
+        r'(enable|requires?) javascript|<div id="(root|app|__next|__nuxt)">\s*</div>'
+        r'|cf-browser-verification|captcha', re.IGNORECASE)
+
+    def __init__(self, min_text_length=500):
+        """
+        Initialize the fetcher.
+
+        Args:
+            min_text_length (int): Minimum characters of extracted text to accept the static result.
+        """
+        self.min_text_length = min_text_length
+
+    def _main_node(self, root):
+        """Find the element holding the main content of the page."""
+        candidates = root.xpath(self.MAIN_XPATH)
+        if candidates:
+            return max(candidates, key=lambda node: len(node.text_content()))
+
+        # Fall back to the element with the most paragraph text directly below it
+        scores = {}
+        for paragraph in root.iter('p'):
+            parent = paragraph.getparent()
+            if parent is not None:
+                scores[parent] = scores.get(parent, 0) + len(paragraph.text_content())
+        return max(scores, key=scores.get) if scores else root
+
+    def _to_markdown(self, node, lines):
+        """Append the markdown lines of the block elements below `node`."""
+        for child in node:
+            tag = child.tag if isinstance(child.tag, str) else ''
+            if tag in self.BLOCK_TAGS:
+                text = ' '.join(child.text_content().split())
+                if not text:
+                    continue
+                if tag[0] == 'h' and tag[1:].isdigit():
+                    lines.append('#' * int(tag[1]) + ' ' + text)
+                elif tag == 'li':
+                    lines.append('- ' + text)
+                elif tag == 'tr':
+                    cells = [' '.join(cell.text_content().split()) for cell in child if cell.tag in ('td', 'th')]
+                    lines.append('| ' + ' | '.join(cells) + ' |')
+                elif tag == 'blockquote':
+                    lines.append('> ' + text)
+                else:
+                    lines.append(text)
+            else:
+                self._to_markdown(child, lines)
+
+    def extract_markdown(self, html):
+        """
+        Extract the main content of an HTML page as markdown.
+
+        Args:
+            html (str): Raw HTML of the page.
+
+        Returns:
+            str: Markdown with headings, paragraphs, list items and table rows.
+        """
+        root = lxml.html.fromstring(html)
+        for element in root.xpath('//' + ' | //'.join(self.NOISE_TAGS)):
+            element.drop_tree()
+
+        lines = []
+        self._to_markdown(self._main_node(root), lines)
+
+        # Keep consecutive list items and table rows together, separate other blocks
+        markdown = []
+        for i, line in enumerate(lines):
+            if i and line[:2] in ('- ', '| ') and lines[i - 1][:2] == line[:2]:
+                markdown.append('\n')
+            elif i:
+                markdown.append('\n\n')
+            markdown.append(line)
+        return ''.join(markdown)
+
+    def needs_browser(self, html, markdown):
+        """
+        Decide whether a static fetch has to be escalated to the headless browser.
+
+        Args:
+            html (str): Raw HTML of the page.
+            markdown (str): Markdown extracted from it.
+
+        Returns:
+            bool: True for JavaScript shells, bot walls and near-empty extractions.
+        """
+        if len(markdown) < self.min_text_length:
+            return True
+        return bool(self.JS_SHELL_PATTERN.search(html)) and len(markdown) < 4 * self.min_text_length
+
+    async def fetch(self, url):
+        """
+        Fetch and extract a page without a browser.
+
+        Args:
+            url (str): The page URL.
+
+        Returns:
+            tuple: The raw HTML, the markdown and the lower-cased response headers, or None
+            when the page needs the headless browser.
+        """
+        # Sites that render with JavaScript or block plain HTTP clients go straight to the browser
+        if not get_result_router().static_fetchable(url):
+            return None
+
+        try:
+            response = await get_http_client().get(url)
+        except Exception as e:
+            print(f"Static fetch failed for {url}: {e}")
+            return None
+        return self.from_response(url, response)
+
+    def from_response(self, url, response):
+        """
+        Extract a page from an HTTP response that was already downloaded.
+
+        Args:
+            url (str): The page URL.
+            response (httpx.Response): The response of a GET to the page.
+
+        Returns:
+            tuple: The raw HTML, the markdown and the lower-cased response headers, or None
+            when the page needs the headless browser.
+        """
+        if not get_result_router().static_fetchable(url):
+            return None
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or "html" not in content_type:
+            return None
+
+        html = response.text
+        try:
+            markdown = self.extract_markdown(html)
+        except Exception as e:
+            print(f"Static extraction failed for {url}: {e}")
+            return None
+
+        if self.needs_browser(html, markdown):
+            return None
+        return html, markdown, {key.lower(): value for key, value in response.headers.items()}
+
+
 class WebContentCleaner:
     """
     A class to handle web content crawling, cleaning, and saving to markdown files using the `crawl4ai` library.
@@ -15,9 +184,12 @@ class WebContentCleaner:
         url (str): The target URL for crawling.
         verbose (bool): Flag to enable verbose logging during crawling.
         fit_markdown_path (str): File path to save the fit markdown content.
+        pool (CrawlerPool): Browser pool to crawl with; the pool of the running event loop by default.
+        static_first (bool): Try a plain HTTP fetch before rendering the page in a browser.
+        html (str): Raw HTML of the page once `clean_content` succeeded.
     """
 
-    def __init__(self, url, fit_markdown_path, verbose=True):
+    def __init__(self, url, fit_markdown_path, verbose=True, pool=None, static_first=True):
         """
         Initialize the WebContentCleaner instance with a target URL, file paths, and verbosity.
 
@@ -25,10 +197,17 @@ class WebContentCleaner:
             url (str): The target URL for crawling.
             fit_markdown_path (str): File path to save the fit markdown content.
             verbose (bool): Enables verbose logging if set to True.
+            pool (CrawlerPool): Browser pool to crawl with; the pool of the running event loop by default.
+            static_first (bool): Try a plain HTTP fetch before rendering the page in a browser.
         """
         self.url = url
         self.verbose = verbose
         self.fit_markdown_path = fit_markdown_path
+        self.pool = pool
+        self.static_first = static_first
+        self.html = None
+        # Set once the page body was downloaded by a cache revalidation, so it is not fetched twice
+        self.static_checked = False
 
     def remove_links(self, markdown_content):
         """
@@ -44,51 +223,116 @@ class WebContentCleaner:
         link_pattern = re.compile(r'\[.*?\]\(.*?\)|\!\[.*?\]\(.*?\)')
         return re.sub(link_pattern, '', markdown_content)
 
-    async def clean_content(self):
+    def _save(self, fit_markdown):
         """
-        Perform the web crawling, content cleaning, and save the results as fit markdown file.
+        Save the fit markdown content to the markdown file.
+
+        Args:
+            fit_markdown (str): The cleaned markdown content.
+        """
+        with open(self.fit_markdown_path, "w", encoding="utf-8") as file:
+            file.write(fit_markdown)
+
+        print(f"Fit Markdown (without links) saved to {self.fit_markdown_path}")
+        print(f"Fit Markdown Length: {len(fit_markdown)}")
+
+    def _reuse_response(self, response):
+        """
+        Build the page from the 200 body of a cache revalidation instead of downloading it again.
+
+        Returns:
+            tuple: The raw HTML, the fit markdown without links and the headers, or None when
+            the page needs the browser.
+        """
+        self.static_checked = True
+        fetched = StaticPageFetcher().from_response(self.url, response)
+        if fetched is None:
+            return None
+        html, markdown, headers = fetched
+        return html, self.remove_links(markdown), headers
+
+    async def _render(self, cache_mode):
+        """
+        Render the page in a pooled headless browser and derive its fit markdown.
+
+        Args:
+            cache_mode (CacheMode): crawl4ai cache mode for this run.
 
-        The method uses the `crawl4ai` library's `AsyncWebCrawler` and applies content filtering
-        with a custom pruning strategy to generate the fit markdown output.
-
-        Raises:
-            Exception: If an error occurs during the crawling process.
-        """
-        async with AsyncWebCrawler(verbose=self.verbose) as crawler:
-            config = CrawlerRunConfig(
-                cache_mode=CacheMode.ENABLED,
-                excluded_tags=['nav', 'footer', 'aside'],
-                remove_overlay_elements=False,
-                markdown_generator=DefaultMarkdownGenerator(
-                    content_filter=PruningContentFilter(
-                        threshold=0.48, threshold_type="fixed", min_word_threshold=0
-                    ),
-                    options={"ignore_links": False}
+        Returns:
+            tuple: The raw HTML, the fit markdown without links and the response headers.
+        """
+        pool = self.pool or get_crawler_pool()
+        config = CrawlerRunConfig(
+            cache_mode=cache_mode,
+            excluded_tags=['nav', 'footer', 'aside'],
+            remove_overlay_elements=False,
+            page_timeout=int(CRAWL_PAGE_TIMEOUT * 1000),
+            markdown_generator=DefaultMarkdownGenerator(
+                content_filter=PruningContentFilter(
+                    threshold=0.48, threshold_type="fixed", min_word_threshold=0
                 ),
-            )
-            
-            try:
-                # Perform the crawling process
-                result = await crawler.arun(url=self.url, config=config)
+                options={"ignore_links": False}
+            ),
+        )
 
-                # Check if markdown_v2 is None
-                if result.markdown_v2 is None:
-                    raise ValueError(f"Failed to crawl and generate markdown for URL: {self.url}")
+        async with pool.crawler() as crawler:
+            # Perform the crawling process
+            # Hard stop in case the browser hangs past its own page timeout
+            result = await asyncio.wait_for(crawler.arun(url=self.url, config=config),
+                                            timeout=CRAWL_PAGE_TIMEOUT + 15)
 
-                # Remove all links from the fit markdown
-                fit_markdown = self.remove_links(result.markdown_v2.fit_markdown)
+        # Check if markdown_v2 is None
+        if result.markdown_v2 is None:
+            raise ValueError(f"Failed to crawl and generate markdown for URL: {self.url}")
 
-                # Save the fit markdown content (without links) to .md file
-                with open(self.fit_markdown_path, "w", encoding="utf-8") as file:
-                    file.write(fit_markdown)
+        # Remove all links from the fit markdown
+        fit_markdown = self.remove_links(result.markdown_v2.fit_markdown)
+        headers = {key.lower(): value for key, value in (getattr(result, "response_headers", None) or {}).items()}
+        return result.html, fit_markdown, headers
 
-                fit_markdown_length = len(fit_markdown)
+    async def clean_content(self):
+        """
+        Perform the web crawling, content cleaning, and save the results as fit markdown file.
 
-                print(f"Fit Markdown (without links) saved to {self.fit_markdown_path}")
-                print(f"Fit Markdown Length: {fit_markdown_length}")
+        Pages are served from the crawl cache while fresh, or when a conditional request shows
+        they did not change. Otherwise a plain HTTP fetch with lxml extraction is tried first, and
+        only pages that need JavaScript are rendered: the method then borrows a started
+        `AsyncWebCrawler` from the shared browser pool and applies content filtering with a
+        custom pruning strategy to generate the fit markdown output.
 
-            except Exception as e:
-                print(f"Error during web crawling: {e}")
+        Returns:
+            str: The saved fit markdown, or None if the page could not be crawled.
+        """
+        cache = get_crawl_cache()
+        try:
+            if cache is not None:
+                page = await cache.lookup(self.url, extract=self._reuse_response)
+                if page is not None:
+                    print(f"Serving {self.url} from the crawl cache")
+                    self.html = page.html
+                    self._save(page.markdown)
+                    return page.markdown
+
+            use_static = self.static_first and not self.static_checked
+            fetched = await StaticPageFetcher().fetch(self.url) if use_static else None
+            if fetched is not None:
+                print(f"Fetched {self.url} without a browser")
+                html, fit_markdown, headers = fetched
+                fit_markdown = self.remove_links(fit_markdown)
+            else:
+                # Our own cache decides freshness, so crawl4ai must not serve its stale copy
+                html, fit_markdown, headers = await self._render(CacheMode.BYPASS if cache is not None else CacheMode.ENABLED)
+            if cache is not None:
+                cache.put(self.url, html, fit_markdown, headers.get("etag"), headers.get("last-modified"))
+            self.html = html
+
+            # Save the fit markdown content (without links) to .md file
+            self._save(fit_markdown)
+            return fit_markdown
+
+        except Exception as e:
+            print(f"Error during web crawling: {e}")
+            return None
 
 if __name__ == "__main__":
     # Example usage: User provides file path for fit markdown
@@ -98,5 +342,11 @@ if __name__ == "__main__":
     # Instantiate the cleaner with the target URL and file path
     cleaner = WebContentCleaner(url=url, fit_markdown_path=fit_markdown_path)
 
-    # Run the cleaning process asynchronously
-    asyncio.run(cleaner.clean_content())
+    # Run the cleaning process asynchronously, then shut the browser pool down
+    async def main():
+        try:
+            await cleaner.clean_content()
+        finally:
+            await close_crawler_pool()
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import os
+import argparse
+from dotenv import load_dotenv
+
+from modules.analysisPipeline import read_queries, run_batch
+
+load_dotenv()
+
+
+def parse_args():
+    """Parse the command line arguments of the batch analyzer."""
+    parser = argparse.ArgumentParser(description="Analyze many products or companies without the Streamlit UI.")
+    parser.add_argument("input", help="Queries file: JSONL with a 'query' key per line, or one plain query per line.")
+    parser.add_argument("output", help="JSONL file receiving one result per query as soon as it finishes.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of analyses running at once.")
+    parser.add_argument("--work-dir", default=os.path.join("scrapPages", "batch"), help="Folder for per-query intermediate files.")
+    parser.add_argument("--prompts", default="prompts.yml", help="Path to the YAML prompts file.")
+    parser.add_argument("--model", default="llama-3.3-70b-versatile", help="Model used for query analysis and the final report.")
+    parser.add_argument("--max-search", type=int, default=3, help="Number of search results per query.")
+    parser.add_argument("--budget", type=float, default=300,
+                        help="Seconds allowed per analysis; slow sources are dropped from the report. 0 disables it.")
+    parser.add_argument("--mode", choices=["full", "sectioned"], default="full",
+                        help="'sectioned' writes each report section from the most relevant chunks of the sources.")
+    parser.add_argument("--top-k", type=int, default=8, help="Chunks retrieved per section in sectioned mode.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        raise SystemExit("GROQ_API_KEY is not set.")
+
+    queries = read_queries(args.input)
+    print(f"Analyzing {len(queries)} queries with concurrency {args.concurrency}...")
+    succeeded = run_batch(queries, args.output, api_key, prompts_file=args.prompts, work_dir=args.work_dir,
+                          concurrency=args.concurrency, model=args.model, max_search=args.max_search,
+                          latency_budget=args.budget or None, analysis_mode=args.mode, rag_top_k=args.top_k)
+    print(f"Finished: {succeeded}/{len(queries)} reports written to {args.output}")
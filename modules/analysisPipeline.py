@@ -0,0 +1,553 @@
+import os
+import re
+import glob
+import json
+import atexit
+import asyncio
+import threading
+
+from agents.g2ReviewAgent import G2Scraper
+from agents.duckSearchAgent import get_search_service
+from agents.queryAnalyzerAgent import QueryAnalyzerAgent
+
+from modules.pipeline import StageGraph, Deadline
+from modules.urlCanonicalizer import UrlDeduper
+from modules.httpClient import close_http_client
+from modules.browserPool import close_crawler_pool
+from modules.llm import run_sync, close_groq_clients
+from modules.llmCache import get_llm_cache
+from modules.crawlCache import get_crawl_cache
+from modules.g2Cache import get_g2_cache
+from modules.g2Comparison import G2Comparison
+from modules.textCombiner import FileReader
+from modules.llamSummarizer import SummaryGenerator
+from modules.chunker import input_token_budget
+from modules.crunchbaseAggregator import crunchbase_aggregator
+from modules.validator import (g2validator, crunchbaseValidator, get_result_router, g2_product_slug, G2_REVIEWS,
+                              CRUNCHBASE_ORGANIZATION)
+from modules.utils import cleanSearchContentA, cleanSearchContentB, extractCrunchbaseProfile
+
+
+def print_notify(stage, state, message):
+    """
+    Default progress callback used when no UI is attached.
+
+    Args:
+        stage (str): Name of the pipeline stage reporting progress.
+        state (str): One of "running", "info", "complete" or "error".
+        message (str): Human readable progress message.
+    """
+    print(f"[{stage}] {state}: {message}")
+
+
+# How the final report is produced: one prompt over the combined report, or retrieval per section
+ANALYSIS_MODES = ("full", "sectioned")
+
+# Tokens kept free next to the combined report for the system role and the business_analysis prompt
+REPORT_PROMPT_TOKENS = 1024
+
+# Default size of the combined report in "full" mode, capped by what fits the model context window
+REPORT_TOKEN_BUDGET = 16000
+
+# Files written by one analysis into its output folder
+OUTPUT_PATTERNS = ["conciseG2.json", "g2Comparison.md", "Crunchbase_Profile.json", "Crunchbase_Scrap_*.md",
+                   "LLM_Instruction_*_Scrap_*.md", "combinedReport.md"]
+
+
+class AnalysisPipeline:
+    """
+    Headless implementation of the QueryAnalyzer -> search -> scrape -> summarize -> business_analysis flow.
+
+    The pipeline has no Streamlit dependency. Progress is reported through a `notify(stage, state, message)`
+    callback, so the same code drives the web UI and the batch CLI.
+    """
+
+    def __init__(self, api_key, prompts_file="prompts.yml", model="llama-3.3-70b-versatile", domain="",
+                 output_dir="scrapPages", max_search=3, temperature=0.0, max_tokens=500, top_p=1,
+                 stream=True, stop=None, prompt_key="identify_product_or_company", notify=None,
+                 latency_budget=None, branch_budget_share=0.75, g2_competitors=3, analysis_mode="full",
+                 rag_top_k=8, report_token_budget=None, report_source_tokens=6000):
+        """
+        Initialize the pipeline.
+
+        Args:
+            api_key (str): Groq API key.
+            prompts_file (str): Path to the YAML prompts file.
+            model (str): Model used for query analysis and the final business analysis.
+            domain (str): Domain context passed to the LLM.
+            output_dir (str): Folder receiving the intermediate pages and the final report.
+            max_search (int): Number of DuckDuckGo results per search.
+            temperature (float): Sampling temperature of the query analysis.
+            max_tokens (int): Maximum tokens of the query analysis.
+            top_p (float): Top-p sampling parameter of the query analysis.
+            stream (bool): Whether to stream LLM responses.
+            stop (str): Stop sequence for the LLM.
+            prompt_key (str): Prompt used for the query analysis.
+            notify (callable): Progress callback `notify(stage, state, message)`.
+            latency_budget (float): End-to-end seconds allowed for one analysis; unbounded if None.
+            branch_budget_share (float): Share of the budget the extraction branches may use; the
+                rest is kept for the final business analysis.
+            g2_competitors (int): Other G2 products found by the searches to compare against.
+            analysis_mode (str): "full" sends the whole combined report in one prompt; "sectioned"
+                indexes the sources and writes each report section from its `rag_top_k` most
+                relevant chunks, keeping the prompts bounded however many sources were scraped.
+            rag_top_k (int): Chunks retrieved per section in "sectioned" mode.
+            report_token_budget (int): Maximum tokens of the combined report in "full" mode,
+                `REPORT_TOKEN_BUDGET` by default; never more than fits the context window of `model`.
+            report_source_tokens (int): Maximum tokens a single source adds to the combined report.
+        """
+        if analysis_mode not in ANALYSIS_MODES:
+            raise ValueError(f"Unknown analysis mode '{analysis_mode}', expected one of {ANALYSIS_MODES}.")
+        self.api_key = api_key
+        self.prompts_file = prompts_file
+        self.model = model
+        self.domain = domain
+        self.output_dir = output_dir
+        self.max_search = max_search
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.top_p = top_p
+        self.stream = stream
+        self.stop = stop
+        self.prompt_key = prompt_key
+        self.notify = notify or print_notify
+        self.latency_budget = latency_budget
+        self.branch_budget_share = branch_budget_share
+        self.g2_competitors = g2_competitors
+        self.analysis_mode = analysis_mode
+        self.rag_top_k = rag_top_k
+        self.report_token_budget = report_token_budget
+        self.report_source_tokens = report_source_tokens
+
+    def analyze_query(self, query):
+        """
+        Run the QueryAnalyzerAgent on a user query.
+
+        Args:
+            query (str): The free-text user query.
+
+        Returns:
+            dict: Validated query analysis, or None if the LLM output could not be validated.
+        """
+        processor = QueryAnalyzerAgent(self.api_key, {self.model: self.model}, self.prompts_file)
+        return processor.process_request(self.model, self.domain, query, self.temperature, self.max_tokens,
+                                         self.top_p, self.stream, self.stop, self.prompt_key)
+
+    async def search(self, query):
+        """
+        Run a cached DuckDuckGo search without blocking the event loop.
+
+        Args:
+            query (str): The search query.
+
+        Returns:
+            list: Search results as dictionaries with 'title' and 'link'.
+        """
+        return await get_search_service().asearch(query, self.max_search)
+
+    def search_queries(self, llm_result):
+        """
+        Return the searches of one analysis, keyed by the branch that consumes them.
+
+        Args:
+            llm_result (dict): Output of `analyze_query`.
+
+        Returns:
+            dict: Search query per branch.
+        """
+        return {
+            "g2": llm_result['name'] + " G2",
+            "crunchbase": llm_result['name'] + " Crunchbase",
+            "instruction_1": llm_result['instruction_1'],
+            "instruction_2": llm_result['instruction_2'],
+        }
+
+    def _clear_output_dir(self):
+        """Remove the pages of a previous run so a dropped source can never reach the report."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        for pattern in OUTPUT_PATTERNS:
+            for path in glob.glob(os.path.join(self.output_dir, pattern)):
+                os.remove(path)
+
+    def build_graph(self, llm_result, dropped_sources=None):
+        """
+        Build the stage graph for one analysis.
+
+        The `search` stage fans out every DuckDuckGo query at once, so search costs a single
+        round trip. The G2, Crunchbase and two web-search branches then run concurrently on
+        its results: G2 review pages and Crunchbase profiles found by any search go to their
+        structured extractors, the rest to the generic crawl-and-summarize path, and
+        `business_analysis` waits on all of them. Under a latency
+        budget the branches are cancelled once their share runs out and the analysis runs on
+        the sources that finished in time.
+
+        Args:
+            llm_result (dict): Output of `analyze_query`.
+            dropped_sources (list): Receives the URLs that were dropped on the way.
+
+        Returns:
+            StageGraph: The graph ready to be run.
+        """
+        graph = StageGraph()
+        notify = self.notify
+        name = llm_result['name']
+        dropped_sources = [] if dropped_sources is None else dropped_sources
+        # Every unique page of the run is scraped and summarized by exactly one branch
+        deduper = UrlDeduper()
+        router = get_result_router()
+
+        ### SEARCHING ALL SOURCES AT ONCE ###
+        async def search_stage(inputs):
+            return await get_search_service().asearch_many(self.search_queries(llm_result), self.max_search)
+
+        def search_results_for(inputs, branch):
+            """Return the search results of a branch, re-raising its search error."""
+            if inputs["search"] is None:
+                raise RuntimeError("Search failed.")
+            results = inputs["search"][branch]
+            if isinstance(results, Exception):
+                raise results
+            return results
+
+        def structured_candidates(inputs, branch):
+            """Return the results of every search, those of `branch` first, for a structured extractor."""
+            if inputs["search"] is None:
+                raise RuntimeError("Search failed.")
+            ordered = [branch] + [other for other in inputs["search"] if other != branch]
+            candidates = [result for other in ordered if isinstance(inputs["search"][other], list)
+                          for result in inputs["search"][other]]
+            if not candidates:
+                # Surface the error of the branch's own search
+                search_results_for(inputs, branch)
+            return candidates
+
+        def generic_results(inputs, branch):
+            """Return the results of a web-search branch that no structured extractor takes over."""
+            results = search_results_for(inputs, branch)
+            routed = router.classify(results)
+            structured = routed.get(G2_REVIEWS, []) + routed.get(CRUNCHBASE_ORGANIZATION, [])
+            if structured:
+                notify(branch, "info", f"Left {len(structured)} G2 / Crunchbase result(s) to their extractors")
+            return [result for result in results if result not in structured]
+
+        ## EXTRACTING G2 REVIEWS ###
+        async def g2_stage(inputs):
+            notify("g2", "running", "Extracting Insights from G2")
+            g2valid = g2validator(structured_candidates(inputs, "g2"))
+            if not isinstance(g2valid, list):
+                notify("g2", "error", f"{name} Not Found in G2 Reviews")
+                return None
+
+            notify("g2", "info", f"Fetching: {g2valid[0]}")
+            scraper = G2Scraper()
+            product_url = g2valid[0]
+            # Only the fields below are parsed out of the (large) review payload
+            g2Result = await scraper.afetch_reviews(product_url)
+
+            with open(os.path.join(self.output_dir, 'conciseG2.json'), 'w') as json_file:
+                json.dump(g2Result, json_file, indent=4)
+
+            # Competitors only reach the LLM as a precomputed comparison table; one URL per other product
+            competitor_urls, seen = [], {g2_product_slug(product_url)}
+            for url in g2valid[1:]:
+                slug = g2_product_slug(url)
+                if slug not in seen and len(competitor_urls) < self.g2_competitors:
+                    seen.add(slug)
+                    competitor_urls.append(url)
+            if competitor_urls:
+                notify("g2", "info", f"Comparing with {len(competitor_urls)} other G2 product(s)")
+                competitors = await asyncio.gather(*(scraper.afetch_reviews(url) for url in competitor_urls),
+                                                   return_exceptions=True)
+                payloads = [g2Result] + [payload for payload in competitors if isinstance(payload, dict)]
+                comparison = G2Comparison(payloads)
+                if len(comparison.products) > 1:
+                    with open(os.path.join(self.output_dir, 'g2Comparison.md'), 'w') as md_file:
+                        md_file.write(comparison.to_markdown())
+
+            notify("g2", "complete", "Extracted G2 Reviews!")
+            return g2Result
+
+        ## EXTRACTING CRUNCHBASE INSIGHTS ###
+        async def crunchbase_stage(inputs):
+            notify("crunchbase", "running", "Extracting Insights Crunchbase")
+            cbValid = crunchbaseValidator(structured_candidates(inputs, "crunchbase"))
+            if not isinstance(cbValid, list):
+                notify("crunchbase", "error", f"{name} Not Found in Crunchbase")
+                return None
+
+            notify("crunchbase", "info", f"Fetching: {cbValid[0]}")
+            cbValid = crunchbase_aggregator(cbValid)
+            # Parsed with precompiled selectors; the LLM only summarizes subpages that fail to parse
+            await extractCrunchbaseProfile(cbValid, self.api_key, self.domain, self.prompts_file,
+                                           output_dir=self.output_dir, notify=self._toast("crunchbase"),
+                                           dropped=dropped_sources, deduper=deduper)
+            notify("crunchbase", "complete", "Extracted Crunchbase Info")
+            return cbValid
+
+        ## EXTRACTING CONTENT FROM 1ST INSTRUCTION ###
+        async def instruction_1_stage(inputs):
+            notify("instruction_1", "running", f"Searching {llm_result['instruction_1']}")
+            search_results = generic_results(inputs, "instruction_1")
+            await cleanSearchContentA(search_results, self.api_key, self.domain, self.prompts_file,
+                                      output_dir=self.output_dir, notify=self._toast("instruction_1"),
+                                      dropped=dropped_sources, deduper=deduper)
+            notify("instruction_1", "complete", f"Extracted {llm_result['instruction_1']}")
+            return search_results
+
+        ### EXTRACTING CONTENT FROM 2ND INSTRUCTION ###
+        async def instruction_2_stage(inputs):
+            notify("instruction_2", "running", f"Searching {llm_result['instruction_2']}")
+            search_results = generic_results(inputs, "instruction_2")
+            await cleanSearchContentB(search_results, self.api_key, self.domain, self.prompts_file,
+                                      output_dir=self.output_dir, notify=self._toast("instruction_2"),
+                                      dropped=dropped_sources, deduper=deduper)
+            notify("instruction_2", "complete", f"Extracted {llm_result['instruction_2']}")
+            return search_results
+
+        ### FINAL BUSINESS ANALYSIS ###
+        async def business_analysis_stage(inputs):
+            notify("business_analysis", "running", "Performing Analysis")
+            report_path = os.path.join(self.output_dir, "combinedReport.md")
+            if self.analysis_mode == "sectioned":
+                result = await self._sectioned_analysis(name, report_path)
+            else:
+                # Structured G2 / Crunchbase data first, then the summaries, within the token budget
+                budget = min(self.report_token_budget or REPORT_TOKEN_BUDGET,
+                             input_token_budget(self.model, 8192, REPORT_PROMPT_TOKENS))
+                file_reader = FileReader(self.output_dir, token_budget=budget, source_tokens=self.report_source_tokens)
+                file_reader.write_to(report_path)
+                dropped_sources.extend(f"{file_name} (truncated)" for file_name in file_reader.truncated)
+                dropped_sources.extend(f"{file_name} (token budget)" for file_name in file_reader.skipped)
+
+                final_result = SummaryGenerator(self.api_key, self.model, self.domain, self.prompts_file,
+                                                report_path, "business_analysis", skip_chunking=True)
+                result = await final_result.agenerate_summary()
+
+            dropped = [f"{stage} (timed out)" for stage in branches if stage in graph.timed_out] + dropped_sources
+            if result and dropped:
+                result += "\n\n---\nSources left out of this report: " + ", ".join(dropped)
+
+            if result:
+                notify("business_analysis", "complete", "Output Generated")
+            else:
+                notify("business_analysis", "error", "Error in generating output.")
+            return result
+
+        branches = ["g2", "crunchbase", "instruction_1", "instruction_2"]
+        share = self.branch_budget_share
+        graph.add_stage("search", search_stage, budget_share=share)
+        for stage, func in [("g2", g2_stage), ("crunchbase", crunchbase_stage),
+                            ("instruction_1", instruction_1_stage), ("instruction_2", instruction_2_stage)]:
+            graph.add_stage(stage, self._guard(stage, func), depends_on=["search"], budget_share=share)
+        graph.add_stage("business_analysis", self._guard("business_analysis", business_analysis_stage),
+                        depends_on=branches)
+        return graph
+
+    async def _sectioned_analysis(self, name, report_path):
+        """Write the report section by section from the chunks retrieved for each, into `report_path`."""
+        # Imported here so the "full" mode does not load the embedding stack
+        from modules.rag import getEmbeddingModel
+        from modules.sectionedAnalysis import SectionedAnalysis
+
+        embedding_model = await asyncio.to_thread(getEmbeddingModel)
+        analysis = SectionedAnalysis(self.api_key, self.model, self.domain, self.prompts_file, embedding_model,
+                                     top_k=self.rag_top_k)
+        chunks = await asyncio.to_thread(analysis.index_sources, self.output_dir)
+        self.notify("business_analysis", "info", f"Writing {len(analysis.sections)} sections from {chunks} chunks")
+        result = await analysis.agenerate(name)
+        if result:
+            with open(report_path, "w") as md_file:
+                md_file.write(result)
+        return result
+
+    def _toast(self, stage):
+        """Return a single-argument progress callback bound to a stage."""
+        return lambda message: self.notify(stage, "info", message)
+
+    def _guard(self, stage, func):
+        """Report a failed stage through `notify` before re-raising the error."""
+        async def guarded(inputs):
+            try:
+                return await func(inputs)
+            except asyncio.CancelledError:
+                self.notify(stage, "error", "Dropped: latency budget exceeded")
+                raise
+            except Exception as e:
+                self.notify(stage, "error", f"Error: {e}")
+                raise
+        return guarded
+
+    async def arun_analysis(self, llm_result):
+        """
+        Run every extraction branch and the final business analysis for an analyzed query.
+
+        Args:
+            llm_result (dict): Output of `analyze_query`.
+
+        Returns:
+            dict: The final report plus per-stage errors, timings, dropped sources and cache statistics.
+        """
+        dropped_sources = []
+        graph = self.build_graph(llm_result, dropped_sources)
+        # Only a run clears the previous pages; building or inspecting a graph leaves them alone
+        self._clear_output_dir()
+        deadline = Deadline(self.latency_budget) if self.latency_budget else None
+        results = await graph.run(deadline)
+        cache = get_llm_cache()
+        crawl_cache = get_crawl_cache()
+        g2_cache = get_g2_cache()
+        return {
+            "name": llm_result['name'],
+            "analysis": llm_result,
+            "report": results.get("business_analysis"),
+            "errors": {stage: str(error) for stage, error in graph.errors.items()},
+            "timings": {stage: round(seconds, 3) for stage, seconds in graph.timings.items()},
+            "dropped": graph.timed_out + dropped_sources,
+            "llm_cache": cache.stats() if cache else None,
+            "crawl_cache": crawl_cache.stats() if crawl_cache else None,
+            "search_cache": get_search_service().stats(),
+            "g2_cache": g2_cache.stats() if g2_cache else None,
+        }
+
+    async def arun(self, query):
+        """
+        Run the complete flow for a single query.
+
+        Args:
+            query (str): The free-text user query.
+
+        Returns:
+            dict: The query, its analysis, the final report, errors and timings.
+        """
+        self.notify("query_analysis", "running", f"Analyzing query: {query}")
+        llm_result = await asyncio.to_thread(self.analyze_query, query)
+        if not llm_result:
+            self.notify("query_analysis", "error", "Error processing the query.")
+            return {"query": query, "report": None, "errors": {"query_analysis": "Invalid LLM output."}}
+
+        self.notify("query_analysis", "complete", f"Name: {llm_result['name']}")
+        result = await self.arun_analysis(llm_result)
+        result["query"] = query
+        return result
+
+
+async def close_resources():
+    """Close the browsers, HTTP and Groq connections shared by the analyses of the running event loop."""
+    await close_crawler_pool()
+    await close_http_client()
+    await close_groq_clients()
+
+
+_close_at_exit_registered = False
+_close_at_exit_lock = threading.Lock()
+
+
+def close_background_resources_at_exit():
+    """
+    Keep the browsers and connections of the background event loop (`run_sync` / `submit`)
+    alive for the whole process, and close them once when it exits.
+
+    Long-lived front ends such as the Streamlit app run every analysis on that loop, so the
+    warm browser pool is reused across analyses. Safe to call many times.
+    """
+    global _close_at_exit_registered
+    with _close_at_exit_lock:
+        if _close_at_exit_registered:
+            return
+        _close_at_exit_registered = True
+
+    def close():
+        try:
+            run_sync(close_resources())
+        except Exception as e:
+            print(f"Error closing shared resources: {e}")
+
+    atexit.register(close)
+
+
+def _slugify(text):
+    """Turn a query into a folder-safe name."""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower()
+    return slug[:60] or "query"
+
+
+def read_queries(input_file):
+    """
+    Read the queries of a batch file.
+
+    Each line is either a JSON object with a "query" key (JSONL) or a plain text query.
+    Blank lines are ignored.
+
+    Args:
+        input_file (str): Path to the queries file.
+
+    Returns:
+        list: The queries in file order.
+    """
+    queries = []
+    with open(input_file, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('{'):
+                queries.append(json.loads(line)["query"])
+            else:
+                queries.append(line)
+    return queries
+
+
+async def arun_batch(queries, output_file, api_key, prompts_file="prompts.yml", work_dir="scrapPages/batch",
+                     concurrency=4, **pipeline_kwargs):
+    """
+    Analyze many queries with a bounded concurrency level.
+
+    Every query gets its own working folder under `work_dir`, so concurrent analyses never
+    overwrite each other's pages. Results are appended to `output_file` as JSON lines as soon
+    as each analysis finishes.
+
+    Args:
+        queries (list): The queries to analyze.
+        output_file (str): JSONL file receiving one result per query.
+        api_key (str): Groq API key.
+        prompts_file (str): Path to the YAML prompts file.
+        work_dir (str): Parent folder of the per-query working folders.
+        concurrency (int): Maximum number of analyses running at the same time.
+        **pipeline_kwargs: Extra arguments forwarded to `AnalysisPipeline`.
+
+    Returns:
+        int: Number of analyses that produced a report.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def analyze(idx, query):
+        async with semaphore:
+            output_dir = os.path.join(work_dir, f"{idx + 1:04d}_{_slugify(query)}")
+            pipeline = AnalysisPipeline(api_key, prompts_file, output_dir=output_dir, **pipeline_kwargs)
+            try:
+                return await pipeline.arun(query)
+            except Exception as e:
+                return {"query": query, "report": None, "errors": {"pipeline": str(e)}}
+
+    succeeded = 0
+    try:
+        with open(output_file, 'a', encoding='utf-8') as out:
+            tasks = [asyncio.ensure_future(analyze(idx, query)) for idx, query in enumerate(queries)]
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                if result.get("report"):
+                    succeeded += 1
+    finally:
+        # The browsers and connections are shared by every analysis of the batch
+        await close_resources()
+
+    return succeeded
+
+
+def run_batch(queries, output_file, api_key, **kwargs):
+    """
+    Synchronous wrapper around `arun_batch`.
+    """
+    return asyncio.run(arun_batch(queries, output_file, api_key, **kwargs))
@@ -0,0 +1,192 @@
+import os
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from crawl4ai import AsyncWebCrawler
+
+
+class PooledCrawler:
+    """
+    A launched AsyncWebCrawler together with its usage counters.
+
+    Attributes:
+        crawler (AsyncWebCrawler): The started crawler (one headless browser).
+        in_flight (int): Pages currently being crawled with this browser.
+        pages (int): Pages crawled since the browser was launched.
+        retiring (bool): Set once the browser must be recycled; it takes no new pages.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.in_flight = 0
+        self.pages = 0
+        self.retiring = False
+
+    def is_healthy(self):
+        """Check that the underlying browser is still connected."""
+        strategy = getattr(self.crawler, "crawler_strategy", None)
+        browser = getattr(strategy, "browser", None)
+        if browser is None:
+            browser = getattr(getattr(strategy, "browser_manager", None), "browser", None)
+        if browser is not None and hasattr(browser, "is_connected"):
+            return browser.is_connected()
+        return True
+
+
+class CrawlerPool:
+    """
+    A long-lived pool of headless browsers shared by every WebContentCleaner.
+
+    Browsers are launched lazily, each serves up to `contexts_per_browser` pages at the same
+    time, and a browser is closed and replaced after `recycle_after` pages or as soon as it
+    fails a health check, which bounds the memory held by Chromium.
+    """
+
+    def __init__(self, browsers=1, contexts_per_browser=4, recycle_after=50, verbose=False):
+        """
+        Initialize the pool without launching anything yet.
+
+        Args:
+            browsers (int): Maximum number of browsers kept alive.
+            contexts_per_browser (int): Pages crawled concurrently in one browser.
+            recycle_after (int): Pages after which a browser is replaced.
+            verbose (bool): Enables crawl4ai verbose logging.
+        """
+        self.browsers = max(1, browsers)
+        self.contexts_per_browser = max(1, contexts_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.verbose = verbose
+        self.slots = []
+        self.launching = 0
+        self.closed = False
+        self.condition = asyncio.Condition()
+
+    async def _launch(self):
+        """Start a new browser."""
+        crawler = AsyncWebCrawler(verbose=self.verbose)
+        await crawler.__aenter__()
+        return PooledCrawler(crawler)
+
+    async def _shutdown(self, slot):
+        """Close a retired browser, ignoring errors from an already dead process."""
+        try:
+            await slot.crawler.__aexit__(None, None, None)
+        except Exception as e:
+            print(f"Error closing crawler: {e}")
+
+    def _pick(self):
+        """Return the least busy healthy browser with a free context, if any."""
+        available = [slot for slot in self.slots
+                     if not slot.retiring and slot.in_flight < self.contexts_per_browser]
+        return min(available, key=lambda slot: slot.in_flight) if available else None
+
+    async def acquire(self):
+        """
+        Take a context slot, launching a browser when the pool still has room.
+
+        Returns:
+            PooledCrawler: The browser to crawl with; give it back with `release`.
+        """
+        async with self.condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError("Crawler pool is closed.")
+                for slot in list(self.slots):
+                    if not slot.retiring and not slot.is_healthy():
+                        self._retire(slot)
+                slot = self._pick()
+                if slot is not None:
+                    slot.in_flight += 1
+                    return slot
+                if len(self.slots) + self.launching < self.browsers:
+                    self.launching += 1
+                    break
+                await self.condition.wait()
+
+        try:
+            slot = await self._launch()
+        finally:
+            async with self.condition:
+                self.launching -= 1
+                self.condition.notify_all()
+
+        async with self.condition:
+            slot.in_flight += 1
+            self.slots.append(slot)
+            return slot
+
+    def _retire(self, slot):
+        """Stop handing out a browser and close it once its last page is done."""
+        slot.retiring = True
+        if slot.in_flight == 0 and slot in self.slots:
+            self.slots.remove(slot)
+            asyncio.ensure_future(self._shutdown(slot))
+
+    async def release(self, slot):
+        """
+        Give back a context slot and recycle its browser when it is worn out or unhealthy.
+
+        Args:
+            slot (PooledCrawler): The browser returned by `acquire`.
+        """
+        async with self.condition:
+            slot.in_flight -= 1
+            slot.pages += 1
+            if slot.pages >= self.recycle_after or not slot.is_healthy():
+                slot.retiring = True
+            if slot.retiring:
+                self._retire(slot)
+            self.condition.notify_all()
+
+    @asynccontextmanager
+    async def crawler(self):
+        """
+        Borrow a started AsyncWebCrawler for one page.
+
+        Usage:
+            async with pool.crawler() as crawler:
+                result = await crawler.arun(url=url, config=config)
+        """
+        slot = await self.acquire()
+        try:
+            yield slot.crawler
+        finally:
+            await self.release(slot)
+
+    async def close(self):
+        """Close every browser of the pool."""
+        async with self.condition:
+            self.closed = True
+            slots, self.slots = self.slots, []
+            self.condition.notify_all()
+        await asyncio.gather(*(self._shutdown(slot) for slot in slots))
+
+
+_pools = weakref.WeakKeyDictionary()
+
+
+def get_crawler_pool():
+    """
+    Return the crawler pool of the running event loop, creating it on first use.
+
+    Browsers belong to the event loop that launched them, so there is one pool per loop.
+    Sizing comes from CRAWLER_POOL_BROWSERS, CRAWLER_CONTEXTS_PER_BROWSER and
+    CRAWLER_RECYCLE_AFTER.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None or pool.closed:
+        pool = CrawlerPool(
+            browsers=int(os.getenv("CRAWLER_POOL_BROWSERS", "1")),
+            contexts_per_browser=int(os.getenv("CRAWLER_CONTEXTS_PER_BROWSER", "4")),
+            recycle_after=int(os.getenv("CRAWLER_RECYCLE_AFTER", "50")),
+        )
+        _pools[loop] = pool
+    return pool
+
+
+async def close_crawler_pool():
+    """Close the crawler pool of the running event loop, if one was started."""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,177 @@
+import re
+from modules.rateLimiter import estimate_tokens
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character based estimate
+    tiktoken = None
+
+
+# Context window (input + output tokens) of the models used through Groq
+MODEL_CONTEXT_WINDOWS = {
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "gemma2-9b-it": 8192,
+    "mixtral-8x7b-32768": 32768,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Split levels, from the most to the least structural boundary
+HEADING_SPLIT = re.compile(r'\n(?=#{1,6} )')
+PARAGRAPH_SPLIT = re.compile(r'\n\s*\n')
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"\'(\[*-])')
+SPLIT_LEVELS = [(HEADING_SPLIT, "\n"), (PARAGRAPH_SPLIT, "\n\n"), (SENTENCE_SPLIT, " ")]
+
+
+class TokenCounter:
+    """
+    Counts tokens with a local tokenizer.
+
+    Llama 3 uses a tiktoken-based vocabulary, so `cl100k_base` gives close counts for the
+    Groq-hosted models. Without tiktoken installed, a four-characters-per-token estimate is used.
+    """
+
+    def __init__(self, encoding_name="cl100k_base"):
+        """
+        Initialize the counter.
+
+        Args:
+            encoding_name (str): tiktoken encoding used to count tokens.
+        """
+        self.encoding = tiktoken.get_encoding(encoding_name) if tiktoken else None
+
+    def count(self, text):
+        """Returns the number of tokens in the text."""
+        if self.encoding is None:
+            return estimate_tokens(text)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def split(self, text, max_tokens):
+        """Hard-splits text into pieces of at most `max_tokens` tokens."""
+        if self.encoding is None:
+            step = max_tokens * 4
+            return [text[i:i + step] for i in range(0, len(text), step)]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        return [self.encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+_default_counter = None
+
+
+def get_token_counter():
+    """Return the shared TokenCounter, loading the tokenizer on first use."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+
+def context_window(model):
+    """Return the context window of a model, in tokens."""
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def output_token_budget(model, max_tokens):
+    """
+    Tokens reserved for the completion of a chunked request.
+
+    At most a quarter of the context window is kept for the output, so the rest can be
+    filled with input.
+    """
+    return min(max_tokens, context_window(model) // 4)
+
+
+def input_token_budget(model, max_tokens, prompt_tokens, safety_margin=0.1):
+    """
+    Tokens of user content that fit into one request next to the prompt and the output.
+
+    Args:
+        model (str): Target model.
+        max_tokens (int): Requested completion size.
+        prompt_tokens (int): Tokens taken by the system role and prompt template.
+        safety_margin (float): Share of the remaining budget kept free for tokenizer differences.
+
+    Returns:
+        int: The usable input budget in tokens.
+    """
+    available = context_window(model) - output_token_budget(model, max_tokens) - prompt_tokens
+    return max(256, int(available * (1 - safety_margin)))
+
+
+class TokenChunker:
+    """
+    Splits text into chunks packed close to a token budget.
+
+    Text is split on markdown headings first, then on paragraphs, then on sentences; only a
+    single sentence larger than the budget is cut mid-text. The resulting pieces are packed
+    greedily, and every chunk repeats up to `overlap_tokens` of the end of the previous one.
+    """
+
+    def __init__(self, max_tokens, overlap_tokens=200, counter=None):
+        """
+        Initialize the chunker.
+
+        Args:
+            max_tokens (int): Maximum tokens per chunk.
+            overlap_tokens (int): Tokens of context repeated from the previous chunk.
+            counter (TokenCounter): Token counter, the shared one by default.
+        """
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 4)
+        self.counter = counter or get_token_counter()
+
+    def _pieces(self, text, separator, level):
+        """Recursively split text into (piece, separator, tokens) triples that fit the budget."""
+        tokens = self.counter.count(text)
+        if tokens <= self.max_tokens:
+            return [(text, separator, tokens)]
+
+        if level == len(SPLIT_LEVELS):
+            parts = self.counter.split(text, self.max_tokens)
+            return [(part, separator if i == 0 else "", self.counter.count(part)) for i, part in enumerate(parts)]
+
+        pattern, joiner = SPLIT_LEVELS[level]
+        parts = [part for part in pattern.split(text) if part.strip()]
+        if len(parts) <= 1:
+            return self._pieces(text, separator, level + 1)
+
+        pieces = []
+        for i, part in enumerate(parts):
+            pieces.extend(self._pieces(part, separator if i == 0 else joiner, level + 1))
+        return pieces
+
+    def split(self, text):
+        """
+        Split text into chunks of at most `max_tokens` tokens.
+
+        Args:
+            text (str): The text to split.
+
+        Returns:
+            list: The chunks in document order.
+        """
+        pieces = self._pieces(text, "", 0)
+        chunks, current, current_tokens = [], [], 0
+
+        for piece in pieces:
+            _, _, tokens = piece
+            if current and current_tokens + tokens > self.max_tokens:
+                chunks.append(current)
+                # Carry the tail of the previous chunk over as overlap
+                overlap, overlap_tokens = [], 0
+                for previous in reversed(current):
+                    if overlap_tokens + previous[2] > self.overlap_tokens or overlap_tokens + previous[2] + tokens > self.max_tokens:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_tokens += previous[2]
+                current, current_tokens = overlap, overlap_tokens
+            current.append(piece)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+
+        return ["".join((separator if i else "") + part for i, (part, separator, _) in enumerate(chunk))
+                for chunk in chunks]
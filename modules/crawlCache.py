@@ -0,0 +1,258 @@
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from modules.httpClient import get_http_client
+from modules.crawlScheduler import domain_of
+from modules.urlCanonicalizer import canonicalize_url
+
+
+# Freshness of cached pages in seconds, per domain; other domains use the default TTL
+DOMAIN_TTLS = {
+    "crunchbase.com": 24 * 3600,
+    "g2.com": 24 * 3600,
+}
+
+
+class CachedPage:
+    """
+    A crawled page restored from the cache.
+
+    Attributes:
+        url (str): Canonical URL of the page.
+        html (str): Raw HTML of the page.
+        markdown (str): Fit markdown derived from the HTML.
+        etag (str): ETag sent by the server, if any.
+        last_modified (str): Last-Modified header sent by the server, if any.
+        fetched_at (float): When the page was crawled or last revalidated.
+    """
+
+    def __init__(self, url, html, markdown, etag, last_modified, fetched_at):
+        self.url = url
+        self.html = html
+        self.markdown = markdown
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+
+class CrawlCache:
+    """
+    On-disk cache of crawled pages keyed by canonical URL.
+
+    Raw HTML and fit markdown are stored zlib-compressed in SQLite. A page younger than its
+    domain TTL is served directly; an older one is revalidated with a conditional request
+    (If-None-Match / If-Modified-Since) sent to the crawled URL. On a change, the 200 body of
+    that request is reused when it can be extracted without a browser, so a changed page is
+    downloaded once. Pages whose extraction came out empty are never cached.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        default_ttl (float): Freshness of pages from domains without an override, in seconds.
+        domain_ttls (dict): Freshness overrides keyed by domain.
+    """
+
+    def __init__(self, path, default_ttl=6 * 3600, domain_ttls=None):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            default_ttl (float): Freshness of pages from domains without an override, in seconds.
+            domain_ttls (dict): Freshness overrides keyed by domain.
+        """
+        self.path = path
+        self.default_ttl = default_ttl
+        self.domain_ttls = DOMAIN_TTLS if domain_ttls is None else domain_ttls
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.refreshed = 0
+        self.bytes_saved = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, html BLOB, markdown BLOB NOT NULL, etag TEXT, "
+                "last_modified TEXT, html_size INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """Open a connection to the cache database."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    def ttl(self, url):
+        """Return the freshness lifetime of a URL, in seconds."""
+        return self.domain_ttls.get(domain_of(url), self.default_ttl)
+
+    def get(self, url):
+        """
+        Load a cached page, fresh or not.
+
+        Args:
+            url (str): The page URL, canonicalized before lookup.
+
+        Returns:
+            CachedPage: The cached page, or None if the URL was never crawled.
+        """
+        key = canonicalize_url(url)
+        with self.lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT html, markdown, etag, last_modified, fetched_at FROM pages WHERE url = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        html = zlib.decompress(row[0]).decode("utf-8") if row[0] else ""
+        markdown = zlib.decompress(row[1]).decode("utf-8")
+        if not markdown.strip():
+            return None
+        return CachedPage(key, html, markdown, row[2], row[3], row[4])
+
+    def is_fresh(self, page):
+        """Check whether a cached page is still within its domain TTL."""
+        return time.time() - page.fetched_at <= self.ttl(page.url)
+
+    def put(self, url, html, markdown, etag=None, last_modified=None):
+        """
+        Store a freshly crawled page.
+
+        Args:
+            url (str): The page URL, canonicalized before storing.
+            html (str): Raw HTML of the page.
+            markdown (str): Fit markdown derived from the HTML.
+            etag (str): ETag response header, if any.
+            last_modified (str): Last-Modified response header, if any.
+        """
+        if not markdown or not markdown.strip():
+            # A failed extraction must not be served for the whole TTL
+            return
+        html = html or ""
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, html, markdown, etag, last_modified, html_size, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (canonicalize_url(url), zlib.compress(html.encode("utf-8")), zlib.compress(markdown.encode("utf-8")),
+                 etag, last_modified, len(html.encode("utf-8")), time.time()),
+            )
+
+    def _touch(self, page):
+        """Mark a page as fresh again after a successful revalidation."""
+        page.fetched_at = time.time()
+        with self.lock, self._connect() as conn:
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (page.fetched_at, page.url))
+
+    async def revalidate(self, page, url=None, extract=None):
+        """
+        Ask the server whether a stale page changed, using a conditional GET.
+
+        Args:
+            page (CachedPage): The stale cached page.
+            url (str): The URL that was crawled; the canonical key may not be fetchable as is.
+            extract (callable): Turns the response of a changed page into `(html, markdown,
+                headers)`, or returns None when the page needs a browser.
+
+        Returns:
+            CachedPage: `page` when the server answered 304 Not Modified, the page rebuilt from
+            the 200 body when `extract` could use it, or None when it must be crawled.
+        """
+        headers = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        if not headers:
+            return None
+
+        url = url or page.url
+        try:
+            response = await get_http_client().get(url, headers=headers)
+        except Exception as e:
+            print(f"Revalidation failed for {url}: {e}")
+            return None
+
+        if response.status_code == 304:
+            self._touch(page)
+            self.revalidated += 1
+            return page
+        if response.status_code != 200 or extract is None:
+            return None
+
+        fetched = extract(response)
+        if fetched is None or not fetched[1].strip():
+            return None
+        html, markdown, response_headers = fetched
+        etag, last_modified = response_headers.get("etag"), response_headers.get("last-modified")
+        self.put(url, html, markdown, etag, last_modified)
+        self.refreshed += 1
+        return CachedPage(canonicalize_url(url), html, markdown, etag, last_modified, time.time())
+
+    async def lookup(self, url, extract=None):
+        """
+        Return the cached markdown of a page if it can be served without re-rendering.
+
+        Fresh pages are served directly; stale pages are served when the server confirms they
+        did not change, or rebuilt from the body of the revalidation request when they did.
+        Hits, misses and saved bytes are counted.
+
+        Args:
+            url (str): The page URL.
+            extract (callable): See `revalidate`.
+
+        Returns:
+            CachedPage: The usable page, or None when the page must be crawled.
+        """
+        page = self.get(url)
+        if page is not None:
+            usable = page if self.is_fresh(page) else await self.revalidate(page, url, extract)
+            if usable is page:
+                self.hits += 1
+                self.bytes_saved += len(page.html.encode("utf-8"))
+                return page
+            if usable is not None:
+                return usable
+        self.misses += 1
+        return None
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Hits, misses, hit rate, revalidations, pages refreshed from a revalidation and bytes saved.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "revalidated": self.revalidated,
+            "refreshed": self.refreshed,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_crawl_cache():
+    """
+    Return the process-wide crawl cache, or None when it is disabled.
+
+    Configured through CRAWL_CACHE_ENABLED, CRAWL_CACHE_PATH and CRAWL_CACHE_TTL_HOURS.
+    """
+    global _default_cache
+    if os.getenv("CRAWL_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = CrawlCache(
+                os.getenv("CRAWL_CACHE_PATH", os.path.join(".cache", "crawl_cache.sqlite")),
+                default_ttl=float(os.getenv("CRAWL_CACHE_TTL_HOURS", "6")) * 3600,
+            )
+        return _default_cache
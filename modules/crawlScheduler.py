@@ -0,0 +1,138 @@
+import os
+import time
+import asyncio
+import weakref
+from urllib.parse import urlsplit
+from contextlib import asynccontextmanager
+
+
+# Per-domain overrides of (max concurrent requests, min seconds between requests)
+DOMAIN_LIMITS = {
+    "crunchbase.com": (2, 1.5),
+    "g2.com": (1, 2.0),
+}
+
+
+def domain_of(url):
+    """
+    Return the domain used for politeness limits.
+
+    Args:
+        url (str): Any absolute URL.
+
+    Returns:
+        str: The lower-cased host without a leading 'www.'.
+    """
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainState:
+    """Politeness bookkeeping for a single domain."""
+
+    def __init__(self, max_concurrency, min_delay):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.min_delay = min_delay
+        self.lock = asyncio.Lock()
+        self.last_request = 0.0
+
+
+class CrawlScheduler:
+    """
+    Schedules page crawls with a global concurrency cap, a per-domain cap and a minimum delay
+    between two requests to the same domain.
+
+    Pages from different domains run fully in parallel up to the global cap, while many pages
+    from one site (such as the Crunchbase subpages) are spread out politely.
+    """
+
+    def __init__(self, max_concurrency=8, max_per_domain=2, min_delay=1.0, domain_limits=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency (int): Pages crawled at the same time across all domains.
+            max_per_domain (int): Default pages crawled at the same time on one domain.
+            min_delay (float): Default seconds between two requests to one domain.
+            domain_limits (dict): Overrides of `(max_per_domain, min_delay)` keyed by domain.
+        """
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.max_per_domain = max(1, max_per_domain)
+        self.min_delay = min_delay
+        self.domain_limits = DOMAIN_LIMITS if domain_limits is None else domain_limits
+        self.domains = {}
+
+    def _state(self, domain):
+        """Return the politeness state of a domain, creating it on first use."""
+        state = self.domains.get(domain)
+        if state is None:
+            max_per_domain, min_delay = self.domain_limits.get(domain, (self.max_per_domain, self.min_delay))
+            state = DomainState(max_per_domain, min_delay)
+            self.domains[domain] = state
+        return state
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """
+        Wait until `url` may be requested under the global and per-domain limits.
+
+        Usage:
+            async with scheduler.slot(url):
+                await crawl(url)
+        """
+        state = self._state(domain_of(url))
+        async with state.semaphore:
+            async with state.lock:
+                wait = state.last_request + state.min_delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                state.last_request = time.monotonic()
+            async with self.semaphore:
+                yield
+
+    async def crawl_many(self, urls, crawl):
+        """
+        Crawl many URLs concurrently and yield each result as soon as it completes.
+
+        Args:
+            urls (list): The URLs to crawl.
+            crawl (callable): Coroutine function taking a URL and returning its result.
+
+        Yields:
+            tuple: `(url, result, error)` where exactly one of result or error is set.
+        """
+        async def run(url):
+            try:
+                async with self.slot(url):
+                    return url, await crawl(url), None
+            except Exception as e:
+                return url, None, e
+
+        tasks = [asyncio.ensure_future(run(url)) for url in urls]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+_schedulers = weakref.WeakKeyDictionary()
+
+
+def get_crawl_scheduler():
+    """
+    Return the crawl scheduler of the running event loop, creating it on first use.
+
+    Limits come from CRAWL_MAX_CONCURRENCY, CRAWL_MAX_PER_DOMAIN and CRAWL_DOMAIN_DELAY.
+    """
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        scheduler = CrawlScheduler(
+            max_concurrency=int(os.getenv("CRAWL_MAX_CONCURRENCY", "8")),
+            max_per_domain=int(os.getenv("CRAWL_MAX_PER_DOMAIN", "2")),
+            min_delay=float(os.getenv("CRAWL_DOMAIN_DELAY", "1.0")),
+        )
+        _schedulers[loop] = scheduler
+    return scheduler
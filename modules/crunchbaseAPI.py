@@ -1,5 +1,5 @@
 from crawlbase import CrawlingAPI
-from bs4 import BeautifulSoup
+from modules.crunchbaseExtractor import scrape_data_html
 
 def crawl(page_url, api_token):
  # Initialize the CrawlingAPI object with your token
@@ -19,43 +19,8 @@ def crawl(page_url, api_token):
 
 def scrape_data(response):
  try:
-  # Parse the HTML content using Beautiful Soup
-  soup = BeautifulSoup(response['body'], 'html.parser')
-
-  # Extract the title of the Crunchbase page
-  title = soup.find('h1', class_='profile-name').get_text(strip=True)
-
-  # Extract the description of the Crunchbase page
-  description = soup.find('span', class_='description').get_text(strip=True)
-
-  # Extract the location of the Crunchbase page
-  location = soup.select_one('.section-content-wrapper li.ng-star-inserted').text.strip()
-
-  # Extract the employees of the Crunchbase page
-  employees = soup.select_one('.section-content-wrapper li.ng-star-inserted:nth-of-type(2)').text.strip()
-
-  # Extract the Company URL of the Crunchbase page
-  company_url = soup.select_one('.section-content-wrapper li.ng-star-inserted:nth-of-type(5) a[role="link"]')['href']
-
-  # Extract the Rank of the Crunchbase page
-  rank = soup.select_one('.section-content-wrapper li.ng-star-inserted:nth-of-type(6) span').text.strip()
-
-  # Extract the Founded Date of the Crunchbase page
-  founded = soup.select_one('.mat-mdc-card.mdc-card .text_and_value li:nth-of-type(4) field-formatter').text.strip()
-
-  # Extract the Founders of the Crunchbase page
-  founders = soup.select_one('.mat-mdc-card.mdc-card .text_and_value li:nth-of-type(5) field-formatter').text.strip()
-
-  return {
-   'title': title,
-   'description': description,
-   'location': location,
-   'employees': employees,
-   'company_url': company_url,
-   'rank': rank,
-   'founded': founded,
-   'founders': founders,
-  }
+  # Parse the HTML content with lxml and the precompiled Crunchbase selectors
+  return scrape_data_html(response['body'])
  except Exception as e:
   print(f"An error occurred: {e}")
   return {}
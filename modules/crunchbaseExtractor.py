@@ -0,0 +1,294 @@
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import lxml.html
+from lxml import etree
+from pydantic import BaseModel, Field
+
+
+class CrunchbaseOverview(BaseModel):
+    title: Optional[str] = Field(None, description="Name of the organization.")
+    description: Optional[str] = Field(None, description="Short description of the organization.")
+    location: Optional[str] = Field(None, description="Headquarters location.")
+    employees: Optional[str] = Field(None, description="Employee count range.")
+    company_url: Optional[str] = Field(None, description="Website of the organization.")
+    rank: Optional[str] = Field(None, description="Crunchbase rank.")
+    founded: Optional[str] = Field(None, description="Founding date.")
+    founders: Optional[str] = Field(None, description="Founders of the organization.")
+    operating_status: Optional[str] = Field(None, description="Active, closed, acquired...")
+
+
+class CrunchbaseFinancials(BaseModel):
+    total_funding: Optional[str] = Field(None, description="Total funding amount.")
+    funding_rounds: Optional[str] = Field(None, description="Number of funding rounds.")
+    last_funding_type: Optional[str] = Field(None, description="Type of the last funding round.")
+    investors_count: Optional[str] = Field(None, description="Number of investors.")
+    lead_investors: Optional[str] = Field(None, description="Number or names of lead investors.")
+    ipo_status: Optional[str] = Field(None, description="Public or private.")
+    acquired_by: Optional[str] = Field(None, description="Acquirer, if any.")
+
+
+class CrunchbasePerson(BaseModel):
+    name: str = Field(..., description="Name of the person.")
+    title: Optional[str] = Field(None, description="Role in the organization.")
+
+
+class CrunchbaseTechnology(BaseModel):
+    active_tech_count: Optional[str] = Field(None, description="Number of technologies in use.")
+    monthly_visits: Optional[str] = Field(None, description="Monthly website visits.")
+    monthly_visits_growth: Optional[str] = Field(None, description="Growth of the monthly visits.")
+    technologies: List[str] = Field(default_factory=list, description="Technologies in use.")
+
+
+class CrunchbaseNewsItem(BaseModel):
+    title: str = Field(..., description="Headline of the article.")
+    url: Optional[str] = Field(None, description="Link to the article.")
+    date: Optional[str] = Field(None, description="Publication date.")
+    publisher: Optional[str] = Field(None, description="Publisher of the article.")
+
+
+class CrunchbaseProfile(BaseModel):
+    url: str = Field(..., description="Crunchbase organization URL.")
+    overview: CrunchbaseOverview = Field(default_factory=CrunchbaseOverview)
+    financials: CrunchbaseFinancials = Field(default_factory=CrunchbaseFinancials)
+    people: List[CrunchbasePerson] = Field(default_factory=list)
+    technology: CrunchbaseTechnology = Field(default_factory=CrunchbaseTechnology)
+    news: List[CrunchbaseNewsItem] = Field(default_factory=list)
+    similar_companies: List[str] = Field(default_factory=list)
+    details: Dict[str, str] = Field(default_factory=dict, description="Every labelled field found on the pages.")
+
+
+# Subpages built by `crunchbase_aggregator` and the profile section each one feeds
+SUBPAGE_SECTIONS = {
+    "company_financials": "financials",
+    "people": "people",
+    "technology": "technology",
+    "signals_and_news": "news",
+    "org_similarity_overview": "similar_companies",
+}
+
+# Normalized field labels shown on Crunchbase, mapped to (section, schema field)
+FIELD_LABELS = {
+    "headquarters location": ("overview", "location"),
+    "location": ("overview", "location"),
+    "number of employees": ("overview", "employees"),
+    "founded date": ("overview", "founded"),
+    "founders": ("overview", "founders"),
+    "operating status": ("overview", "operating_status"),
+    "cb rank (company)": ("overview", "rank"),
+    "total funding amount": ("financials", "total_funding"),
+    "number of funding rounds": ("financials", "funding_rounds"),
+    "last funding type": ("financials", "last_funding_type"),
+    "funding status": ("financials", "last_funding_type"),
+    "number of investors": ("financials", "investors_count"),
+    "number of lead investors": ("financials", "lead_investors"),
+    "lead investors": ("financials", "lead_investors"),
+    "ipo status": ("financials", "ipo_status"),
+    "acquired by": ("financials", "acquired_by"),
+    "active tech count": ("technology", "active_tech_count"),
+    "monthly visits": ("technology", "monthly_visits"),
+    "monthly visits growth": ("technology", "monthly_visits_growth"),
+}
+
+
+# Organization slug of a profile URL, and links to the root of a profile (not to one of its tabs)
+ORGANIZATION_SLUG = re.compile(r"/organization/([^/?#]+)")
+ORGANIZATION_LINK = re.compile(r"^/organization/([^/?#]+)/?$")
+
+
+def _class(name):
+    """XPath predicate matching an element carrying the CSS class `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _text(node):
+    """Whitespace-normalized text content of an element."""
+    return " ".join(node.text_content().split()) if node is not None else ""
+
+
+class CrunchbaseExtractor:
+    """
+    Parses rendered Crunchbase organization pages into a typed `CrunchbaseProfile`.
+
+    The selectors of the original `scrape_data` parser, plus the labelled fields, people,
+    news and technology lists of the subpages, are compiled once into lxml XPath objects, so
+    each page is parsed with a single lxml tree and no LLM call. Sections that fail to parse
+    are reported by `missing_sections` so the caller can fall back to LLM summarization.
+    """
+
+    TITLE = etree.XPath(f"//h1[{_class('profile-name')}]")
+    DESCRIPTION = etree.XPath(f"//span[{_class('description')}]")
+    OVERVIEW_ITEMS = etree.XPath(f"//*[{_class('section-content-wrapper')}]//li[{_class('ng-star-inserted')}]")
+    LINK = etree.XPath(".//a[@role='link']/@href")
+    FIELD_ITEMS = etree.XPath(f"//ul[{_class('text_and_value')}]/li")
+    FIELD_LABEL = etree.XPath(f".//label-with-info | .//*[{_class('wrappable-label-with-info')}]")
+    FIELD_VALUE = etree.XPath(".//field-formatter")
+    PERSON_CARDS = etree.XPath("//image-with-fields-card[.//a[contains(@href, '/person/')]]")
+    PERSON_NAME = etree.XPath(".//a[contains(@href, '/person/')]")
+    NEWS_ITEMS = etree.XPath("//press-reference")
+    NEWS_LINK = etree.XPath(".//a[starts-with(@href, 'http')]")
+    NEWS_DATE = etree.XPath(".//*[contains(@class, 'date')] | .//field-formatter")
+    TECHNOLOGIES = etree.XPath("//a[contains(@href, '/technology/') or contains(@href, '/product/')]")
+    ORGANIZATIONS = etree.XPath("//a[contains(@href, '/organization/')]")
+
+    @staticmethod
+    def section_of(url):
+        """
+        Return the profile section a Crunchbase subpage feeds.
+
+        Args:
+            url (str): A URL built by `crunchbase_aggregator`.
+
+        Returns:
+            str: The section name, or None for the organization root page.
+        """
+        return SUBPAGE_SECTIONS.get(urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1])
+
+    def _overview(self, root, overview):
+        """Fill the header fields shared by every organization page, using the original selectors."""
+        if not overview.title:
+            overview.title = _text(next(iter(self.TITLE(root)), None)) or None
+        if not overview.description:
+            overview.description = _text(next(iter(self.DESCRIPTION(root)), None)) or None
+
+        items = self.OVERVIEW_ITEMS(root)
+        if len(items) >= 2:
+            overview.location = overview.location or _text(items[0]) or None
+            overview.employees = overview.employees or _text(items[1]) or None
+        if len(items) >= 5 and not overview.company_url:
+            links = self.LINK(items[4])
+            overview.company_url = links[0] if links else None
+        if len(items) >= 6 and not overview.rank:
+            overview.rank = _text(items[5]) or None
+
+    def _fields(self, root, profile, section):
+        """
+        Keep every labelled field of the page in `details`, and map onto the schema only the
+        fields of the section this page feeds, so a subpage never marks another section as
+        parsed. Overview fields are shared by every page: the first page showing one fills it,
+        as the pipeline only crawls the subpages built by `crunchbase_aggregator`.
+        """
+        for item in self.FIELD_ITEMS(root):
+            labels, values = self.FIELD_LABEL(item), self.FIELD_VALUE(item)
+            if not labels or not values:
+                continue
+            label, value = _text(labels[0]), _text(values[0])
+            if not label or not value:
+                continue
+            profile.details.setdefault(label, value)
+            target = FIELD_LABELS.get(label.lower())
+            if target is not None and target[0] in ("overview", section):
+                group = getattr(profile, target[0])
+                if getattr(group, target[1]) is None:
+                    setattr(group, target[1], value)
+
+    def _people(self, root):
+        """Parse the people cards of the /people subpage."""
+        people = []
+        for card in self.PERSON_CARDS(root):
+            name = _text(next(iter(self.PERSON_NAME(card)), None))
+            roles = [_text(value) for value in self.FIELD_VALUE(card) if _text(value) and _text(value) != name]
+            if name:
+                people.append(CrunchbasePerson(name=name, title=roles[0] if roles else None))
+        return people
+
+    def _news(self, root):
+        """Parse the press references of the /signals_and_news subpage."""
+        news = []
+        for item in self.NEWS_ITEMS(root):
+            link = next(iter(self.NEWS_LINK(item)), None)
+            title = _text(link)
+            if not title:
+                continue
+            dates = [_text(node) for node in self.NEWS_DATE(item) if _text(node) and _text(node) != title]
+            publisher = urlsplit(link.get("href")).hostname
+            news.append(CrunchbaseNewsItem(title=title, url=link.get("href"), date=dates[0] if dates else None,
+                                           publisher=publisher))
+        return news
+
+    def _similar(self, root, url, exclude=()):
+        """Names of the other organizations linked from the /org_similarity_overview subpage."""
+        own = ORGANIZATION_SLUG.search(urlsplit(url).path)
+        own_slug = own.group(1).lower() if own else None
+        names = []
+        for node in self.ORGANIZATIONS(root):
+            link = ORGANIZATION_LINK.search(urlsplit(node.get("href", "")).path)
+            name = _text(node)
+            if (link is None or link.group(1).lower() == own_slug or not name or name in names
+                    or name in exclude):
+                continue
+            names.append(name)
+        return names
+
+    def _names(self, xpath, root, exclude=()):
+        """Distinct link texts matched by `xpath`."""
+        names = []
+        for node in xpath(root):
+            name = _text(node)
+            if name and name not in names and name not in exclude:
+                names.append(name)
+        return names
+
+    def extract(self, html, url, profile):
+        """
+        Parse one rendered Crunchbase page into `profile`.
+
+        Args:
+            html (str): Rendered HTML of the page.
+            url (str): URL of the page, which decides the section it feeds.
+            profile (CrunchbaseProfile): The profile being filled.
+
+        Returns:
+            bool: True when the section of this page could be parsed.
+        """
+        root = lxml.html.fromstring(html)
+        section = self.section_of(url)
+        self._overview(root, profile.overview)
+        self._fields(root, profile, section)
+
+        if section == "people":
+            profile.people = profile.people or self._people(root)
+        elif section == "news":
+            profile.news = profile.news or self._news(root)
+        elif section == "technology":
+            profile.technology.technologies = (profile.technology.technologies
+                                               or self._names(self.TECHNOLOGIES, root))
+        elif section == "similar_companies":
+            exclude = {profile.overview.title} if profile.overview.title else set()
+            profile.similar_companies = profile.similar_companies or self._similar(root, url, exclude)
+        return section is None or section not in self.missing_sections(profile)
+
+    @staticmethod
+    def missing_sections(profile):
+        """
+        List the sections of a profile that hold no data.
+
+        Args:
+            profile (CrunchbaseProfile): The profile to check.
+
+        Returns:
+            list: Names of the empty sections.
+        """
+        missing = []
+        for section in SUBPAGE_SECTIONS.values():
+            value = getattr(profile, section)
+            if isinstance(value, BaseModel):
+                value = [field for field in value.model_dump().values() if field]
+            if not value:
+                missing.append(section)
+        return missing
+
+
+def scrape_data_html(html):
+    """
+    Parse the header fields of a Crunchbase organization page.
+
+    Args:
+        html (str): Rendered HTML of the page.
+
+    Returns:
+        dict: Title, description, location, employees, company URL, rank, founded date and founders.
+    """
+    profile = CrunchbaseProfile(url="")
+    CrunchbaseExtractor().extract(html, "", profile)
+    return profile.overview.model_dump(exclude={"operating_status"})
@@ -0,0 +1,209 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Persistent store of chunk embeddings keyed by a hash of the model and the chunk text.
+
+    Vectors are kept as raw float32 blobs in SQLite, so an unchanged chunk is never embedded
+    twice, across runs and across documents.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+    """
+
+    # SQLite limits the number of bound parameters of a single statement
+    LOOKUP_BATCH = 500
+
+    def __init__(self, path):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): Path of the SQLite database file.
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connect(self):
+        """Open a connection to the cache database."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(model_name, text):
+        """
+        Build the content address of a chunk embedding.
+
+        Returns:
+            str: SHA-256 hex digest of the model name and the chunk text.
+        """
+        return hashlib.sha256(f"{model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Look up several embeddings at once.
+
+        Args:
+            keys (list): Content addresses built by `make_key`.
+
+        Returns:
+            dict: float32 vectors keyed by the content addresses that were found.
+        """
+        found = {}
+        with self.lock, self._connect() as conn:
+            for start in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[start:start + self.LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Store several embeddings at once.
+
+        Args:
+            items (dict): Vectors keyed by content address.
+        """
+        with self.lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+            )
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Hits, misses and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class EmbeddingService:
+    """
+    Batched, cached text embedding on top of a SentenceTransformer-like model.
+
+    Cached chunks are served from the `EmbeddingCache`; the others are sorted by length, so
+    every batch holds texts of similar size and little padding, and encoded in batches of
+    `batch_size` in one `encode` call instead of one forward pass per chunk.
+
+    Attributes:
+        model: Object exposing `encode(texts, batch_size=...)`.
+        model_name (str): Identifies the model in the cache keys.
+        batch_size (int): Number of texts per forward pass.
+        cache (EmbeddingCache): Persistent embedding store, or None to disable caching.
+    """
+
+    def __init__(self, model, model_name=None, batch_size=32, cache=None):
+        """
+        Initialize the service.
+
+        Args:
+            model: Object exposing `encode(texts, batch_size=...)`.
+            model_name (str): Identifies the model in the cache keys; derived from the model if None.
+            batch_size (int): Number of texts per forward pass.
+            cache (EmbeddingCache): Persistent embedding store, or None to disable caching.
+        """
+        self.model = model
+        self.model_name = model_name or self._model_name(model)
+        self.batch_size = max(1, batch_size)
+        self.cache = cache
+
+    @staticmethod
+    def _model_name(model):
+        """Best-effort identifier of a SentenceTransformer model."""
+        name = getattr(getattr(model, "tokenizer", None), "name_or_path", None)
+        dimension = getattr(model, "get_sentence_embedding_dimension", lambda: None)()
+        return f"{name or type(model).__name__}:{dimension}"
+
+    def _encode(self, texts):
+        """Encode texts in length-sorted batches and return the vectors in the input order."""
+        order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+        encoded = np.asarray(self.model.encode([texts[idx] for idx in order], batch_size=self.batch_size),
+                             dtype=np.float32)
+        vectors = np.empty_like(encoded)
+        vectors[order] = encoded
+        return vectors
+
+    def embed(self, texts):
+        """
+        Embed a list of texts.
+
+        Args:
+            texts (list): The chunks to embed.
+
+        Returns:
+            np.ndarray: `(len(texts), d)` float32 matrix aligned with `texts`.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if self.cache is None:
+            return self._encode(texts)
+
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
+
+        # Encode each distinct missing chunk once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            encoded = self._encode(list(missing.values()))
+            fresh = dict(zip(missing, encoded))
+            self.cache.put_many(fresh)
+            found.update(fresh)
+        return np.vstack([found[key] for key in keys])
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_embedding_cache():
+    """
+    Return the process-wide embedding cache, or None when it is disabled.
+
+    Configured through EMBEDDING_CACHE_ENABLED and EMBEDDING_CACHE_PATH.
+    """
+    global _default_cache
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache(
+                os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embedding_cache.sqlite"))
+            )
+        return _default_cache
+
+
+def get_embedding_service(model):
+    """
+    Return a cached embedding service for a model, batched by EMBEDDING_BATCH_SIZE.
+
+    Args:
+        model: A SentenceTransformer-like model.
+
+    Returns:
+        EmbeddingService: The service wrapping the model.
+    """
+    return EmbeddingService(model, batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+                            cache=get_embedding_cache())
@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from modules.urlCanonicalizer import canonicalize_url
+
+
+class G2ReviewCache:
+    """
+    On-disk cache of projected G2 review payloads keyed by canonical product URL.
+
+    Only the fields kept by the pipeline are stored, so an entry is a few kilobytes even for
+    products whose full review payload weighs megabytes.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        ttl (float): Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, path, ttl=24 * 3600):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            ttl (float): Lifetime of an entry in seconds.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                "url TEXT PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """Open a connection to the cache database."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, product_url):
+        """
+        Look up the projected reviews of a product.
+
+        Args:
+            product_url (str): The G2 product reviews page URL.
+
+        Returns:
+            dict: The cached fields, or None on a miss or an expired entry.
+        """
+        with self.lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, fetched_at FROM reviews WHERE url = ?", (canonicalize_url(product_url),)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, product_url, payload):
+        """
+        Store the projected reviews of a product.
+
+        Args:
+            product_url (str): The G2 product reviews page URL.
+            payload (dict): The projected fields.
+        """
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reviews (url, payload, fetched_at) VALUES (?, ?, ?)",
+                (canonicalize_url(product_url), json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Hits, misses and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_g2_cache():
+    """
+    Return the process-wide G2 review cache, or None when it is disabled.
+
+    Configured through G2_CACHE_ENABLED, G2_CACHE_PATH and G2_CACHE_TTL_HOURS.
+    """
+    global _default_cache
+    if os.getenv("G2_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = G2ReviewCache(
+                os.getenv("G2_CACHE_PATH", os.path.join(".cache", "g2_cache.sqlite")),
+                ttl=float(os.getenv("G2_CACHE_TTL_HOURS", "24")) * 3600,
+            )
+        return _default_cache
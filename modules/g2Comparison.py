@@ -0,0 +1,200 @@
+import re
+import numpy as np
+
+
+# Keys that may hold the label or the value of one entry of a G2 ratings / sentiments list
+LABEL_KEYS = ("name", "label", "title", "feature", "stars", "rating")
+VALUE_KEYS = ("count", "value", "score", "percentage", "percent", "total")
+
+NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def to_number(value):
+    """
+    Read a number out of a G2 field such as `4.5`, `"1,234"` or `"87%"`.
+
+    Args:
+        value: Any JSON scalar.
+
+    Returns:
+        float: The number, or NaN when there is none.
+    """
+    if isinstance(value, bool) or value is None:
+        return np.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value).replace(",", ""))
+    return float(match.group(0)) if match else np.nan
+
+
+def labelled_values(entries):
+    """
+    Normalize a G2 ratings or sentiments field into `(label, value)` pairs.
+
+    G2 payloads carry these fields either as `{label: value}` objects or as lists of small
+    objects such as `{"name": "Ease of Use", "count": 120}`; both shapes are accepted.
+
+    Args:
+        entries (dict | list): The raw field.
+
+    Returns:
+        list: `(label, value)` pairs with numeric values.
+    """
+    if isinstance(entries, dict):
+        return [(str(label), to_number(value)) for label, value in entries.items()
+                if not isinstance(value, (dict, list))]
+
+    pairs = []
+    for entry in entries or []:
+        if not isinstance(entry, dict):
+            continue
+        label = next((entry[key] for key in LABEL_KEYS if key in entry), None)
+        value = next((entry[key] for key in VALUE_KEYS if key in entry), None)
+        if label is not None and value is not None:
+            pairs.append((str(label), to_number(value)))
+    return pairs
+
+
+def _columns(rows):
+    """Stack per-product `(label, value)` pairs into a products x labels matrix, NaN where missing."""
+    labels = []
+    for pairs in rows:
+        for label, _ in pairs:
+            if label not in labels:
+                labels.append(label)
+    index = {label: idx for idx, label in enumerate(labels)}
+    matrix = np.full((len(rows), len(labels)), np.nan)
+    for row, pairs in enumerate(rows):
+        for label, value in pairs:
+            matrix[row, index[label]] = value
+    return labels, matrix
+
+
+class G2Comparison:
+    """
+    Columnar comparison of the G2 data of a product and its competitors.
+
+    Every payload is loaded once into NumPy arrays (one row per product), and all comparisons
+    are vectorized over those arrays, so dozens of products cost about as much as one. The
+    LLM receives the resulting compact markdown tables instead of one raw JSON blob per product.
+
+    Attributes:
+        products (list): Product names; the first one is the analyzed product.
+        star_rating (np.ndarray): Overall star rating per product.
+        reviews_count (np.ndarray): Number of reviews per product.
+        rating_labels (list): Columns of `ratings`, such as the star levels.
+        ratings (np.ndarray): Products x rating labels matrix of review counts.
+        sentiment_labels (list): Columns of `sentiments`, one per feature.
+        sentiments (np.ndarray): Products x features matrix of sentiment scores.
+    """
+
+    def __init__(self, payloads):
+        """
+        Load projected G2 payloads into columnar arrays.
+
+        Payloads whose `productName` was already seen are dropped, so a product is never
+        compared with itself.
+
+        Args:
+            payloads (list): Dictionaries with the G2 fields, the analyzed product first.
+        """
+        unique, seen = [], set()
+        for payload in payloads:
+            name = str(payload.get("productName") or "").strip().lower()
+            if name and name in seen:
+                continue
+            seen.add(name)
+            unique.append(payload)
+        payloads = unique
+
+        self.products = [payload.get("productName") or f"Product {idx + 1}" for idx, payload in enumerate(payloads)]
+        self.star_rating = np.array([to_number(payload.get("starRating")) for payload in payloads], dtype=float)
+        self.reviews_count = np.array([to_number(payload.get("reviewsCount")) for payload in payloads], dtype=float)
+        self.rating_labels, self.ratings = _columns([labelled_values(payload.get("ratings")) for payload in payloads])
+        self.sentiment_labels, self.sentiments = _columns(
+            [labelled_values(payload.get("sentiments")) for payload in payloads])
+
+    def rating_distribution(self):
+        """
+        Share of each rating label in the reviews of every product.
+
+        Returns:
+            np.ndarray: Products x rating labels matrix whose rows sum to 1 (NaN without data).
+        """
+        totals = np.nansum(self.ratings, axis=1, keepdims=True)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(totals > 0, self.ratings / totals, np.nan)
+
+    def sentiment_deltas(self):
+        """
+        Feature sentiment of every product relative to the analyzed product.
+
+        Returns:
+            np.ndarray: Products x features matrix; positive values mean a competitor scores higher.
+        """
+        return self.sentiments - self.sentiments[:1]
+
+    def feature_ranks(self):
+        """
+        Rank of every product on each feature, 1 being the best score.
+
+        Returns:
+            np.ndarray: Products x features matrix of ranks; missing scores rank last.
+        """
+        scores = np.where(np.isnan(self.sentiments), -np.inf, self.sentiments)
+        order = np.argsort(-scores, axis=0, kind="stable")
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(self.products) + 1)[:, None], axis=0)
+        return ranks
+
+    @staticmethod
+    def _table(header, rows):
+        """Render a markdown table."""
+        lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _fmt(value, pattern="{:.2f}"):
+        """Format a number, leaving missing values blank."""
+        return "" if np.isnan(value) else pattern.format(value)
+
+    def to_markdown(self):
+        """
+        Render the comparison as compact markdown tables for the LLM.
+
+        Returns:
+            str: Overview, rating distribution and feature sentiment tables.
+        """
+        sections = ["# G2 Competitor Comparison",
+                    f"Analyzed product: {self.products[0]}; compared with: {', '.join(self.products[1:])}."]
+
+        overview = [[name, self._fmt(star), self._fmt(count, "{:.0f}"),
+                     self._fmt(star - self.star_rating[0], "{:+.2f}")]
+                    for name, star, count in zip(self.products, self.star_rating, self.reviews_count)]
+        sections.append(self._table(["Product", "Stars", "Reviews", "Stars vs. analyzed"], overview))
+
+        if self.rating_labels:
+            distribution = self.rating_distribution() * 100
+            rows = [[name] + [self._fmt(value, "{:.1f}%") for value in row]
+                    for name, row in zip(self.products, distribution)]
+            sections.append("## Rating distribution\n" + self._table(["Product"] + self.rating_labels, rows))
+
+        if self.sentiment_labels:
+            deltas, ranks = self.sentiment_deltas(), self.feature_ranks()
+            rows = []
+            for idx, label in enumerate(self.sentiment_labels):
+                cells = [label]
+                for product in range(len(self.products)):
+                    value = self.sentiments[product, idx]
+                    if np.isnan(value):
+                        cells.append("")
+                    elif product == 0 or np.isnan(deltas[product, idx]):
+                        cells.append(f"{value:g} (#{ranks[product, idx]})")
+                    else:
+                        cells.append(f"{value:g} ({deltas[product, idx]:+g}, #{ranks[product, idx]})")
+                rows.append(cells)
+            sections.append("## Feature sentiment (delta vs. analyzed, rank)\n"
+                            + self._table(["Feature"] + self.products, rows))
+
+        return "\n\n".join(sections) + "\n"
@@ -0,0 +1,42 @@
+import os
+import asyncio
+import weakref
+import httpx
+
+
+# Browser-like headers so static fetches get the same page a visitor would
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client():
+    """
+    Return the pooled httpx.AsyncClient of the running event loop, creating it on first use.
+
+    The client keeps connections alive between requests, follows redirects and applies the
+    HTTP_TIMEOUT (seconds) read from the environment.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            timeout=float(os.getenv("HTTP_TIMEOUT", "15")),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Close the HTTP client of the running event loop, if one was created."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,9 +1,11 @@
 import os
 import yaml
-from modules.llm import GroqClient, GroqCompletion
+import asyncio
+from modules.llm import GroqCompletion, get_groq_client, run_sync, SYSTEM_ROLE
+from modules.chunker import TokenChunker, get_token_counter, input_token_budget, output_token_budget
 
 class SummaryGenerator:
-    def __init__(self, api_key, model, domain, prompt_template_file, user_content_file, prompt_key='summarize_text', temperature=0, max_tokens=8192, top_p=1, stream=True, stop=None, skip_chunking=False):
+    def __init__(self, api_key, model, domain, prompt_template_file, user_content_file, prompt_key='summarize_text', temperature=0, max_tokens=8192, top_p=1, stream=True, stop=None, skip_chunking=False, chunk_tokens=None, chunk_overlap=200, map_concurrency=4, max_summary_lines=100, max_reduce_rounds=5):
         # Initialize the class with parameters
         self.api_key = api_key
         self.model = model
@@ -17,10 +19,20 @@ class SummaryGenerator:
         self.stream = stream
         self.stop = stop
         self.skip_chunking = skip_chunking  # Flag to skip chunking and resummarizing
+        self.map_concurrency = map_concurrency  # Chunk summaries generated at the same time
+        self.max_summary_lines = max_summary_lines  # Reduce until the summary is at most this many lines
+        self.max_reduce_rounds = max_reduce_rounds  # Safety bound on the depth of the reduce tree
 
         # Read the prompt template from YAML file
         self.prompt_template = self._read_prompt_template()
 
+        # Size chunks from the model context window, leaving room for the prompt and the output
+        self.counter = get_token_counter()
+        prompt_tokens = self.counter.count(SYSTEM_ROLE + self.prompt_template)
+        self.chunk_tokens = chunk_tokens or input_token_budget(model, max_tokens, prompt_tokens)
+        self.output_tokens = output_token_budget(model, max_tokens)
+        self.chunker = TokenChunker(self.chunk_tokens, chunk_overlap, self.counter)
+
         # Read the user content from the markdown file
         self.user_content = self._read_user_content()
 
@@ -45,82 +57,125 @@ class SummaryGenerator:
         """Returns the number of lines in the provided text."""
         return len(text.splitlines())
 
-    def _split_into_chunks(self, text, max_length=15000):
-        """Splits the text into chunks of a maximum length."""
-        return [text[i:i + max_length] for i in range(0, len(text), max_length)]
+    def _split_into_chunks(self, text):
+        """Splits the text on structural boundaries into chunks that fit the token budget."""
+        return self.chunker.split(text)
 
-    def _summarize_chunk(self, chunk):
-        """Generates a summary for a single chunk of content."""
-        # Initialize the GroqClient with the provided API key
-        groq_client = GroqClient(self.api_key)
+    def _completion(self, chunk):
+        """Builds the completion request for a single chunk of content."""
+        # Reuse the pooled GroqClient shared by the whole process
+        groq_client = get_groq_client(self.api_key)
 
         # Create an instance of GroqCompletion with the specified parameters
-        groq_completion = GroqCompletion(
+        return GroqCompletion(
             groq_client, 
             self.model, 
             self.domain, 
             self.prompt_template, 
             chunk, 
             self.temperature, 
-            self.max_tokens, 
+            self.max_tokens if self.skip_chunking else self.output_tokens, 
             self.top_p, 
             self.stream, 
             self.stop
         )
 
-        # Generate the completion using the provided content
-        return groq_completion.create_completion()
-
-    def generate_summary(self):
-        """Generates a summary for the user content."""
+    async def _summarize_chunk(self, chunk):
+        """Generates a summary for a single chunk of content."""
+        # Generate the completion without blocking the event loop
+        return await self._completion(chunk).acreate_completion()
+
+    def _write_summary(self, summary):
+        """Writes the summary back to the user content file."""
+        with open(self.user_content_file, 'w') as file:
+            file.write(summary)
+
+    def _fits(self, text):
+        """Checks whether a summary is small enough to be used as the final result."""
+        return self._line_count(text) <= self.max_summary_lines and self.counter.count(text) <= self.chunk_tokens
+
+    async def _summarize_many(self, chunks):
+        """Summarizes several chunks concurrently, keeping their order."""
+        semaphore = asyncio.Semaphore(max(1, self.map_concurrency))
+
+        async def summarize(chunk):
+            async with semaphore:
+                return await self._summarize_chunk(chunk)
+
+        return await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+
+    def _group_summaries(self, summaries):
+        """
+        Packs consecutive summaries into groups that fit a single summarization call.
+
+        Summaries are first cut to half the chunk budget, so any two of them fit one call:
+        every group but the last merges at least two summaries and the reduce tree always
+        shrinks without a prompt ever exceeding `chunk_tokens`.
+        """
+        # Room for the separating newline and the rounding of the token counter
+        limit = max(1, self.chunk_tokens // 2 - 2)
+        groups, current, current_tokens = [], [], 0
+        for summary in summaries:
+            tokens = self.counter.count(summary)
+            if tokens > limit:
+                print(f"Summary of {tokens} tokens cut to {limit} tokens before the reduce step.")
+                summary = self.counter.split(summary, limit)[0]
+                tokens = self.counter.count(summary)
+            tokens += 1
+            if current and current_tokens + tokens > self.chunk_tokens:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return ['\n'.join(group) for group in groups]
+
+    async def _map_reduce(self, text):
+        """
+        Summarizes long text with a parallel map step followed by a tree of reduce steps.
+
+        Chunk summaries are generated concurrently; they are then merged group by group,
+        level after level, until the result fits the target size.
+        """
+        chunks = self._split_into_chunks(text)
+        print(f"Summarizing {len(chunks)} chunks with up to {self.map_concurrency} concurrent calls...")
+        summaries = await self._summarize_many(chunks)
+        combined_summary = '\n'.join(summaries)
+
+        rounds = 0
+        while not self._fits(combined_summary) and rounds < self.max_reduce_rounds:
+            rounds += 1
+            groups = self._group_summaries(summaries)
+            print(f"Combined summary too large, reduce round {rounds} over {len(groups)} groups...")
+            summaries = await self._summarize_many(groups)
+            combined_summary = '\n'.join(summaries)
+
+        return combined_summary
+
+    async def agenerate_summary(self):
+        """Generates a summary for the user content without blocking the event loop."""
         if self.skip_chunking:
             # If skip_chunking flag is True, do not split or resummarize
             print("Skipping chunking and resummarizing...")
-            result = self._summarize_chunk(self.user_content)
+            result = await self._summarize_chunk(self.user_content)
+        elif self.counter.count(self.user_content) > self.chunk_tokens:
+            # Long documents go through the parallel map-reduce summarization
+            print(f"Document exceeds {self.chunk_tokens} tokens, splitting into chunks...")
+            result = await self._map_reduce(self.user_content)
+        else:
+            # If the document fits a single call, summarize it directly
+            print(f"Document has {self.chunk_tokens} tokens or fewer, summarizing directly...")
+            result = await self._summarize_chunk(self.user_content)
 
-            # Write the summary back to the user content file
-            with open(self.user_content_file, 'w') as file:
-                file.write(result)
+        # Write the summary back to the user content file
+        self._write_summary(result)
 
-            return result
-        else:
-            # Check if the document exceeds 15000 characters and proceed with chunking
-            if len(self.user_content) > 15000:
-                print("Document exceeds 15000 characters, splitting into chunks...")
-
-                # Split content into chunks of 15000 characters
-                chunks = self._split_into_chunks(self.user_content)
-
-                # Generate summaries for each chunk
-                summaries = []
-                for chunk in chunks:
-                    result = self._summarize_chunk(chunk)
-                    summaries.append(result)
-
-                # Combine all the summaries into one
-                combined_summary = '\n'.join(summaries)
-
-                # Check if the combined summary exceeds 100 lines
-                if self._line_count(combined_summary) > 100:
-                    print("Combined summary exceeds 100 lines, summarizing again...")
-                    # Generate the summary of the combined summary
-                    return self._summarize_chunk(combined_summary)
-                else:
-                    # Write the combined summary back to the user content file
-                    with open(self.user_content_file, 'w') as file:
-                        file.write(combined_summary)
-
-                    return combined_summary
-            else:
-                # If the document is smaller than 15000 characters, summarize it directly
-                print("Document has 15000 characters or fewer, summarizing directly...")
-                result = self._summarize_chunk(self.user_content)
-
-                # Write the summary back to the user content file
-                with open(self.user_content_file, 'w') as file:
-                    file.write(result)
-
-                return result
+        return result
+
+    def generate_summary(self):
+        """Generates a summary for the user content, blocking until it is ready."""
+        return run_sync(self.agenerate_summary())
 
 # Example usage:
 # if __name__ == "__main__":
@@ -1,15 +1,122 @@
 import os
+import time
+import atexit
+import asyncio
+import weakref
+import threading
+import httpx
 from dotenv import load_dotenv
-from groq import Groq
+from groq import Groq, AsyncGroq, RateLimitError
+from modules.llmCache import get_llm_cache
+from modules.rateLimiter import get_rate_limiter, estimate_tokens, parse_retry_after
 
 load_dotenv()
 
+# Connection pool settings shared by every Groq client of the process
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "60"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_REQUEST_TIMEOUT = float(os.getenv("GROQ_REQUEST_TIMEOUT", "60"))
+
+
+def _pool_limits():
+    """Return the keep-alive connection pool limits used by the Groq HTTP clients."""
+    return httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+        keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+    )
+
+
 class GroqClient:
+    """
+    Holds the sync and async Groq SDK clients for one API key.
+
+    Both faces sit on keep-alive httpx connection pools, so repeated completions reuse
+    open HTTPS connections instead of paying a new TLS handshake per call. The async
+    client is created lazily for each event loop, because httpx async pools cannot be
+    shared across loops.
+
+    The SDK's own retries are disabled: every 429 has to reach the shared rate limiter,
+    which owns the retry-after handling and the retry count (`GROQ_MAX_RETRIES`).
+    """
+
     def __init__(self, api_key):
-        self.client = Groq(api_key=api_key)  # Review this instantiation
+        self.api_key = api_key
+        self.client = Groq(api_key=api_key, max_retries=0, http_client=httpx.Client(limits=_pool_limits()))
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    @property
+    def async_client(self):
+        """The AsyncGroq client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncGroq(api_key=self.api_key, max_retries=0,
+                               http_client=httpx.AsyncClient(limits=_pool_limits()))
+            self._async_clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the async client of the running event loop, if one was created."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    def close(self):
+        """Close the connection pool of the sync client."""
+        self.client.close()
+
+
+_client_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_groq_client(api_key):
+    """
+    Return the process-wide GroqClient for an API key, creating it on first use.
+
+    Args:
+        api_key (str): The Groq API key.
+
+    Returns:
+        GroqClient: A client shared by every agent and summarizer using this key.
+    """
+    with _registry_lock:
+        client = _client_registry.get(api_key)
+        if client is None:
+            client = GroqClient(api_key)
+            _client_registry[api_key] = client
+        return client
+
+
+async def close_groq_clients():
+    """Close the AsyncGroq clients of the running event loop, for every API key."""
+    with _registry_lock:
+        clients = list(_client_registry.values())
+    for client in clients:
+        await client.aclose()
+
+
+def _close_sync_clients():
+    """Close the sync clients when the process exits; they are shared by every thread until then."""
+    with _registry_lock:
+        clients = list(_client_registry.values())
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Error closing the Groq client: {e}")
+
+
+atexit.register(_close_sync_clients)
+
+SYSTEM_ROLE = "you are an helpful AI assistant in text based question answering and analyzing given business data."
+
 
 class GroqCompletion:
-    def __init__(self, client, model, domain, prompt_template, user_content, temperature, max_tokens, top_p, stream, stop):
+    def __init__(self, client, model, domain, prompt_template, user_content, temperature, max_tokens, top_p, stream, stop, cache=None):
         self.client = client
         self.model = model
         self.domain = domain
@@ -20,36 +127,224 @@ class GroqCompletion:
         self.top_p = top_p
         self.stream = stream
         self.stop = stop
+        # Only deterministic (temperature 0) completions are safe to serve from the cache
+        self.cache = cache if cache is not None else (get_llm_cache() if temperature == 0 else None)
 
-    def create_completion(self):
+    def _messages(self):
+        """Build the chat messages sent to the model."""
         prompt = f"{self.prompt_template}\n\n{self.user_content}\n"
-        system_role = f"you are an helpful AI assistant in text based question answering and analyzing given business data."
+        return [
+            {
+                "role": "system",
+                "content": SYSTEM_ROLE
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
 
-        completion = self.client.client.chat.completions.create(
+    def _request_args(self, messages):
+        """Keyword arguments of the chat completion request."""
+        return dict(
             model=self.model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_role
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            messages=messages,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
             top_p=self.top_p,
             stream=self.stream,
             stop=self.stop,
+            timeout=GROQ_REQUEST_TIMEOUT,
         )
 
-        result = ""
-        for chunk in completion:
-            result += chunk.choices[0].delta.content or ""
+    def _reserved_tokens(self, messages):
+        """
+        Tokens one request takes from the per-minute budget.
+
+        Groq counts the requested `max_tokens` against the tokens-per-minute limit on top of
+        the prompt, so both are reserved up front.
+        """
+        return estimate_tokens(messages[0]["content"] + messages[1]["content"]) + (self.max_tokens or 0)
+
+    def _cache_key(self):
+        """Content address of this request in the response cache."""
+        return self.cache.make_key(self.model, SYSTEM_ROLE, self.prompt_template, self.user_content,
+                                   self.temperature, self.top_p, self.max_tokens, self.stop)
+
+    @staticmethod
+    def _is_valid(result, validate):
+        """Check whether a response may be served from or stored in the cache."""
+        if not result:
+            return False
+        if validate is None:
+            return True
+        try:
+            return bool(validate(result))
+        except Exception:
+            return False
+
+    def create_completion(self, validate=None, use_cache=True):
+        """
+        Generate a completion, blocking the calling thread.
 
+        Identical requests are answered from the response cache when one is configured.
+
+        Args:
+            validate (callable): Optional check of the response; only responses it accepts are
+                served from or stored in the cache.
+            use_cache (bool): Whether a cached response may be returned. Retries after an
+                invalid response pass False, so they actually reach the model.
+
+        Returns:
+            str: The model output.
+        """
+        if self.cache is None:
+            return self._request_completion()
+
+        key = self._cache_key()
+        if use_cache:
+            result = self.cache.get(key)
+            if self._is_valid(result, validate):
+                return result
+        result = self._request_completion()
+        if self._is_valid(result, validate):
+            self.cache.put(key, result)
+        return result
+
+    async def acreate_completion(self, validate=None, use_cache=True):
+        """
+        Generate a completion without blocking the event loop.
+
+        Identical requests are answered from the response cache when one is configured.
+
+        Args:
+            validate (callable): Optional check of the response; only responses it accepts are
+                served from or stored in the cache.
+            use_cache (bool): Whether a cached response may be returned.
+
+        Returns:
+            str: The model output.
+        """
+        if self.cache is None:
+            return await self._arequest_completion()
+
+        # The SQLite cache is queried from a worker thread, so concurrent calls never block the loop
+        key = self._cache_key()
+        if use_cache:
+            result = await asyncio.to_thread(self.cache.get, key)
+            if self._is_valid(result, validate):
+                return result
+        result = await self._arequest_completion()
+        if self._is_valid(result, validate):
+            await asyncio.to_thread(self.cache.put, key, result)
         return result
-    
+
+    def _request_completion(self):
+        """
+        Send the request to Groq, blocking the calling thread.
+
+        The request goes through the process-wide rate limiter and is retried when Groq
+        answers with a 429.
+        """
+        messages = self._messages()
+        estimated_tokens = self._reserved_tokens(messages)
+        limiter = get_rate_limiter()
+
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            limiter.acquire_sync(estimated_tokens)
+            try:
+                completion = self.client.client.chat.completions.create(**self._request_args(messages))
+                if not self.stream:
+                    result = completion.choices[0].message.content or ""
+                else:
+                    result = ""
+                    for chunk in completion:
+                        result += chunk.choices[0].delta.content or ""
+                limiter.on_success()
+                return result
+            except RateLimitError as e:
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                pause = limiter.on_rate_limited(parse_retry_after(e))
+            finally:
+                limiter.release_sync()
+            time.sleep(pause)
+
+    async def _arequest_completion(self):
+        """
+        Send the request to Groq without blocking the event loop.
+
+        Uses the AsyncGroq client of the shared pool, the global concurrency cap and the
+        requests/tokens per minute buckets of the process-wide rate limiter.
+        """
+        messages = self._messages()
+        estimated_tokens = self._reserved_tokens(messages)
+        limiter = get_rate_limiter()
+
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            await limiter.acquire(estimated_tokens)
+            try:
+                completion = await self.client.async_client.chat.completions.create(**self._request_args(messages))
+                if not self.stream:
+                    result = completion.choices[0].message.content or ""
+                else:
+                    parts = []
+                    async for chunk in completion:
+                        parts.append(chunk.choices[0].delta.content or "")
+                    result = "".join(parts)
+                limiter.on_success()
+                return result
+            except RateLimitError as e:
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                pause = limiter.on_rate_limited(parse_retry_after(e))
+            finally:
+                limiter.release()
+            await asyncio.sleep(pause)
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Coroutines are executed on one long-lived background event loop, so async clients
+    created for that loop (and their connection pools) survive between calls. Safe to
+    call from a thread that already runs its own event loop.
+
+    Args:
+        coro (coroutine): The coroutine to run.
+
+    Returns:
+        Any: The coroutine result.
+    """
+    return submit(coro).result()
+
+
+def submit(coro):
+    """
+    Schedule a coroutine on the long-lived background event loop without waiting for it.
+
+    Args:
+        coro (coroutine): The coroutine to run.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the coroutine result.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+
+
+def get_background_loop():
+    """Return the process-wide background event loop, starting its thread on first use."""
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        return _background_loop
+
+
+_background_loop = None
+_background_lock = threading.Lock()
 
 
 # # Example usage
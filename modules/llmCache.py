@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+
+class LLMResponseCache:
+    """
+    A persistent, content-addressed cache of LLM responses stored in SQLite.
+
+    Entries are keyed by a hash of everything that determines the model output, expire after
+    `ttl` seconds and are evicted least-recently-used first once the stored responses exceed
+    `max_bytes`.
+
+    Attributes:
+        path (str): Path of the SQLite database file.
+        max_bytes (int): Size budget of the stored responses.
+        ttl (float): Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=7 * 24 * 3600):
+        """
+        Initialize the cache and create its table if needed.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_bytes (int): Size budget of the stored responses.
+            ttl (float): Lifetime of an entry in seconds.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+
+    def _connect(self):
+        """Open a connection to the cache database."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(model, system_role, prompt_template, user_content, temperature, top_p, max_tokens, stop=None):
+        """
+        Build the content address of a completion request.
+
+        Returns:
+            str: SHA-256 hex digest of the request parameters.
+        """
+        payload = json.dumps(
+            [model, system_role, prompt_template, user_content, temperature, top_p, max_tokens, stop],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Content address built by `make_key`.
+
+        Returns:
+            str: The cached response, or None on a miss or an expired entry.
+        """
+        now = time.time()
+        with self.lock, self._connect() as conn:
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        """
+        Store a response and evict least recently used entries beyond the size budget.
+
+        Args:
+            key (str): Content address built by `make_key`.
+            response (str): The model output.
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            for old_key, old_size in conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                total -= old_size
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Report cache usage.
+
+        Returns:
+            dict: Hits, misses, hit rate, evictions, entry count and stored bytes.
+        """
+        with self.lock, self._connect() as conn:
+            entries, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": stored,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """
+    Return the process-wide LLM response cache, or None when caching is disabled.
+
+    Configured through LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_MB and LLM_CACHE_TTL_HOURS.
+    """
+    global _default_cache
+    if os.getenv("LLM_CACHE_ENABLED", "1") == "0":
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+                max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024),
+                ttl=float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600,
+            )
+        return _default_cache
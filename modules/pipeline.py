@@ -0,0 +1,197 @@
+import asyncio
+import time
+
+
+class Deadline:
+    """
+    An end-to-end latency budget shared by the stages of one pipeline run.
+
+    Attributes:
+        budget (float): Total budget in seconds.
+        started (float): Monotonic time at which the budget started.
+    """
+
+    def __init__(self, budget):
+        """
+        Start the clock on a latency budget.
+
+        Args:
+            budget (float): Total budget in seconds.
+        """
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def remaining(self):
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.budget - (time.monotonic() - self.started))
+
+    def share(self, fraction):
+        """
+        Seconds a stage owning `fraction` of the budget may still run.
+
+        Args:
+            fraction (float): Share of the total budget, counted from the start of the run.
+
+        Returns:
+            float: The time left in that share, capped by the overall remaining time.
+        """
+        return max(0.0, min(self.budget * fraction - (time.monotonic() - self.started), self.remaining()))
+
+
+class PipelineStage:
+    """
+    A single node of the analysis pipeline.
+
+    Attributes:
+        name (str): Unique name of the stage inside its graph.
+        func (callable): Coroutine function called with a dict of dependency results.
+        depends_on (list): Names of the stages that must finish before this one starts.
+        timeout (float): Maximum seconds the stage may run, if any.
+        budget_share (float): Share of the run deadline the stage may use, if any.
+    """
+
+    def __init__(self, name, func, depends_on=None, timeout=None, budget_share=None):
+        """
+        Initialize a pipeline stage.
+
+        Args:
+            name (str): Unique name of the stage inside its graph.
+            func (callable): Coroutine function receiving `{dependency_name: result}`.
+            depends_on (list): Names of the stages this stage waits on.
+            timeout (float): Maximum seconds the stage may run.
+            budget_share (float): Share of the run deadline, counted from the start of the run,
+                after which the stage is cancelled.
+        """
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on or [])
+        self.timeout = timeout
+        self.budget_share = budget_share
+
+
+class StageGraph:
+    """
+    Runs a set of dependent coroutines on a single event loop.
+
+    Every stage is scheduled as soon as the graph starts and only waits on its own
+    dependencies, so independent branches run concurrently and the total latency is
+    bounded by the slowest path instead of the sum of all stages.
+
+    When the graph runs under a `Deadline`, each stage is cancelled once its share of the
+    budget (or the whole remaining budget) runs out. Cancelled stages are recorded in
+    `timed_out` and their dependents receive `None`, so they can work with partial results.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty stage graph.
+        """
+        self.stages = {}
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+        self.timed_out = []
+
+    def add_stage(self, name, func, depends_on=None, timeout=None, budget_share=None):
+        """
+        Register a stage in the graph.
+
+        Args:
+            name (str): Unique name of the stage.
+            func (callable): Coroutine function receiving `{dependency_name: result}`.
+            depends_on (list): Names of the stages this stage waits on.
+            timeout (float): Maximum seconds the stage may run.
+            budget_share (float): Share of the run deadline the stage may use.
+
+        Returns:
+            StageGraph: The graph itself, so calls can be chained.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already registered.")
+        self.stages[name] = PipelineStage(name, func, depends_on, timeout, budget_share)
+        return self
+
+    def _validate(self):
+        """
+        Ensure every dependency exists and the graph has no cycles.
+        """
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'.")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at stage '{name}'.")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _timeout(self, stage, deadline):
+        """Return the seconds a stage may run now, or None if it is unbounded."""
+        limits = []
+        if stage.timeout is not None:
+            limits.append(stage.timeout)
+        if deadline is not None:
+            limits.append(deadline.share(stage.budget_share) if stage.budget_share else deadline.remaining())
+        return min(limits) if limits else None
+
+    async def _run_stage(self, stage, tasks, deadline):
+        """
+        Wait for the dependencies of a stage and then execute it within its time limit.
+
+        A failed or timed out dependency is passed on as `None`, so downstream stages can
+        still work with whatever the other branches produced.
+        """
+        inputs = {}
+        for dependency in stage.depends_on:
+            try:
+                inputs[dependency] = await tasks[dependency]
+            except Exception:
+                inputs[dependency] = None
+
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(stage.func(inputs), timeout=self._timeout(stage, deadline))
+            self.results[stage.name] = result
+            return result
+        except asyncio.TimeoutError as e:
+            print(f"Stage '{stage.name}' cancelled after exceeding its latency budget.")
+            self.timed_out.append(stage.name)
+            self.errors[stage.name] = e
+            raise
+        except Exception as e:
+            print(f"Stage '{stage.name}' failed: {e}")
+            self.errors[stage.name] = e
+            raise
+        finally:
+            self.timings[stage.name] = time.perf_counter() - start
+
+    async def run(self, deadline=None):
+        """
+        Execute all stages of the graph concurrently, respecting dependencies.
+
+        Args:
+            deadline (Deadline): Optional latency budget for the whole run.
+
+        Returns:
+            dict: Results of the successful stages keyed by stage name.
+        """
+        self._validate()
+        self.results, self.errors, self.timings, self.timed_out = {}, {}, {}, []
+
+        tasks = {}
+        for name in self.stages:
+            tasks[name] = asyncio.ensure_future(self._run_stage(self.stages[name], tasks, deadline))
+
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return self.results
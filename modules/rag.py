@@ -1,10 +1,15 @@
 import os
+import re
+import json
+import uuid
+import hashlib
+import threading
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from sentence_transformers.util import cos_sim
-from modules.pdfExtractor import PdfConverter
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from modules.embeddingService import get_embedding_service
+from modules.urlCanonicalizer import canonicalize_url
 
 # model = SentenceTransformer(
 #     "thenlper/gte-base", # switch to en/zh for English or Chinese
@@ -12,6 +17,23 @@ from langchain.schema import Document
 # )
 # model.save(os.path.join(os.getcwd(), "embeddingModel"))
 
+_embedding_model = None
+_embedding_model_lock = threading.Lock()
+
+
+def getEmbeddingModel():
+    """
+    Return the process-wide SentenceTransformer, loading it on first use.
+
+    Configured through EMBEDDING_MODEL, a model name or a local folder (default `thenlper/gte-base`).
+    """
+    global _embedding_model
+    with _embedding_model_lock:
+        if _embedding_model is None:
+            _embedding_model = SentenceTransformer(os.getenv("EMBEDDING_MODEL", "thenlper/gte-base"),
+                                                   trust_remote_code=True)
+        return _embedding_model
+
 
 def contextChunks(document_text, chunk_size, chunk_overlap):
     document = Document(page_content=document_text)
@@ -22,75 +44,286 @@ def contextChunks(document_text, chunk_size, chunk_overlap):
 
 
 def contextEmbedding(model, text_content_chunks):
-    text_contents_embeddings = [model.encode([text]) for text in text_content_chunks]
+    # Batched and cached: unchanged chunks are never re-embedded
+    embeddings = get_embedding_service(model).embed(text_content_chunks)
+    text_contents_embeddings = [embedding[None, :] for embedding in embeddings]
     return text_contents_embeddings
 
-def contextEmbeddingChroma(model, text_content_chunks, db_client, db_path):
+def collectionName(company, run=None):
+    """
+    Chroma collection name for a company, optionally scoped to one run.
+
+    Chroma accepts 3 to 63 characters from [a-zA-Z0-9._-], starting and ending alphanumerically.
+    """
+    name = re.sub(r"[^a-zA-Z0-9._-]+", "-", f"{company}_{run}" if run else str(company)).strip("._-").lower()
+    return (name or "company")[:63].rstrip("._-").ljust(3, "0")
+
+
+def chunkIds(source, text_content_chunks):
+    """
+    Stable chunk IDs derived from the source URL and the chunk content.
+
+    The same chunk of the same page always gets the same ID, so re-indexing a refreshed page
+    only touches the chunks whose content changed.
+    """
+    prefix = canonicalize_url(source) if source else ""
+    return [hashlib.sha256(f"{prefix}\n{text}".encode("utf-8")).hexdigest()[:32] for text in text_content_chunks]
+
+
+# Bumped on every write, so cached in-memory indexes of a collection are rebuilt
+_chroma_versions = {}
+
+
+def _clientKey(db_client):
+    """
+    Stable identity of a Chroma client, shared by every client opened on the same database.
+
+    Persistent clients are identified by their absolute persist directory. Other clients get a
+    random token stored on the client object, which unlike `id()` is never reused by another client.
+    """
+    settings = db_client.get_settings() if hasattr(db_client, "get_settings") else None
+    if settings is not None and settings.is_persistent and settings.persist_directory:
+        return os.path.abspath(settings.persist_directory)
+    key = getattr(db_client, "_rag_client_key", None)
+    if key is None:
+        key = f"client-{uuid.uuid4().hex}"
+        setattr(db_client, "_rag_client_key", key)
+    return key
+
+
+def _touchCollection(db_client, collection_name):
+    key = (_clientKey(db_client), collection_name)
+    _chroma_versions[key] = _chroma_versions.get(key, 0) + 1
 
-    text_contents_embeddings = [model.encode([text])[0] for text in text_content_chunks]
-    ids = [f"id_{i}" for i in range(len(text_content_chunks))]
 
-    collection = db_client.get_or_create_collection("embeddings_collection")
-    
-    collection.add(
-        documents=text_content_chunks,
-        embeddings=text_contents_embeddings,
-        ids=ids  # Include the generated IDs
-    )
+def contextEmbeddingChroma(model, text_content_chunks, db_client, db_path, source=None,
+                           collection_name="embeddings_collection", metadata=None, delete_stale=True):
+    """
+    Incrementally index the chunks of one source into a Chroma collection.
 
+    Chunks already stored under the same ID are skipped, new ones are upserted with
+    `{"source": canonical source URL, **metadata}` as metadata, and when `delete_stale` is set
+    the chunks previously indexed for the source but no longer present are deleted.
+
+    Returns:
+        list: The embeddings of all chunks, in order.
+    """
+    ids = chunkIds(source, text_content_chunks)
+    text_contents_embeddings = list(get_embedding_service(model).embed(text_content_chunks))
+
+    collection = db_client.get_or_create_collection(collection_name)
+    unique_ids = list(dict.fromkeys(ids))
+    # Chroma rejects a get without IDs; a source with no chunks still has its stale ones deleted below
+    existing = set(collection.get(ids=unique_ids, include=[])["ids"]) if unique_ids else set()
+
+    source = canonicalize_url(source) if source else None
+    chunk_metadata = dict(metadata or {})
+    if source:
+        chunk_metadata["source"] = source
+    new = {}
+    for idx, chunk_id in enumerate(ids):
+        if chunk_id not in existing and chunk_id not in new:
+            new[chunk_id] = idx
+
+    if new:
+        collection.upsert(
+            ids=list(new),
+            documents=[text_content_chunks[idx] for idx in new.values()],
+            embeddings=[text_contents_embeddings[idx].tolist() for idx in new.values()],
+            metadatas=[chunk_metadata] * len(new) if chunk_metadata else None,
+        )
+
+    stale = []
+    if source and delete_stale:
+        keep = set(ids)
+        stale = [chunk_id for chunk_id in collection.get(where={"source": source}, include=[])["ids"]
+                 if chunk_id not in keep]
+        if stale:
+            collection.delete(ids=stale)
+
+    if new or stale:
+        _touchCollection(db_client, collection_name)
     return text_contents_embeddings
 
 
-def retrieveEmbeddingsChroma(db_client):
-    collection_name = "embeddings_collection"
+def deleteChunksChroma(db_client, collection_name="embeddings_collection", ids=None, where=None):
+    """
+    Delete chunks from a Chroma collection by ID or by metadata filter,
+    e.g. `{"source": canonicalize_url(url)}`.
+    """
     collection = db_client.get_collection(collection_name)
+    collection.delete(ids=ids, where=where)
+    _touchCollection(db_client, collection_name)
 
-    records = collection.get()
+
+def retrieveEmbeddingsChroma(db_client, collection_name="embeddings_collection", where=None):
+    collection = db_client.get_collection(collection_name)
+
+    records = collection.get(where=where, include=["documents", "embeddings"])
     embeddings = []
     text_chunks = []
 
     if records and "documents" in records and "embeddings" in records:
-        text_chunks = records["documents"] or []  
-        embeddings = records["embeddings"] or [] 
+        text_chunks = records["documents"] or []
+        embeddings = records["embeddings"] if records["embeddings"] is not None else []
     else:
         print("No documents or embeddings found in the collection.")
 
-    return embeddings, text_chunks  
+    return embeddings, text_chunks
 
 
 def ragQuery(model, query):
     return model.encode([query])
 
+
+def normalizeEmbeddings(embeddings):
+    """
+    Stack embeddings into a float32 matrix with unit-length rows.
+
+    Args:
+        embeddings: A 2-D array, or a list of 1-D or `(1, d)` vectors.
+
+    Returns:
+        np.ndarray: `(n, d)` float32 matrix; all-zero rows are left as zeros.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    elif matrix.ndim > 2:
+        matrix = matrix.reshape(matrix.shape[0], -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+class EmbeddingIndex:
+    """
+    In-memory retrieval core over a normalized float32 embedding matrix.
+
+    Cosine similarity against every chunk is a single matrix product, and the top-k chunks are
+    selected with `argpartition` in O(n) before only those k are sorted, for one query or a
+    whole batch of queries at once.
+
+    Attributes:
+        matrix (np.ndarray): `(n, d)` normalized embeddings of the chunks.
+        texts (list): Text of each chunk, aligned with the matrix rows.
+    """
+
+    def __init__(self, embeddings=None, texts=None):
+        """
+        Build the index.
+
+        Args:
+            embeddings: Chunk embeddings, in any shape accepted by `normalizeEmbeddings`.
+            texts (list): Text of each chunk.
+        """
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self.texts = []
+        if embeddings is not None and len(embeddings):
+            self.add(embeddings, texts)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, embeddings, texts):
+        """
+        Append chunks to the index.
+
+        Args:
+            embeddings: Embeddings of the new chunks.
+            texts (list): Text of the new chunks.
+        """
+        rows = normalizeEmbeddings(embeddings)
+        if len(rows) != len(texts):
+            raise ValueError(f"Got {len(rows)} embeddings for {len(texts)} chunks.")
+        self.matrix = rows if not len(self.texts) else np.vstack([self.matrix, rows])
+        self.texts.extend(texts)
+
+    def search(self, query_embeddings, top_k):
+        """
+        Find the most similar chunks for one or several queries.
+
+        Args:
+            query_embeddings: A single query embedding or an `(m, d)` batch.
+            top_k (int): Number of chunks to return per query.
+
+        Returns:
+            list: For each query, `(chunk_index, score)` pairs sorted by decreasing similarity.
+        """
+        if not len(self.texts) or top_k <= 0:
+            return [[] for _ in range(len(normalizeEmbeddings(query_embeddings)))]
+
+        scores = normalizeEmbeddings(query_embeddings) @ self.matrix.T
+        k = min(top_k, scores.shape[1])
+        if k < scores.shape[1]:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(k), (scores.shape[0], k))
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind="stable")
+        top = np.take_along_axis(candidates, order, axis=1)
+        top_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        return [list(zip(rows.tolist(), row_scores.tolist())) for rows, row_scores in zip(top, top_scores)]
+
+    def top_texts(self, query_embedding, top_k):
+        """Text of the `top_k` chunks most similar to a single query."""
+        return [self.texts[idx] for idx, _ in self.search(query_embedding, top_k)[0]]
+
+
+def formatChunks(texts):
+    """Number the retrieved chunks the way the prompts expect them."""
+    return "\n".join(f"Text Chunk <{i + 1}>\n{element}" for i, element in enumerate(texts))
+
+
 def similarity(query_embedding, text_contents_embeddings, text_content_chunks, top_k):
-    similarities = [(text, cos_sim(embedding, query_embedding[0])) 
-                    for text, embedding in zip(text_content_chunks, text_contents_embeddings)]
-    
-    similarities_sorted = sorted(similarities, key=lambda x: x[1], reverse=True)
-    top_k_texts = [text for text, _ in similarities_sorted[:top_k]]
-
-    return "\n".join(f"Text Chunk <{i + 1}>\n{element}" for i, element in enumerate(top_k_texts))
-
-
-def similarityChroma(query_embedding, db_client, top_k):
-    collection = db_client.get_collection("embeddings_collection")
-    results = collection.get(include=["documents", "embeddings"])
-    
-    text_content_chunks = results["documents"]
-    text_contents_embeddings = np.array(results["embeddings"])
-
-    text_contents_embeddings = text_contents_embeddings.astype(np.float32)
-    query_embedding = query_embedding.astype(np.float32)
-
-    similarities = [
-        (text, cos_sim(embedding.reshape(1, -1), query_embedding.reshape(1, -1))[0][0]) 
-        for text, embedding in zip(text_content_chunks, text_contents_embeddings)
-    ]
-    
-    similarities_sorted = sorted(similarities, key=lambda x: x[1], reverse=True)
-    
-    top_k_texts = [text for text, _ in similarities_sorted[:top_k]]
-
-    return "\n".join(f"Text Chunk <{i + 1}>\n{element}" for i, element in enumerate(top_k_texts))
+    index = EmbeddingIndex(text_contents_embeddings, text_content_chunks)
+    return formatChunks(index.top_texts(query_embedding, top_k))
+
+
+# Chroma collections already loaded into memory, with the version they were loaded at
+_chroma_indexes = {}
+
+
+def chromaIndex(db_client, collection_name="embeddings_collection", where=None):
+    """
+    Return an `EmbeddingIndex` over a Chroma collection, reloading it only when the collection changed.
+
+    Args:
+        db_client: A Chroma client.
+        collection_name (str): Name of the collection.
+        where (dict): Optional metadata filter, such as `{"company": "trello"}`.
+
+    Returns:
+        EmbeddingIndex: The cached index of the collection.
+    """
+    collection = db_client.get_collection(collection_name)
+    client_key = _clientKey(db_client)
+    key = (client_key, collection_name, json.dumps(where, sort_keys=True))
+    version = (collection.count(), _chroma_versions.get((client_key, collection_name), 0))
+    cached = _chroma_indexes.get(key)
+    if cached is None or cached[0] != version:
+        embeddings, documents = retrieveEmbeddingsChroma(db_client, collection_name, where)
+        cached = (version, EmbeddingIndex(embeddings, documents))
+        _chroma_indexes[key] = cached
+    return cached[1]
+
+
+def contextEmbeddingStore(model, text_content_chunks, store, ids, metadatas=None):
+    """
+    Embed chunks and insert them into a memory-mapped `VectorStore`; existing ids are replaced.
+    """
+    text_contents_embeddings = get_embedding_service(model).embed(text_content_chunks)
+    store.add(ids, text_contents_embeddings, text_content_chunks, metadatas)
+    return text_contents_embeddings
+
+
+def similarityStore(query_embedding, store, top_k):
+    hits = store.search(query_embedding, top_k)[0]
+    return formatChunks([text for _, _, text, _ in hits])
+
+
+def similarityChroma(query_embedding, db_client, top_k, collection_name="embeddings_collection", where=None):
+    index = chromaIndex(db_client, collection_name, where)
+    return formatChunks(index.top_texts(query_embedding, top_k))
 
 
 
@@ -0,0 +1,297 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that refills continuously.
+
+    Callers reserve tokens ahead of time: `reserve` always succeeds and returns how long the
+    caller has to wait before the reservation is covered. This keeps the bucket usable from
+    both async code (`asyncio.sleep`) and worker threads (`time.sleep`).
+
+    Attributes:
+        capacity (float): Maximum number of tokens the bucket can hold.
+        rate (float): Current refill rate in tokens per second.
+    """
+
+    def __init__(self, capacity, rate):
+        """
+        Initialize a full bucket.
+
+        Args:
+            capacity (float): Maximum number of tokens the bucket can hold.
+            rate (float): Refill rate in tokens per second.
+        """
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add the tokens earned since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """
+        Take `amount` tokens from the bucket, going into debt if needed.
+
+        Args:
+            amount (float): Number of tokens to take. Capped at the bucket capacity so a
+                single oversized request can still be scheduled.
+
+        Returns:
+            float: Seconds to wait before the reserved tokens are actually available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= min(float(amount), self.capacity)
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class ConcurrencySlots:
+    """
+    A fixed number of slots shared by worker threads and every event loop of the process.
+
+    Waiters are served strictly in arrival order: a released slot is handed straight to the
+    oldest waiter, which is woken once, through its own event loop or thread event, instead of
+    polling. A coroutine cancelled while waiting leaves the queue, or passes on the slot it
+    was just given.
+    """
+
+    def __init__(self, count):
+        """
+        Initialize the slots.
+
+        Args:
+            count (int): Number of slots.
+        """
+        self.count = count
+        self.free = count
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    def _take(self):
+        """Take a free slot when nobody is queued for one. Must hold `lock`."""
+        if self.free and not self.waiters:
+            self.free -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        """Wait for a slot without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self._take():
+                return
+            future = loop.create_future()
+            waiter = _SlotWaiter(lambda: loop.call_soon_threadsafe(_resolve, future))
+            self.waiters.append(waiter)
+        try:
+            await future
+        except BaseException:
+            with self.lock:
+                if not waiter.granted:
+                    self.waiters.remove(waiter)
+                    raise
+            self.release()
+            raise
+
+    def acquire_sync(self):
+        """Wait for a slot, blocking the calling thread."""
+        with self.lock:
+            if self._take():
+                return
+            event = threading.Event()
+            self.waiters.append(_SlotWaiter(event.set))
+        event.wait()
+
+    def release(self):
+        """Give a slot back, handing it to the oldest waiter if there is one."""
+        with self.lock:
+            if not self.waiters:
+                if self.free >= self.count:
+                    raise ValueError("Released more slots than were acquired.")
+                self.free += 1
+                return
+            waiter = self.waiters.popleft()
+            waiter.granted = True
+        try:
+            waiter.wake()
+        except RuntimeError:
+            # The waiter's event loop is closed, so nobody will use the slot
+            self.release()
+
+
+class _SlotWaiter:
+    """A caller queued for a slot, and how to wake it."""
+
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+def _resolve(future):
+    """Wake a queued coroutine, unless it was cancelled in the meantime."""
+    if not future.done():
+        future.set_result(None)
+
+
+class GroqRateLimiter:
+    """
+    Keeps LLM traffic under Groq's requests-per-minute and tokens-per-minute limits.
+
+    Every call goes through a concurrency cap and two token buckets. The cap is one
+    process-wide `ConcurrencySlots` shared by worker threads and by every event loop, so
+    `max_concurrency` bounds all in-flight completions of the process and waiters are served
+    in arrival order. When Groq answers
+    with a 429 the limiter pauses all callers until the `retry-after` delay has passed and
+    halves its request rate; successful calls then slowly bring the rate back to the
+    configured value.
+    """
+
+    def __init__(self, max_concurrency=4, requests_per_minute=30, tokens_per_minute=60000):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency (int): Maximum number of in-flight completions.
+            requests_per_minute (int): Request budget per minute.
+            tokens_per_minute (int): Token budget per minute.
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.requests_per_minute = float(requests_per_minute)
+        self.tokens_per_minute = float(tokens_per_minute)
+        self.requests = TokenBucket(self.requests_per_minute, self.requests_per_minute / 60)
+        self.tokens = TokenBucket(self.tokens_per_minute, self.tokens_per_minute / 60)
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._slots = ConcurrencySlots(self.max_concurrency)
+
+    def _delay(self, estimated_tokens):
+        """Reserve budget for one request and return how long to wait for it."""
+        pause = max(0.0, self.blocked_until - time.monotonic())
+        return max(pause, self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    async def acquire(self, estimated_tokens):
+        """
+        Wait until a request of `estimated_tokens` fits the limits and take a concurrency slot.
+
+        Must be paired with `release`.
+        """
+        await self._slots.acquire()
+        try:
+            delay = self._delay(estimated_tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self):
+        """Give back the concurrency slot taken by `acquire`."""
+        self._slots.release()
+
+    def acquire_sync(self, estimated_tokens):
+        """
+        Blocking variant of `acquire` for synchronous callers.
+
+        Must be paired with `release_sync`.
+        """
+        self._slots.acquire_sync()
+        delay = self._delay(estimated_tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def release_sync(self):
+        """Give back the concurrency slot taken by `acquire_sync`."""
+        self._slots.release()
+
+    def on_rate_limited(self, retry_after=None):
+        """
+        Adapt to a 429 response.
+
+        Args:
+            retry_after (float): Seconds Groq asked us to wait, if provided.
+
+        Returns:
+            float: The pause applied to every caller.
+        """
+        pause = retry_after if retry_after is not None else 1.0 / self.requests.rate
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+            minimum_rate = 1.0 / 60
+            self.requests.rate = max(minimum_rate, self.requests.rate / 2)
+        print(f"Groq rate limit hit, pausing {pause:.1f}s (now {self.requests.rate * 60:.1f} requests/min)")
+        return pause
+
+    def on_success(self):
+        """Recover the request rate step by step after a 429 slowed it down."""
+        configured_rate = self.requests_per_minute / 60
+        if self.requests.rate < configured_rate:
+            with self._lock:
+                self.requests.rate = min(configured_rate, self.requests.rate * 1.1)
+
+
+def estimate_tokens(text):
+    """
+    Cheap token estimate used for budgeting before a request is sent.
+
+    Args:
+        text (str): Prompt text.
+
+    Returns:
+        int: Approximate number of tokens (about four characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+def parse_retry_after(error):
+    """
+    Extract the retry delay from a Groq rate-limit error.
+
+    Args:
+        error (Exception): The exception raised by the Groq SDK.
+
+    Returns:
+        float: Seconds to wait, or None if the response did not say.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Return the process-wide Groq rate limiter.
+
+    Limits are read from GROQ_MAX_CONCURRENCY, GROQ_REQUESTS_PER_MINUTE and
+    GROQ_TOKENS_PER_MINUTE the first time the limiter is created.
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = GroqRateLimiter(
+                max_concurrency=int(os.getenv("GROQ_MAX_CONCURRENCY", "4")),
+                requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30")),
+                tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", "60000")),
+            )
+        return _default_limiter
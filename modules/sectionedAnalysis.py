@@ -0,0 +1,162 @@
+import yaml
+import asyncio
+from modules.llm import GroqCompletion, get_groq_client
+from modules.chunker import output_token_budget
+from modules.embeddingService import get_embedding_service
+from modules.textCombiner import FileReader
+from modules.rag import contextChunks, contextEmbedding, EmbeddingIndex, formatChunks
+
+
+# Sections of the final report: (key, title, retrieval query, writing instruction)
+REPORT_SECTIONS = [
+    ("overview", "Overview",
+     "{name} overview: what it does, products, customers, founding, headquarters, employees, funding",
+     "Write an overview of the product/company."),
+    ("swot", "SWOT Analysis",
+     "{name} strengths, weaknesses, opportunities, threats, user reviews, pros and cons",
+     "Perform a SWOT analysis of the product/company."),
+    ("competitors", "Competitors",
+     "{name} competitors, alternatives, feature and pricing comparison, ratings versus competitors",
+     "Identify the key competitors and compare their offerings with the product/company."),
+    ("market_trends", "Market Values and Trends",
+     "{name} market size, growth, revenue, valuation, industry trends and business insights",
+     "Report market values and trends and share actionable business insights."),
+]
+
+
+class SectionedAnalysis:
+    """
+    Retrieval-augmented business analysis, generated section by section.
+
+    The per-source summaries are chunked and embedded into an in-memory `EmbeddingIndex`; each
+    report section then only receives the `top_k` chunks most similar to its own retrieval query,
+    and all sections are generated concurrently. The prompt of every call is bounded by
+    `top_k * chunk_size` characters, however many sources were scraped.
+
+    Attributes:
+        sections (list): `(key, title, query, instruction)` tuples, in report order.
+        index (EmbeddingIndex): Chunks of the indexed sources, once `index_sources` ran.
+    """
+
+    def __init__(self, api_key, model, domain, prompt_template_file, embedding_model,
+                 prompt_key="business_analysis_section", top_k=8, chunk_size=1000, chunk_overlap=100,
+                 temperature=0, max_tokens=2048, top_p=1, stream=True, stop=None, sections=None):
+        """
+        Initialize the analysis.
+
+        Args:
+            api_key (str): Groq API key.
+            model (str): Model writing the sections.
+            domain (str): Domain context passed to the LLM.
+            prompt_template_file (str): Path to the YAML prompts file.
+            embedding_model: SentenceTransformer-like model embedding chunks and queries.
+            prompt_key (str): Prompt used for every section.
+            top_k (int): Chunks retrieved per section.
+            chunk_size (int): Characters per chunk.
+            chunk_overlap (int): Characters shared by consecutive chunks.
+            temperature (float): Sampling temperature.
+            max_tokens (int): Maximum tokens of each section.
+            top_p (float): Top-p sampling parameter.
+            stream (bool): Whether to stream LLM responses.
+            stop (str): Stop sequence for the LLM.
+            sections (list): Report sections, `REPORT_SECTIONS` by default.
+        """
+        self.api_key = api_key
+        self.model = model
+        self.domain = domain
+        self.prompt_template_file = prompt_template_file
+        self.embedding_model = embedding_model
+        self.prompt_key = prompt_key
+        self.top_k = top_k
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.temperature = temperature
+        self.max_tokens = output_token_budget(model, max_tokens)
+        self.top_p = top_p
+        self.stream = stream
+        self.stop = stop
+        self.sections = sections or REPORT_SECTIONS
+        self.prompt_template = self._read_prompt_template()
+        self.index = EmbeddingIndex()
+
+    def _read_prompt_template(self):
+        """Reads the section prompt template from the YAML file."""
+        with open(self.prompt_template_file, 'r') as file:
+            yaml_content = yaml.safe_load(file)
+            return yaml_content.get('prompts', {}).get(self.prompt_key, {}).get('template', '')
+
+    def index_sources(self, folder_path):
+        """
+        Chunk and embed every Markdown and JSON source of a folder.
+
+        Each chunk is prefixed with the name of its source file, so the sections can tell the
+        sources apart.
+
+        Args:
+            folder_path (str): Folder holding the per-source summaries.
+
+        Returns:
+            int: Number of indexed chunks.
+        """
+        chunks = []
+        for file_name, text in FileReader(folder_path).iter_texts():
+            chunks.extend(f"[Source: {file_name}]\n{chunk}"
+                          for chunk in contextChunks(text, self.chunk_size, self.chunk_overlap) if chunk.strip())
+
+        self.index = EmbeddingIndex()
+        if chunks:
+            self.index.add(contextEmbedding(self.embedding_model, chunks), chunks)
+        print(f"Indexed {len(chunks)} chunks for the sectioned analysis.")
+        return len(chunks)
+
+    def retrieve(self, name):
+        """
+        Retrieve the context of every section with one batched similarity search.
+
+        Args:
+            name (str): Name of the analyzed product or company.
+
+        Returns:
+            dict: Retrieved chunk texts keyed by section key.
+        """
+        queries = [query.format(name=name) for _, _, query, _ in self.sections]
+        hits = self.index.search(get_embedding_service(self.embedding_model).embed(queries), self.top_k)
+        return {key: [self.index.texts[idx] for idx, _ in section_hits]
+                for (key, _, _, _), section_hits in zip(self.sections, hits)}
+
+    async def _generate_section(self, name, title, instruction, chunks):
+        """Write one section from its retrieved chunks."""
+        user_content = (f"Product/company: {name}\nSection: {title}\nTask: {instruction}\n\n"
+                        f"Documents:\n{formatChunks(chunks)}")
+        completion = GroqCompletion(get_groq_client(self.api_key), self.model, self.domain, self.prompt_template,
+                                    user_content, self.temperature, self.max_tokens, self.top_p, self.stream,
+                                    self.stop)
+        return await completion.acreate_completion()
+
+    async def agenerate(self, name):
+        """
+        Generate every section concurrently and assemble the report.
+
+        A section that fails is reported in place, so the others are still delivered.
+
+        Args:
+            name (str): Name of the analyzed product or company.
+
+        Returns:
+            str: The markdown report, or None when no source was indexed.
+        """
+        if not len(self.index):
+            return None
+
+        context = self.retrieve(name)
+        results = await asyncio.gather(*(self._generate_section(name, title, instruction, context[key])
+                                         for key, title, _, instruction in self.sections),
+                                       return_exceptions=True)
+
+        parts = [f"# {name} Business Analysis"]
+        for (key, title, _, _), result in zip(self.sections, results):
+            if isinstance(result, Exception):
+                print(f"Section '{key}' failed: {result}")
+                result = f"_This section could not be generated: {result}_"
+            parts.append(f"## {title}\n\n{(result or '').strip()}")
+        return "\n\n".join(parts) + "\n"
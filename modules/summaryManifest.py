@@ -0,0 +1,124 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from modules.urlCanonicalizer import canonicalize_url
+
+
+def content_hash(text):
+    """
+    Hash scraped content for change detection.
+
+    Args:
+        text (str): The scraped page content.
+
+    Returns:
+        str: SHA-256 hex digest of the content.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SummaryManifest:
+    """
+    Remembers, for every source URL, the hash of its scraped content and the summary produced for it.
+
+    When a page comes back byte-identical, its previous summary is reused and the LLM is skipped.
+    Entries are also tied to a summarizer fingerprint (model and prompt), so changing either one
+    re-summarizes every page. Entries are keyed by canonical URL and stored in SQLite, so
+    recording a summary is a single-row upsert however large the manifest grows.
+
+    Attributes:
+        path (str): Path of the SQLite manifest file.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the manifest and create its table if needed.
+
+        Args:
+            path (str): Path of the SQLite manifest file.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+                "summary TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """Open a connection to the manifest database."""
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def fingerprint(model, prompt_template):
+        """
+        Identify the summarizer configuration a summary was produced with.
+
+        Args:
+            model (str): The summarization model.
+            prompt_template (str): The summarization prompt.
+
+        Returns:
+            str: A short hash of the configuration.
+        """
+        return hashlib.sha256(f"{model}\n{prompt_template}".encode("utf-8")).hexdigest()[:16]
+
+    def lookup(self, url, page_hash, fingerprint):
+        """
+        Return the stored summary of an unchanged page.
+
+        Args:
+            url (str): Source URL of the page.
+            page_hash (str): Hash of the freshly scraped content.
+            fingerprint (str): Summarizer fingerprint.
+
+        Returns:
+            str: The previous summary, or None if the page is new or changed.
+        """
+        with self.lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT summary FROM summaries WHERE url = ? AND content_hash = ? AND fingerprint = ?",
+                (canonicalize_url(url), page_hash, fingerprint),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, url, page_hash, fingerprint, summary):
+        """
+        Store the summary produced for a page.
+
+        Args:
+            url (str): Source URL of the page.
+            page_hash (str): Hash of the scraped content that was summarized.
+            fingerprint (str): Summarizer fingerprint.
+            summary (str): The produced summary.
+        """
+        with self.lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (url, content_hash, fingerprint, summary, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (canonicalize_url(url), page_hash, fingerprint, summary, time.time()),
+            )
+
+
+_default_manifest = None
+_default_manifest_lock = threading.Lock()
+
+
+def get_summary_manifest():
+    """
+    Return the process-wide summary manifest, stored at SUMMARY_MANIFEST_PATH.
+    """
+    global _default_manifest
+    with _default_manifest_lock:
+        if _default_manifest is None:
+            _default_manifest = SummaryManifest(
+                os.getenv("SUMMARY_MANIFEST_PATH", os.path.join(".cache", "summary_manifest.sqlite"))
+            )
+        return _default_manifest
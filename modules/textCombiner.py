@@ -1,24 +1,55 @@
 import os
+import re
 import json
+import fnmatch
+from modules.chunker import get_token_counter
+
+# Sources of the combined report in priority order: structured G2 / Crunchbase data first,
+# then the Crunchbase and web summaries. Files matching none of them come last.
+SOURCE_PRIORITIES = ["conciseG2.json", "g2Comparison.md", "Crunchbase_Profile.json", "Crunchbase_Scrap_*.md",
+                     "LLM_Instruction_*_Scrap_*.md"]
+
+# Outputs of a previous analysis, never fed back into the report
+SKIPPED_FILES = {"combinedReport.md"}
+
+TRUNCATION_MARKER = "\n[...truncated]"
+
+
+def _natural_key(file_name):
+    """Sort key ordering `Scrap_2` before `Scrap_10`."""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', file_name)]
+
 
 class FileReader:
-    def __init__(self, folder_path):
+    def __init__(self, folder_path, token_budget=None, source_tokens=None, counter=None):
         """
         Initialize the FileReader object with a folder path.
-        
+
+        Sources are streamed in `SOURCE_PRIORITIES` order. Each one is cut to `source_tokens`
+        tokens, and the stream stops once `token_budget` tokens have been emitted, so the size
+        of the combined report is bounded and deterministic.
+
         Args:
             folder_path (str): The path to the folder containing the files.
+            token_budget (int): Maximum tokens of the combined report; unbounded if None.
+            source_tokens (int): Maximum tokens taken from a single source; unbounded if None.
+            counter (TokenCounter): Token counter, the shared one by default.
         """
         self.folder_path = folder_path
+        self.token_budget = token_budget
+        self.source_tokens = source_tokens
+        self.counter = counter or get_token_counter()
         self.combined_text = ""
+        self.truncated = []
+        self.skipped = []
 
     def _read_markdown(self, file_path):
         """
         Reads a Markdown file and returns its content.
-        
+
         Args:
             file_path (str): The path to the Markdown file.
-        
+
         Returns:
             str: The content of the Markdown file.
         """
@@ -27,38 +58,117 @@ class FileReader:
 
     def _read_json(self, file_path):
         """
-        Reads a JSON file and returns its formatted content as a string.
-        
+        Reads a JSON file and returns its content as a compact string.
+
         Args:
             file_path (str): The path to the JSON file.
-        
+
         Returns:
-            str: The formatted content of the JSON file.
+            str: The content of the JSON file, without indentation or extra spaces.
         """
         with open(file_path, 'r', encoding='utf-8') as file:
             data = json.load(file)
-            return json.dumps(data, indent=4)
+            return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    def read_source(self, file_path):
+        """Reads a Markdown or JSON source file."""
+        if file_path.endswith('.json'):
+            return self._read_json(file_path)
+        return self._read_markdown(file_path)
+
+    def sources(self):
+        """
+        Lists the Markdown and JSON sources of the folder in priority order.
+
+        Returns:
+            list: `(file_name, file_path)` pairs.
+        """
+        def priority(file_name):
+            rank = next((idx for idx, pattern in enumerate(SOURCE_PRIORITIES)
+                         if fnmatch.fnmatchcase(file_name, pattern)), len(SOURCE_PRIORITIES))
+            return rank, _natural_key(file_name)
+
+        names = [file_name for file_name in os.listdir(self.folder_path)
+                 if file_name.endswith(('.md', '.json')) and file_name not in SKIPPED_FILES
+                 and os.path.isfile(os.path.join(self.folder_path, file_name))]
+        return [(file_name, os.path.join(self.folder_path, file_name)) for file_name in sorted(names, key=priority)]
+
+    def _truncate(self, text, max_tokens):
+        """Cuts text to at most `max_tokens` tokens, marking the cut."""
+        marker_tokens = self.counter.count(TRUNCATION_MARKER)
+        if max_tokens <= marker_tokens:
+            return ""
+        return self.counter.split(text, max_tokens - marker_tokens)[0] + TRUNCATION_MARKER
+
+    def iter_texts(self):
+        """
+        Yields the sources one at a time, truncated to the token budgets.
+
+        Sources cut by a budget are listed in `truncated`, those left out entirely in `skipped`.
+
+        Yields:
+            tuple: `(file_name, text)` pairs in priority order.
+        """
+        self.truncated, self.skipped = [], []
+        remaining = self.token_budget
+        for file_name, file_path in self.sources():
+            if remaining is not None and remaining <= 0:
+                self.skipped.append(file_name)
+                continue
+            try:
+                text = self.read_source(file_path)
+            except Exception as e:
+                print(f"Error reading {file_name}: {e}")
+                continue
+
+            limits = [limit for limit in (self.source_tokens, remaining) if limit is not None]
+            if limits:
+                tokens = self.counter.count(text)
+                if tokens > min(limits):
+                    text = self._truncate(text, min(limits))
+                    if not text:
+                        self.skipped.append(file_name)
+                        remaining = 0
+                        continue
+                    self.truncated.append(file_name)
+                    tokens = self.counter.count(text)
+                if remaining is not None:
+                    remaining -= tokens + 1
+            yield file_name, text
+
+        if self.truncated or self.skipped:
+            print(f"Token budget reached: truncated {self.truncated}, skipped {self.skipped}")
+
+    def stream(self):
+        """
+        Yields the combined report piece by piece.
+
+        Yields:
+            str: The text of one source followed by a newline.
+        """
+        for _, text in self.iter_texts():
+            yield text + "\n"
 
     def read_files(self):
         """
         Reads all Markdown and JSON files in the folder and concatenates their contents.
-        
+
         Returns:
             str: A single string containing the concatenated contents of all files.
         """
-        for file_name in os.listdir(self.folder_path):
-            file_path = os.path.join(self.folder_path, file_name)
+        self.combined_text = "".join(self.stream())
+        return self.combined_text
 
-            if os.path.isfile(file_path) and file_name.endswith(('.md', '.json')):
-                try:
-                    if file_name.endswith('.md'):
-                        self.combined_text += self._read_markdown(file_path) + "\n"
-                    elif file_name.endswith('.json'):
-                        self.combined_text += self._read_json(file_path) + "\n"
-                except Exception as e:
-                    print(f"Error reading {file_name}: {e}")
+    def write_to(self, file_path):
+        """
+        Streams the combined report into a file without building it in memory.
 
-        return self.combined_text
+        Args:
+            file_path (str): The path of the report to write.
+        """
+        with open(file_path, 'w', encoding='utf-8') as file:
+            for piece in self.stream():
+                file.write(piece)
 
 # Example usage
 # if __name__ == "__main__":
@@ -0,0 +1,98 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Query parameters that only track the visitor and never change the page content
+TRACKING_PARAMS = {
+    "gclid", "dclid", "gbraid", "wbraid", "fbclid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref", "ref_src", "spm",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+
+def _is_tracking(param):
+    """Check whether a query parameter is a known tracking parameter."""
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url):
+    """
+    Normalize a URL so the same page always maps to the same key.
+
+    The scheme and host are lower-cased, default ports, fragments and tracking parameters are
+    dropped, the remaining query parameters are sorted and trailing slashes are removed.
+
+    Args:
+        url (str): Any absolute URL.
+
+    Returns:
+        str: The canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking(key)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def dedupe_key(url):
+    """
+    Key under which two URLs are considered the same page.
+
+    On top of `canonicalize_url`, http and https and a leading `www.` are treated as equivalent,
+    as search engines return both variants of the same page. The key is only used for
+    comparisons; the URL that is crawled and displayed stays unchanged.
+
+    Args:
+        url (str): Any absolute URL.
+
+    Returns:
+        str: The dedupe key of the URL.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    scheme = "https" if parts.scheme in DEFAULT_PORTS else parts.scheme
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return urlunsplit((scheme, host, parts.path, parts.query, ""))
+
+
+class UrlDeduper:
+    """
+    Assigns every canonical URL of one analysis run to exactly one scrape task.
+
+    The search branches of a run often return the same page; the first branch that claims
+    it crawls and summarizes it, the others skip it.
+
+    Attributes:
+        owners (dict): The URL that claimed each page, keyed by `dedupe_key`.
+        duplicates (int): Number of claims refused because the page was already taken.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty set of claims.
+        """
+        self.owners = {}
+        self.duplicates = 0
+
+    def claim(self, url):
+        """
+        Claim a URL for scraping.
+
+        Args:
+            url (str): The URL about to be scraped.
+
+        Returns:
+            bool: True if no other task of the run has claimed the same page yet.
+        """
+        key = dedupe_key(url)
+        if key in self.owners:
+            self.duplicates += 1
+            return False
+        self.owners[key] = url
+        return True
@@ -2,10 +2,14 @@ import json
 import os
 import asyncio
 import time
-import streamlit as st
 from agents.duckSearchAgent import DuckDuckGoSearch
 from agents.scrapperAgent import WebContentCleaner
 from modules.llamSummarizer import SummaryGenerator
+from modules.crawlScheduler import get_crawl_scheduler
+from modules.summaryManifest import get_summary_manifest, content_hash
+from modules.urlCanonicalizer import UrlDeduper
+from modules.crunchbaseExtractor import CrunchbaseExtractor, CrunchbaseProfile
+from modules.validator import CRUNCHBASE_ROOT
 
 # Assuming necessary imports like DuckDuckGoSearch, WebContentCleaner, and SummaryGenerator are defined elsewhere
 
@@ -37,36 +41,185 @@ def run_processing(query, max_search, api_key, domain, prompts_file):
     asyncio.run(process_search_and_generate_summary(query, max_search, api_key, domain, prompts_file))
 
 
-async def cleanSearchContentA(search_results, api_key, domain, prompts_file):
-        for idx, result in enumerate(search_results):
-            url = result['link']
-            st.toast(f"Enriching Knowledge Base from: {url}")
-            cleaner = WebContentCleaner(url=url, fit_markdown_path=os.path.join("scrapPages", f"LLM_Instruction_1_Scrap_{idx+1}.md"))
-            await cleaner.clean_content()
-            summary_generator = SummaryGenerator(api_key, "llama3-70b-8192", domain, prompts_file, os.path.join("scrapPages", f"LLM_Instruction_1_Scrap_{idx+1}.md"), 'summarize_text', skip_chunking=False)
-            summary_generator.generate_summary()
+async def summarizePage(url, markdownPath, api_key, domain, prompts_file, notify=print):
+    """
+    Summarize a scraped page, reusing the previous summary when the page did not change.
 
+    Args:
+        url (str): Source URL of the page.
+        markdownPath (str): File holding the scraped markdown; it receives the summary.
+        api_key (str): Groq API key.
+        domain (str): Domain context passed to the LLM.
+        prompts_file (str): Path to the YAML prompts file.
+        notify (callable): Progress callback taking a message.
 
-async def cleanSearchContentB(search_results,api_key, domain, prompts_file):
-        for idx, result in enumerate(search_results):
-            url = result['link']
-            st.toast(f"Enriching Knowledge Base from: {url}")
-            cleaner = WebContentCleaner(url=url, fit_markdown_path=os.path.join("scrapPages", f"LLM_Instruction_2_Scrap_{idx+1}.md"))
-            await cleaner.clean_content()
-            summary_generator = SummaryGenerator(api_key, "llama3-70b-8192", domain, prompts_file, os.path.join("scrapPages", f"LLM_Instruction_2_Scrap_{idx+1}.md"), 'summarize_text', skip_chunking=False)
-            summary_generator.generate_summary()
+    Returns:
+        str: The summary of the page.
+    """
+    summary_generator = SummaryGenerator(api_key, "llama3-70b-8192", domain, prompts_file, markdownPath, 'summarize_text', skip_chunking=False)
 
-async def cleanSearchContentC(search_results, api_key, domain, prompts_file, crunhbase):
+    manifest = get_summary_manifest()
+    page_hash = content_hash(summary_generator.user_content)
+    fingerprint = manifest.fingerprint(summary_generator.model, summary_generator.prompt_template)
+    summary = manifest.lookup(url, page_hash, fingerprint)
+    if summary is not None:
+        notify(f"Unchanged since last run, reusing summary: {url}")
+        summary_generator._write_summary(summary)
+        return summary
+
+    summary = await summary_generator.agenerate_summary()
+    manifest.record(url, page_hash, fingerprint, summary)
+    return summary
+
+
+async def scrapeAndSummarize(url, markdownPath, api_key, domain, prompts_file, notify=print):
+    """
+    Crawl a single page and summarize it.
+
+    Returns:
+        str: The summary of the page, or None if the page could not be crawled.
+    """
+    summaries = await scrapeAndSummarizeMany([(url, markdownPath)], api_key, domain, prompts_file, notify)
+    return summaries.get(url)
+
+
+async def scrapeAndSummarizeMany(pages, api_key, domain, prompts_file, notify=print, dropped=None, deduper=None,
+                                 extract=None):
+    """
+    Crawl many pages concurrently and summarize each one as soon as its crawl completes.
+
+    Crawls go through the shared crawl scheduler (global cap, per-domain cap and per-domain
+    delay); summaries are bounded by the LLM rate limiter. Pages already claimed by another
+    task of the same run are skipped, so each unique URL is crawled and summarized once.
+    When `extract` parses a page on its own, the LLM summary of that page is skipped.
+
+    Args:
+        pages (list): `(url, markdownPath)` pairs.
+        api_key (str): Groq API key.
+        domain (str): Domain context passed to the LLM.
+        prompts_file (str): Path to the YAML prompts file.
+        notify (callable): Progress callback taking a message.
+        dropped (list): Receives the URLs that could not be crawled or summarized in time.
+        deduper (UrlDeduper): Claims shared by every branch of the run; a fresh one if None.
+        extract (callable): `extract(url, html)` returning True when the page needs no summary.
+
+    Returns:
+        dict: Summaries keyed by URL, for the pages that were crawled and summarized.
+    """
+    deduper = UrlDeduper() if deduper is None else deduper
+    paths = {}
+    for url, markdownPath in pages:
+        if deduper.claim(url):
+            paths[url] = markdownPath
+        else:
+            notify(f"Skipping duplicate: {url}")
+    dropped = [] if dropped is None else dropped
+    finished = set()
+
+    def drop(url):
+        # Never let a stale or unsummarized page reach the report
+        dropped.append(url)
+        if os.path.exists(paths[url]):
+            os.remove(paths[url])
+
+    async def crawl(url):
+        notify(f"Enriching Knowledge Base from: {url}")
+        cleaner = WebContentCleaner(url=url, fit_markdown_path=paths[url])
+        return await cleaner.clean_content(), cleaner.html
+
+    async def summarize(url):
+        try:
+            summary = await summarizePage(url, paths[url], api_key, domain, prompts_file, notify)
+            finished.add(url)
+            return url, summary
+        except Exception as e:
+            notify(f"Error summarizing {url}: {e}")
+            drop(url)
+            return url, None
+
+    tasks = []
+    try:
+        async for url, crawled, error in get_crawl_scheduler().crawl_many(list(paths), crawl):
+            if error is not None or crawled[0] is None:
+                notify(f"Could not crawl {url}")
+                drop(url)
+                continue
+            if extract is not None and extract(url, crawled[1]):
+                # Parsed without the LLM: the raw page must not reach the report
+                finished.add(url)
+                os.remove(paths[url])
+                continue
+            tasks.append(asyncio.ensure_future(summarize(url)))
+
+        results = await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        # Out of time: keep the finished summaries and drop everything still in flight
+        for task in tasks:
+            task.cancel()
+        for url in paths:
+            if url not in finished and url not in dropped:
+                drop(url)
+        raise
+    return {url: summary for url, summary in results if summary is not None}
+
+
+async def extractCrunchbaseProfile(urls, api_key, domain, prompts_file, output_dir="scrapPages", notify=print,
+                                   dropped=None, deduper=None):
+    """
+    Build a structured Crunchbase profile from the organization subpages.
+
+    Every subpage is parsed with the `CrunchbaseExtractor`; only the pages whose section could
+    not be parsed are summarized by the LLM. The profile is written to `Crunchbase_Profile.json`.
+
+    Args:
+        urls (list): Subpage URLs built by `crunchbase_aggregator`.
+        api_key (str): Groq API key.
+        domain (str): Domain context passed to the LLM.
+        prompts_file (str): Path to the YAML prompts file.
+        output_dir (str): Folder receiving the profile and the fallback summaries.
+        notify (callable): Progress callback taking a message.
+        dropped (list): Receives the URLs that could not be crawled or summarized in time.
+        deduper (UrlDeduper): Claims shared by every branch of the run.
+
+    Returns:
+        CrunchbaseProfile: The parsed profile.
+    """
+    extractor = CrunchbaseExtractor()
+    profile = CrunchbaseProfile(url=CRUNCHBASE_ROOT.match(urls[0]).group(0) if urls else "")
+
+    def extract(url, html):
+        try:
+            parsed = extractor.extract(html, url, profile)
+        except Exception as e:
+            notify(f"Could not parse {url}: {e}")
+            return False
+        if not parsed:
+            notify(f"Falling back to the LLM for {url}")
+        return parsed
+
+    pages = [(url, os.path.join(output_dir, f"Crunchbase_Scrap_{idx+1}.md")) for idx, url in enumerate(urls)]
+    try:
+        await scrapeAndSummarizeMany(pages, api_key, domain, prompts_file, notify, dropped, deduper, extract)
+    finally:
+        # Whatever was parsed is kept, even when the branch runs out of time
+        with open(os.path.join(output_dir, "Crunchbase_Profile.json"), "w", encoding="utf-8") as json_file:
+            json_file.write(profile.model_dump_json(exclude_none=True))
+    return profile
+
+
+async def cleanSearchContentA(search_results, api_key, domain, prompts_file, output_dir="scrapPages", notify=print, dropped=None, deduper=None):
+        pages = [(result['link'], os.path.join(output_dir, f"LLM_Instruction_1_Scrap_{idx+1}.md"))
+                 for idx, result in enumerate(search_results)]
+        return await scrapeAndSummarizeMany(pages, api_key, domain, prompts_file, notify, dropped, deduper)
+
+
+async def cleanSearchContentB(search_results, api_key, domain, prompts_file, output_dir="scrapPages", notify=print, dropped=None, deduper=None):
+        pages = [(result['link'], os.path.join(output_dir, f"LLM_Instruction_2_Scrap_{idx+1}.md"))
+                 for idx, result in enumerate(search_results)]
+        return await scrapeAndSummarizeMany(pages, api_key, domain, prompts_file, notify, dropped, deduper)
+
+async def cleanSearchContentC(search_results, api_key, domain, prompts_file, crunhbase, output_dir="scrapPages", notify=print, dropped=None, deduper=None):
         if crunhbase == True:
-            for idx, result in enumerate(search_results):
-                url = result
-                st.toast(f"Enriching Knowledge Base from: {url}")
-                print("Before Cleaning")
-                print("Type of URL: ", type(url))
-                markdownPath = os.path.join("scrapPages", f"Crunchbase_Scrap_{idx+1}.md")
-                cleaner = WebContentCleaner(url=url, fit_markdown_path=markdownPath)
-                print("After Cleaning")
-                await cleaner.clean_content()
-                print("Finished Clearning")
-                summary_generator = SummaryGenerator(api_key, "llama3-70b-8192", domain, prompts_file, markdownPath, 'summarize_text', skip_chunking=False)
-                summary_generator.generate_summary()
\ No newline at end of file
+            pages = [(url, os.path.join(output_dir, f"Crunchbase_Scrap_{idx+1}.md"))
+                     for idx, url in enumerate(search_results)]
+            return await scrapeAndSummarizeMany(pages, api_key, domain, prompts_file, notify, dropped, deduper)
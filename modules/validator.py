@@ -1,26 +1,152 @@
-import json
+import re
+from urllib.parse import urlsplit
+
+
+# Extractors a search result can be routed to, from the cheapest to the most expensive
+G2_REVIEWS = "g2_reviews"
+CRUNCHBASE_ORGANIZATION = "crunchbase_organization"
+STATIC = "static"
+BROWSER = "browser"
+
+# Root of a Crunchbase organization profile, whatever subpage a search result points to
+CRUNCHBASE_ROOT = re.compile(r"^https?://[^/]+/organization/[^/?#]+")
+
+# Slug of a G2 product, whatever page of its reviews a search result points to
+G2_PRODUCT = re.compile(r"^https?://[^/]+/products/([^/?#]+)", re.IGNORECASE)
+
+# Extractors whose pages must never be fetched with a plain HTTP client
+BROWSER_EXTRACTORS = {G2_REVIEWS, CRUNCHBASE_ORGANIZATION, BROWSER}
+
+# (host, path pattern, extractor), first match wins; hosts also match their subdomains
+URL_ROUTES = [
+    ("g2.com", r"^/products/[^/]+/reviews/?$", G2_REVIEWS),
+    ("g2.com", r"", BROWSER),
+    ("crunchbase.com", r"^/organization/[^/]+(/.*)?$", CRUNCHBASE_ORGANIZATION),
+    ("crunchbase.com", r"", BROWSER),
+    ("linkedin.com", r"", BROWSER),
+    ("glassdoor.com", r"", BROWSER),
+    ("capterra.com", r"", BROWSER),
+    ("trustradius.com", r"", BROWSER),
+]
+
+
+class ResultRouter:
+    """
+    Dispatches search results to the cheapest extractor able to handle them.
+
+    The routing table is compiled once into a single alternation regex per host, so classifying
+    a URL costs one dictionary lookup per host suffix and one regex match. URLs that match no
+    route go to the static fetcher, which falls back to the generic browser crawl on its own.
+
+    Attributes:
+        default (str): Extractor of URLs that match no route.
+    """
+
+    def __init__(self, routes=None, default=STATIC):
+        """
+        Compile the routing table.
+
+        Args:
+            routes (list): `(host, path_pattern, extractor)` triples, first match wins.
+            default (str): Extractor of URLs that match no route.
+        """
+        self.default = default
+        grouped = {}
+        for host, pattern, extractor in URL_ROUTES if routes is None else routes:
+            grouped.setdefault(host.lower(), []).append((pattern, extractor))
+
+        self.table = {}
+        for host, entries in grouped.items():
+            regex = "|".join(f"(?P<r{idx}>{pattern})" for idx, (pattern, _) in enumerate(entries))
+            self.table[host] = (re.compile(regex), [extractor for _, extractor in entries])
+
+    def route(self, url):
+        """
+        Classify a single URL.
+
+        Args:
+            url (str): Any absolute URL.
+
+        Returns:
+            str: The extractor the URL should be sent to.
+        """
+        parts = urlsplit(url)
+        labels = (parts.hostname or "").lower().split(".")
+        for start in range(len(labels) - 1):
+            entry = self.table.get(".".join(labels[start:]))
+            if entry is None:
+                continue
+            regex, extractors = entry
+            match = regex.match(parts.path or "/")
+            if match:
+                return extractors[int(match.lastgroup[1:])]
+        return self.default
+
+    def static_fetchable(self, url):
+        """Check whether a URL may be tried with a plain HTTP fetch before the browser."""
+        return self.route(url) not in BROWSER_EXTRACTORS
+
+    def classify(self, json_data):
+        """
+        Classify every search result in a single pass.
+
+        Args:
+            json_data (list): Dictionaries containing 'title' and 'link'.
+
+        Returns:
+            dict: Search results keyed by extractor, in their original order.
+        """
+        routed = {}
+        for item in json_data:
+            routed.setdefault(self.route(item.get("link", "")), []).append(item)
+        return routed
+
+
+_default_router = ResultRouter()
+
+
+def get_result_router():
+    """Return the router compiled from the default routing table."""
+    return _default_router
+
+
+def g2_product_slug(url):
+    """
+    Return the G2 product slug of a URL, e.g. `jira` for `https://www.g2.com/products/jira/reviews?page=2`.
+
+    :param url: Any absolute URL.
+    :return: The lower-cased slug, or None for a URL that is not a G2 product page.
+    """
+    match = G2_PRODUCT.match(url)
+    return match.group(1).lower() if match else None
+
 
 def g2validator(json_data):
     """
     Validate links in the given JSON data.
 
+    Pagination, trailing-slash and host variants of the same product collapse into one
+    canonical reviews URL per product slug, in the order they were first found.
+
     :param json_data: List of dictionaries containing 'title' and 'link'.
     :return: List of links that meet the validation criteria.
     """
     try:
+        # Keep every G2 product reviews page, not only a leading one, but each product once
         valid_links = []
-        for item in json_data:
-            link = item.get("link", "")
-            # Check if the main domain is 'www.g2.com' and it ends with '/reviews'
-            if "www.g2.com" in link and link.endswith("/reviews"):
+        for item in get_result_router().classify(json_data).get(G2_REVIEWS, []):
+            link = f"https://www.g2.com/products/{g2_product_slug(item['link'])}/reviews"
+            if link not in valid_links:
                 valid_links.append(link)
-                return valid_links
-            else:
-                return "No valid G2 links found."
-    
+
+        if valid_links:
+            return valid_links
+        else:
+            return "No valid G2 links found."
+
     except Exception as e:
         return f"An error occurred: {str(e)}"
-    
+
 
 def crunchbaseValidator(json_data):
     """
@@ -31,17 +157,16 @@ def crunchbaseValidator(json_data):
     """
     try:
         valid_links = []
-        for item in json_data:
-            link = item.get("link", "")
-            # Check if the link starts with 'https://www.crunchbase.com/organization/'
-            if link.startswith("https://www.crunchbase.com/organization/"):
-                valid_links.append(link)
-        
+        for item in get_result_router().classify(json_data).get(CRUNCHBASE_ORGANIZATION, []):
+            root = CRUNCHBASE_ROOT.match(item["link"]).group(0)
+            if root not in valid_links:
+                valid_links.append(root)
+
         if valid_links:
             return valid_links
         else:
             return "No valid Crunchbase links found."
-    
+
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
@@ -0,0 +1,372 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+
+
+class VectorStore:
+    """
+    Persistent local vector store backed by memory-mapped, quantized embedding files.
+
+    Vectors are normalized and appended to a float16 or int8 file that is memory-mapped for
+    search, so the corpus never has to fit in RAM; ids, texts and metadata live in SQLite.
+    Once the store holds enough vectors, an IVF index (spherical k-means centroids plus one
+    inverted list per centroid) is trained, and a query only scores the vectors of its
+    `nprobe` closest lists. Inserts are incremental: new vectors are appended and assigned to
+    their nearest centroid without retraining. Deleted and replaced rows stay in the files as
+    tombstones until `compact` rewrites the store.
+
+    Layout of the store directory:
+        vectors.bin     (n, dim) float16 or int8 rows
+        scales.bin      (n,) float32 dequantization scale of each int8 row
+        lists.bin       (n,) int32 inverted list of each row, -1 before training
+        deleted.bin     (n,) uint8 tombstone of each row, set when it is deleted or replaced
+        centroids.npy   (nlist, dim) float32 IVF centroids
+        store.json      dimension, dtype and IVF settings
+        store.sqlite    id, text and metadata of each row
+
+    Attributes:
+        path (str): Directory of the store.
+        dim (int): Dimension of the vectors.
+        dtype (str): Storage type of the vectors, "float16" or "int8".
+        nlist (int): Number of IVF lists trained.
+        nprobe (int): Number of lists scanned per query.
+    """
+
+    DTYPES = {"float16": np.float16, "int8": np.int8}
+
+    # Vectors per centroid needed before the IVF index is trained
+    TRAIN_FACTOR = 39
+    # Rows scored at once by the exhaustive scan, which bounds its memory use
+    SCAN_BLOCK = 65536
+
+    def __init__(self, path, dim=None, dtype="float16", nlist=64, nprobe=8):
+        """
+        Open a store, creating it on first use.
+
+        Args:
+            path (str): Directory of the store.
+            dim (int): Dimension of the vectors; taken from the first insert if None.
+            dtype (str): Storage type of new stores, "float16" or "int8".
+            nlist (int): Number of IVF lists of new stores.
+            nprobe (int): Number of lists scanned per query.
+        """
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', use one of {list(self.DTYPES)}.")
+        self.path = path
+        self.lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+        config = self._read_config()
+        self.dim = config.get("dim", dim)
+        self.dtype = config.get("dtype", dtype)
+        self.nlist = config.get("nlist", nlist)
+        self.nprobe = nprobe
+        self.centroids = None
+        if os.path.exists(self._file("centroids.npy")):
+            self.centroids = np.load(self._file("centroids.npy"))
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rows ("
+                "row INTEGER PRIMARY KEY, id TEXT NOT NULL, text TEXT, metadata TEXT, deleted INTEGER DEFAULT 0)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS rows_id ON rows (id)")
+        self._mapped = None
+        self._lists = None
+
+    def _file(self, name):
+        """Path of a file of the store."""
+        return os.path.join(self.path, name)
+
+    def _connect(self):
+        """Open a connection to the metadata database."""
+        return sqlite3.connect(self._file("store.sqlite"), timeout=30)
+
+    def _read_config(self):
+        """Load the settings of an existing store."""
+        try:
+            with open(self._file("store.json"), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _write_config(self):
+        """Persist the settings of the store."""
+        with open(self._file("store.json"), "w", encoding="utf-8") as file:
+            json.dump({"dim": self.dim, "dtype": self.dtype, "nlist": self.nlist}, file)
+
+    def _count(self):
+        """Number of rows written to the vector file, deleted ones included."""
+        path = self._file("vectors.bin")
+        if not self.dim or not os.path.exists(path):
+            return 0
+        return os.path.getsize(path) // (self.dim * np.dtype(self.DTYPES[self.dtype]).itemsize)
+
+    def _arrays(self):
+        """Memory-map the vector, scale and list files, remapping them when rows were appended."""
+        count = self._count()
+        if self._mapped is None or self._mapped[0] != count:
+            if count == 0:
+                self._mapped = (0, None, None, None, None)
+            else:
+                vectors = np.memmap(self._file("vectors.bin"), dtype=self.DTYPES[self.dtype], mode="r",
+                                    shape=(count, self.dim))
+                scales = np.memmap(self._file("scales.bin"), dtype=np.float32, mode="r", shape=(count,))
+                lists = np.fromfile(self._file("lists.bin"), dtype=np.int32, count=count)
+                deleted = np.memmap(self._file("deleted.bin"), dtype=np.uint8, mode="r", shape=(count,))
+                self._mapped = (count, vectors, scales, lists, deleted)
+            self._lists = None
+        return self._mapped[1:]
+
+    @staticmethod
+    def _normalize(embeddings):
+        """Stack embeddings into float32 rows of unit length."""
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+    def _quantize(self, matrix):
+        """Convert normalized float32 rows to the storage type and their dequantization scales."""
+        if self.dtype == "float16":
+            return matrix.astype(np.float16), np.ones(len(matrix), dtype=np.float32)
+        scales = np.maximum(np.abs(matrix).max(axis=1), np.finfo(np.float32).tiny) / 127.0
+        return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+    def _assign(self, matrix):
+        """Nearest centroid of each row, or -1 while the index is not trained."""
+        if self.centroids is None:
+            return np.full(len(matrix), -1, dtype=np.int32)
+        return np.argmax(matrix @ self.centroids.T, axis=1).astype(np.int32)
+
+    def __len__(self):
+        """Number of live vectors."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM rows WHERE deleted = 0").fetchone()[0]
+
+    def add(self, ids, embeddings, texts=None, metadatas=None):
+        """
+        Insert vectors; an id that already exists is replaced, and an id repeated within the
+        batch keeps its last occurrence.
+
+        Args:
+            ids (list): Id of each vector.
+            embeddings: `(n, dim)` vectors.
+            texts (list): Text of each vector.
+            metadatas (list): JSON-serializable metadata of each vector.
+        """
+        matrix = self._normalize(embeddings)
+        if len(matrix) != len(ids):
+            raise ValueError(f"Got {len(matrix)} embeddings for {len(ids)} ids.")
+        if not len(ids):
+            return
+
+        last = {item_id: offset for offset, item_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids, matrix = [ids[offset] for offset in keep], matrix[keep]
+            texts = [texts[offset] for offset in keep] if texts else None
+            metadatas = [metadatas[offset] for offset in keep] if metadatas else None
+
+        with self.lock:
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                self._write_config()
+            if matrix.shape[1] != self.dim:
+                raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}.")
+
+            quantized, scales = self._quantize(matrix)
+            start = self._count()
+            with open(self._file("vectors.bin"), "ab") as file:
+                file.write(quantized.tobytes())
+            with open(self._file("scales.bin"), "ab") as file:
+                file.write(scales.tobytes())
+            with open(self._file("lists.bin"), "ab") as file:
+                file.write(self._assign(matrix).tobytes())
+            with open(self._file("deleted.bin"), "ab") as file:
+                file.write(bytes(len(ids)))
+
+            # Replaced ids: the previous rows become tombstones
+            self.delete(ids)
+            texts = texts or [None] * len(ids)
+            metadatas = metadatas or [None] * len(ids)
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO rows (row, id, text, metadata) VALUES (?, ?, ?, ?)",
+                    [(start + offset, item_id, text, json.dumps(metadata) if metadata is not None else None)
+                     for offset, (item_id, text, metadata) in enumerate(zip(ids, texts, metadatas))],
+                )
+
+            if self.centroids is None and start + len(ids) >= self.nlist * self.TRAIN_FACTOR:
+                self.train()
+
+    def delete(self, ids):
+        """
+        Remove vectors by id; their rows are skipped by every later search.
+
+        Args:
+            ids (list): Ids to remove.
+        """
+        with self.lock, self._connect() as conn:
+            rows = []
+            for start in range(0, len(ids), 500):
+                batch = list(ids[start:start + 500])
+                rows.extend(row for (row,) in conn.execute(
+                    f"SELECT row FROM rows WHERE deleted = 0 AND id IN ({','.join('?' * len(batch))})", batch))
+            if not rows:
+                return
+            conn.executemany("UPDATE rows SET deleted = 1 WHERE row = ?", [(row,) for row in rows])
+            tombstones = np.memmap(self._file("deleted.bin"), dtype=np.uint8, mode="r+", shape=(self._count(),))
+            tombstones[rows] = 1
+            tombstones.flush()
+
+    def compact(self):
+        """
+        Rewrite the store without its tombstones, reclaiming the space of deleted and replaced rows.
+
+        Live rows keep their order, IVF list and quantized values, so search results are unchanged.
+
+        Returns:
+            int: Number of rows removed.
+        """
+        with self.lock:
+            vectors, scales, lists, deleted = self._arrays()
+            if vectors is None:
+                return 0
+            live = np.flatnonzero(deleted == 0)
+            removed = len(vectors) - len(live)
+            if not removed:
+                return 0
+
+            columns = [("vectors.bin", vectors), ("scales.bin", scales), ("lists.bin", lists)]
+            for name, column in columns:
+                with open(self._file(name + ".tmp"), "wb") as file:
+                    for start in range(0, len(live), self.SCAN_BLOCK):
+                        file.write(np.ascontiguousarray(column[live[start:start + self.SCAN_BLOCK]]).tobytes())
+            with open(self._file("deleted.bin.tmp"), "wb") as file:
+                file.write(bytes(len(live)))
+            # Release the memory maps before their files are replaced
+            self._mapped = None
+            del vectors, scales, lists, deleted, columns, column
+
+            with self._connect() as conn:
+                conn.execute("DELETE FROM rows WHERE deleted = 1")
+                # Rows only move down, in order, so a new row number is never still taken
+                conn.executemany("UPDATE rows SET row = ? WHERE row = ?",
+                                 [(new, int(old)) for new, old in enumerate(live) if new != old])
+                for name in ("vectors.bin", "scales.bin", "lists.bin", "deleted.bin"):
+                    os.replace(self._file(name + ".tmp"), self._file(name))
+            return removed
+
+    def train(self, iterations=10, sample_size=None, seed=0):
+        """
+        Train the IVF centroids with spherical k-means and assign every stored row to a list.
+
+        Args:
+            iterations (int): Number of k-means iterations.
+            sample_size (int): Rows used for training; 256 per list by default.
+            seed (int): Seed of the random sample and initialization.
+        """
+        with self.lock:
+            vectors, scales, _, _ = self._arrays()
+            if vectors is None:
+                return
+            rng = np.random.default_rng(seed)
+            count = len(vectors)
+            nlist = min(self.nlist, count)
+            sample = np.sort(rng.choice(count, size=min(count, sample_size or nlist * 256), replace=False))
+            data = self._normalize(np.asarray(vectors[sample], dtype=np.float32) * scales[sample, None])
+
+            centroids = data[rng.choice(len(data), size=nlist, replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, data)
+                empty = ~np.bincount(assignment, minlength=nlist).astype(bool)
+                sums[empty] = data[rng.choice(len(data), size=int(empty.sum()))]
+                centroids = self._normalize(sums)
+
+            self.centroids = centroids.astype(np.float32)
+            np.save(self._file("centroids.npy"), self.centroids)
+
+            lists = np.empty(count, dtype=np.int32)
+            for start in range(0, count, self.SCAN_BLOCK):
+                block = np.asarray(vectors[start:start + self.SCAN_BLOCK], dtype=np.float32)
+                lists[start:start + self.SCAN_BLOCK] = self._assign(block)
+            lists.tofile(self._file("lists.bin"))
+            self._mapped = None
+
+    def _inverted_lists(self, lists):
+        """Rows of each IVF list, built once per mapping of the list file."""
+        if self._lists is None:
+            order = np.argsort(lists, kind="stable")
+            bounds = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[idx]:bounds[idx + 1]] for idx in range(len(self.centroids))]
+        return self._lists
+
+    def _candidates(self, query, lists):
+        """Rows to score for one query: those of the `nprobe` closest lists, or None without an index."""
+        if self.centroids is None:
+            return None
+        inverted = self._inverted_lists(lists)
+        probe = np.argsort(-(self.centroids @ query))[:self.nprobe]
+        return np.sort(np.concatenate([inverted[idx] for idx in probe]))
+
+    def search(self, query_embeddings, top_k=5):
+        """
+        Find the stored vectors most similar to one or several queries.
+
+        Args:
+            query_embeddings: A single query embedding or an `(m, dim)` batch.
+            top_k (int): Number of results per query.
+
+        Returns:
+            list: For each query, `(id, score, text, metadata)` tuples by decreasing similarity.
+        """
+        queries = self._normalize(query_embeddings)
+        with self.lock:
+            vectors, scales, lists, deleted = self._arrays()
+            if vectors is None:
+                return [[] for _ in queries]
+
+            hits = []
+            for query in queries:
+                rows = self._candidates(query, lists)
+                scored_rows, scores = [], []
+                if rows is None:
+                    for start in range(0, len(vectors), self.SCAN_BLOCK):
+                        block = np.asarray(vectors[start:start + self.SCAN_BLOCK], dtype=np.float32)
+                        scored_rows.append(np.arange(start, start + len(block)))
+                        scores.append((block @ query) * scales[start:start + len(block)])
+                else:
+                    scored_rows.append(rows)
+                    scores.append((np.asarray(vectors[rows], dtype=np.float32) @ query) * scales[rows])
+                scored_rows, scores = np.concatenate(scored_rows), np.concatenate(scores)
+
+                live = deleted[scored_rows] == 0
+                scored_rows, scores = scored_rows[live], scores[live]
+                k = min(len(scores), top_k)
+                if k == 0:
+                    hits.append([])
+                    continue
+                best = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+                best = best[np.argsort(-scores[best], kind="stable")]
+                hits.append([(int(scored_rows[idx]), float(scores[idx])) for idx in best])
+
+        return self._resolve(hits)
+
+    def _resolve(self, hits):
+        """Attach the id, text and metadata of the matched rows."""
+        rows = sorted({row for query_hits in hits for row, _ in query_hits})
+        records = {}
+        with self._connect() as conn:
+            for start in range(0, len(rows), 500):
+                batch = rows[start:start + 500]
+                for row, item_id, text, metadata in conn.execute(
+                        f"SELECT row, id, text, metadata FROM rows WHERE row IN ({','.join('?' * len(batch))})", batch):
+                    records[row] = (item_id, text, json.loads(metadata) if metadata else None)
+        return [[(records[row][0], score, records[row][1], records[row][2]) for row, score in query_hits]
+                for query_hits in hits]
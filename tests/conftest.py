@@ -0,0 +1,63 @@
+import os
+import sys
+import types
+import importlib.util
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Tests never read from or write to the caches under .cache
+for variable in ("LLM_CACHE_ENABLED", "EMBEDDING_CACHE_ENABLED", "G2_CACHE_ENABLED", "CRAWL_CACHE_ENABLED"):
+    os.environ.setdefault(variable, "0")
+
+
+def _stub(name, **attributes):
+    """Register an empty module for an SDK that is not installed, so the modules importing it load."""
+    top = name.split(".")[0]
+    if name in sys.modules or (top not in sys.modules and importlib.util.find_spec(top) is not None):
+        return
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+
+
+class _Client:
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+    def close(self):
+        pass
+
+
+class _RateLimitError(Exception):
+    pass
+
+
+_stub("groq", Groq=_Client, AsyncGroq=_Client, RateLimitError=_RateLimitError)
+_stub("sentence_transformers", SentenceTransformer=_Client)
+_stub("langchain")
+_stub("langchain.text_splitter", RecursiveCharacterTextSplitter=_Client)
+_stub("langchain.schema", Document=_Client)
+# tiktoken needs no stub, modules.chunker falls back to a character estimate without it, and
+# crawl4ai is only imported by the browser scraping modules, which these tests do not load
+
+
+class WordCounter:
+    """Deterministic TokenCounter counting one token per whitespace-separated word."""
+
+    def count(self, text):
+        return len(text.split())
+
+    def split(self, text, max_tokens):
+        words = text.split()
+        return [" ".join(words[i:i + max_tokens]) for i in range(0, len(words), max_tokens)]
+
+
+@pytest.fixture
+def word_counter():
+    return WordCounter()
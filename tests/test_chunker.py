@@ -0,0 +1,43 @@
+from modules.chunker import TokenChunker, TokenCounter, context_window, output_token_budget, input_token_budget
+
+
+def test_short_text_is_one_chunk(word_counter):
+    assert TokenChunker(50, counter=word_counter).split("A short text.") == ["A short text."]
+
+
+def test_chunks_respect_the_budget_and_split_on_headings_first(word_counter):
+    text = "# One\nalpha beta gamma.\n\n# Two\ndelta epsilon zeta.\n\n# Three\neta theta iota."
+    chunks = TokenChunker(8, overlap_tokens=0, counter=word_counter).split(text)
+    assert all(word_counter.count(chunk) <= 8 for chunk in chunks)
+    assert [chunk.strip() for chunk in chunks] == ["# One\nalpha beta gamma.", "# Two\ndelta epsilon zeta.",
+                                                   "# Three\neta theta iota."]
+
+
+def test_long_sentences_are_hard_split(word_counter):
+    chunks = TokenChunker(4, overlap_tokens=0, counter=word_counter).split(" ".join(["word"] * 10))
+    assert [word_counter.count(chunk) for chunk in chunks] == [4, 4, 2]
+
+
+def test_consecutive_chunks_overlap(word_counter):
+    text = " ".join(f"Sentence number {idx}." for idx in range(12))
+    chunks = TokenChunker(12, overlap_tokens=3, counter=word_counter).split(text)
+    assert len(chunks) > 1
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.startswith(previous.split(". ")[-1])
+    assert all(word_counter.count(chunk) <= 12 for chunk in chunks)
+
+
+def test_counter_round_trips_text():
+    counter = TokenCounter()
+    text = "Market size and growth of the analyzed product. " * 20
+    pieces = counter.split(text, 16)
+    assert "".join(pieces) == text
+    assert counter.count(text) > 0
+
+
+def test_token_budgets_follow_the_context_window():
+    assert context_window("llama3-70b-8192") == 8192
+    assert context_window("unknown-model") == 8192
+    assert output_token_budget("llama3-70b-8192", 8192) == 2048
+    assert output_token_budget("llama-3.3-70b-versatile", 4096) == 4096
+    assert input_token_budget("llama3-70b-8192", 8192, 1024) == int((8192 - 2048 - 1024) * 0.9)
@@ -0,0 +1,90 @@
+import pytest
+from modules.crunchbaseExtractor import CrunchbaseExtractor, CrunchbaseProfile, scrape_data_html
+
+ROOT = "https://www.crunchbase.com/organization/acme"
+
+
+def _fields(**fields):
+    items = "".join(f"<li><label-with-info>{label}</label-with-info><field-formatter>{value}</field-formatter></li>"
+                    for label, value in fields.items())
+    return f'<ul class="text_and_value">{items}</ul>'
+
+
+def _page(body):
+    return f'<html><body><h1 class="profile-name">Acme</h1><span class="description">Rockets.</span>{body}</body></html>'
+
+
+@pytest.fixture
+def profile():
+    return CrunchbaseProfile(url=ROOT)
+
+
+def test_section_of_maps_subpages():
+    assert CrunchbaseExtractor.section_of(ROOT) is None
+    assert CrunchbaseExtractor.section_of(ROOT + "/company_financials/") == "financials"
+    assert CrunchbaseExtractor.section_of(ROOT + "/org_similarity_overview") == "similar_companies"
+
+
+def test_root_page_fills_overview_and_keeps_other_fields_as_details(profile):
+    html = _page(_fields(**{"Founded Date": "1999", "Operating Status": "Active", "Total Funding Amount": "$5M"}))
+    assert CrunchbaseExtractor().extract(html, ROOT, profile)
+    assert (profile.overview.title, profile.overview.description) == ("Acme", "Rockets.")
+    assert (profile.overview.founded, profile.overview.operating_status) == ("1999", "Active")
+    assert profile.financials.total_funding is None
+    assert profile.details["Total Funding Amount"] == "$5M"
+
+
+def test_subpages_only_fill_their_own_section(profile):
+    extractor = CrunchbaseExtractor()
+    html = _page(_fields(**{"Total Funding Amount": "$5M", "Founded Date": "1999", "Monthly Visits": "10k"}))
+    assert extractor.extract(html, ROOT + "/company_financials", profile)
+    assert profile.financials.total_funding == "$5M"
+    assert profile.technology.monthly_visits is None
+
+    assert not extractor.extract(_page(_fields(**{"Total Funding Amount": "$9M"})), ROOT + "/technology", profile)
+    assert profile.financials.total_funding == "$5M"
+    assert "technology" in extractor.missing_sections(profile)
+
+
+def test_the_first_subpage_fills_the_overview(profile):
+    extractor = CrunchbaseExtractor()
+    extractor.extract(_page(_fields(**{"Founded Date": "1999", "Founders": "Jane Doe"})), ROOT + "/people", profile)
+    extractor.extract(_page(_fields(**{"Founded Date": "2001", "Operating Status": "Active"})),
+                      ROOT + "/company_financials", profile)
+    assert (profile.overview.founded, profile.overview.founders) == ("1999", "Jane Doe")
+    assert profile.overview.operating_status == "Active"
+
+
+def test_people_and_news(profile):
+    extractor = CrunchbaseExtractor()
+    people = _page('<image-with-fields-card><a href="/person/jane-doe">Jane Doe</a>'
+                   '<field-formatter>Jane Doe</field-formatter><field-formatter>CEO</field-formatter>'
+                   '</image-with-fields-card>')
+    assert extractor.extract(people, ROOT + "/people", profile)
+    assert [(person.name, person.title) for person in profile.people] == [("Jane Doe", "CEO")]
+
+    news = _page('<press-reference><a href="https://news.example.com/acme">Acme raises</a>'
+                 '<span class="date">Jan 1, 2024</span></press-reference>')
+    assert extractor.extract(news, ROOT + "/signals_and_news", profile)
+    assert profile.news[0].model_dump() == {"title": "Acme raises", "url": "https://news.example.com/acme",
+                                            "date": "Jan 1, 2024", "publisher": "news.example.com"}
+
+
+def test_similar_companies_skip_the_profile_and_its_own_tabs(profile):
+    extractor = CrunchbaseExtractor()
+    extractor.extract(_page(""), ROOT, profile)
+    html = _page('<a href="/organization/acme/people">People</a>'
+                 '<a href="/organization/acme/company_financials">Financials</a>'
+                 '<a href="https://www.crunchbase.com/organization/acme">Acme Inc</a>'
+                 '<a href="/organization/beta">Beta</a>'
+                 '<a href="https://www.crunchbase.com/organization/gamma/">Gamma</a>'
+                 '<a href="/organization/gamma/technology">Gamma technology</a>'
+                 '<a href="/organization/delta">Acme</a>')
+    assert extractor.extract(html, ROOT + "/org_similarity_overview", profile)
+    assert profile.similar_companies == ["Beta", "Gamma"]
+
+
+def test_scrape_data_html_keeps_the_legacy_fields():
+    data = scrape_data_html(_page(""))
+    assert data["title"] == "Acme" and data["description"] == "Rockets."
+    assert "operating_status" not in data
@@ -0,0 +1,51 @@
+import numpy as np
+from modules.g2Comparison import G2Comparison, to_number, labelled_values
+
+PAYLOADS = [
+    {"productName": "Jira", "starRating": 4.3, "reviewsCount": "6,000",
+     "ratings": {"5": 60, "4": 40}, "sentiments": [{"name": "Ease of Use", "score": 8}, {"name": "Support", "score": 7}]},
+    {"productName": "Trello", "starRating": "4.5", "reviewsCount": 13000,
+     "ratings": [{"stars": "5", "count": 90}, {"stars": "4", "count": 10}],
+     "sentiments": {"Ease of Use": 9, "Support": 6}},
+    {"productName": "jira ", "starRating": 1.0},
+    {"productName": "Asana", "starRating": None, "sentiments": {"Support": "87%"}},
+]
+
+
+def test_to_number_reads_g2_values():
+    assert to_number("1,234") == 1234.0
+    assert to_number("87%") == 87.0
+    assert to_number(4) == 4.0
+    assert np.isnan(to_number(None)) and np.isnan(to_number(True)) and np.isnan(to_number("n/a"))
+
+
+def test_labelled_values_accepts_both_shapes():
+    assert labelled_values({"5": 3, "nested": {}}) == [("5", 3.0)]
+    assert labelled_values([{"label": "Support", "percentage": "80%"}, {"name": "no value"}, "junk"]) == \
+        [("Support", 80.0)]
+
+
+def test_duplicate_products_are_dropped():
+    comparison = G2Comparison(PAYLOADS)
+    assert comparison.products == ["Jira", "Trello", "Asana"]
+    assert np.allclose(comparison.star_rating, [4.3, 4.5, np.nan], equal_nan=True)
+    assert np.allclose(comparison.reviews_count, [6000, 13000, np.nan], equal_nan=True)
+
+
+def test_columnar_comparisons():
+    comparison = G2Comparison(PAYLOADS)
+    assert comparison.rating_labels == ["5", "4"]
+    assert np.allclose(comparison.rating_distribution()[:2], [[0.6, 0.4], [0.9, 0.1]])
+    assert np.isnan(comparison.rating_distribution()[2]).all()
+
+    assert comparison.sentiment_labels == ["Ease of Use", "Support"]
+    assert np.allclose(comparison.sentiment_deltas()[1], [1, -1])
+    assert comparison.feature_ranks().tolist() == [[2, 2], [1, 3], [3, 1]]
+
+
+def test_to_markdown_renders_every_table():
+    markdown = G2Comparison(PAYLOADS).to_markdown()
+    assert "Analyzed product: Jira; compared with: Trello, Asana." in markdown
+    assert "| Trello | 4.50 | 13000 | +0.20 |" in markdown
+    assert "| Jira | 60.0% | 40.0% |" in markdown
+    assert "| Support | 7 (#2) | 6 (-1, #3) | 87 (+80, #1) |" in markdown
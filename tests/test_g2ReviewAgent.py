@@ -0,0 +1,52 @@
+import json
+import asyncio
+from agents.g2ReviewAgent import project_fields, aproject_fields, G2_FIELDS
+
+PAYLOAD = {
+    "status": "ok",
+    "body": {
+        "productName": "Jira",
+        "starRating": 4.3,
+        "reviewsCount": 6123,
+        "ratings": [{"name": "5 stars", "count": 3000}, {"name": "4 stars", "count": 2000}],
+        "reviews": [{"text": "review " * 50, "nested": {"productName": "not this one"}}] * 200,
+        "sentiments": {"Ease of Use": 8.1, "Support": 7.9},
+        "productDescription": "Plan and track work.",
+    },
+}
+
+
+async def _chunks(data, size, consumed):
+    for start in range(0, len(data), size):
+        consumed.append(start)
+        yield data[start:start + size]
+
+
+def test_project_fields_keeps_only_the_wanted_top_level_fields():
+    projected = project_fields(json.dumps(PAYLOAD).encode())
+    assert list(projected) == [field for field in G2_FIELDS if field in PAYLOAD["body"]]
+    assert projected["productName"] == "Jira"
+    assert projected["ratings"] == PAYLOAD["body"]["ratings"]
+    assert projected["sentiments"] == {"Ease of Use": 8.1, "Support": 7.9}
+    assert "reviews" not in projected
+
+
+def test_project_fields_with_custom_fields_and_prefix():
+    data = json.dumps({"data": {"a": 1, "b": [1, 2], "c": None}}).encode()
+    assert project_fields(data, fields=["c", "a"], prefix="data") == {"c": None, "a": 1}
+
+
+def test_aproject_fields_matches_project_fields():
+    data = json.dumps(PAYLOAD).encode()
+    consumed = []
+    projected = asyncio.run(aproject_fields(_chunks(data, 1024, consumed)))
+    assert projected == project_fields(data)
+
+
+def test_aproject_fields_stops_reading_once_every_field_was_seen():
+    body = {"productName": "Jira", "starRating": 4.3, "reviews": ["review " * 50] * 200}
+    data = json.dumps({"body": body}).encode()
+    consumed = []
+    projected = asyncio.run(aproject_fields(_chunks(data, 512, consumed), fields=["productName", "starRating"]))
+    assert projected == {"productName": "Jira", "starRating": 4.3}
+    assert len(consumed) == 1 < len(data) // 512
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from modules.llm import GroqCompletion
+from modules.llamSummarizer import SummaryGenerator
+
+
+@pytest.fixture
+def generator(tmp_path, word_counter):
+    prompts = tmp_path / "prompts.yml"
+    prompts.write_text("prompts:\n  summarize_text:\n    template: Summarize.\n")
+    content = tmp_path / "page.md"
+    content.write_text("")
+    generator = SummaryGenerator("key", "llama3-70b-8192", "", str(prompts), str(content), chunk_tokens=20,
+                                 chunk_overlap=0)
+    generator.counter = word_counter
+    generator.chunker.counter = word_counter
+    return generator
+
+
+def test_small_summaries_are_packed_greedily(generator):
+    summaries = [" ".join(["word"] * 6)] * 5
+    groups = generator._group_summaries(summaries)
+    assert [generator.counter.count(group) for group in groups] == [12, 12, 6]
+
+
+def test_oversized_summaries_are_cut_so_each_pair_fits(generator):
+    summaries = [" ".join([f"s{idx}"] * 50) for idx in range(5)]
+    groups = generator._group_summaries(summaries)
+    assert len(groups) == 3
+    assert all(generator.counter.count(group) <= generator.chunk_tokens for group in groups)
+    assert groups[0].split("\n")[1].startswith("s1")
+
+
+def test_reduce_prompts_never_exceed_the_chunk_budget(generator, monkeypatch):
+    prompts = []
+
+    async def fake_completion(self, validate=None, use_cache=True):
+        prompts.append(self.user_content)
+        # A model that ignores the requested length and answers at length
+        return " ".join(["summary"] * 40)
+
+    monkeypatch.setattr(GroqCompletion, "acreate_completion", fake_completion)
+    generator.max_reduce_rounds = 3
+    asyncio.run(generator._map_reduce("\n\n".join(" ".join(["text"] * 15) for _ in range(6))))
+    assert len(prompts) > 6
+    assert all(generator.counter.count(prompt) <= generator.chunk_tokens for prompt in prompts)
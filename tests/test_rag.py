@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from modules.rag import (EmbeddingIndex, normalizeEmbeddings, similarity, chunkIds, collectionName,
+                         contextEmbeddingChroma, chromaIndex)
+
+
+def test_normalize_embeddings_stacks_rows_and_keeps_zero_rows():
+    matrix = normalizeEmbeddings([np.array([[3.0, 4.0]]), np.array([[0.0, 0.0]])])
+    assert matrix.shape == (2, 2) and matrix.dtype == np.float32
+    assert np.allclose(matrix, [[0.6, 0.8], [0.0, 0.0]])
+
+
+def test_search_returns_top_k_by_decreasing_similarity():
+    index = EmbeddingIndex(np.eye(4), ["a", "b", "c", "d"])
+    hits = index.search([[0.1, 0.9, 0.5, 0.0], [1.0, 0.0, 0.0, 0.2]], top_k=2)
+    assert [[idx for idx, _ in query_hits] for query_hits in hits] == [[1, 2], [0, 3]]
+    assert hits[0][0][1] > hits[0][1][1]
+    assert index.top_texts([0.0, 0.0, 0.0, 1.0], 1) == ["d"]
+
+
+def test_search_matches_a_full_sort():
+    rng = np.random.default_rng(0)
+    embeddings, query = rng.normal(size=(500, 32)), rng.normal(size=32)
+    index = EmbeddingIndex(embeddings, [str(idx) for idx in range(500)])
+    expected = np.argsort(-(normalizeEmbeddings(embeddings) @ normalizeEmbeddings(query)[0]))[:10]
+    assert [idx for idx, _ in index.search(query, 10)[0]] == expected.tolist()
+
+
+def test_search_handles_small_and_empty_indexes():
+    assert EmbeddingIndex().search([[1.0, 0.0]], 3) == [[]]
+    index = EmbeddingIndex([[1.0, 0.0], [0.0, 1.0]], ["x", "y"])
+    assert len(index.search([1.0, 0.0], 10)[0]) == 2
+    assert index.search([1.0, 0.0], 0) == [[]]
+
+
+def test_add_checks_alignment_and_appends():
+    index = EmbeddingIndex([[1.0, 0.0]], ["x"])
+    index.add([[0.0, 1.0]], ["y"])
+    assert len(index) == 2 and index.top_texts([0.0, 1.0], 1) == ["y"]
+    with pytest.raises(ValueError):
+        index.add([[1.0, 1.0]], ["a", "b"])
+
+
+def test_similarity_formats_the_retrieved_chunks():
+    text = similarity([[0.0, 1.0]], [np.array([[1.0, 0.0]]), np.array([[0.0, 1.0]])], ["first", "second"], 1)
+    assert text == "Text Chunk <1>\nsecond"
+
+
+
+def test_chunk_ids_are_stable_across_url_variants():
+    ids = chunkIds("https://Example.com/page/?utm_source=x", ["one", "two"])
+    assert ids == chunkIds("https://example.com/page", ["one", "two"])
+    assert len(set(ids)) == 2 and all(len(chunk_id) == 32 for chunk_id in ids)
+
+
+def test_collection_name_fits_chroma_rules():
+    assert collectionName("Acme Inc", run="2024/01") == "acme-inc_2024-01"
+    assert collectionName("??") == "company"
+    assert len(collectionName("x" * 100)) == 63
+
+
+class LengthModel:
+    """Embeds a text from its length, enough to store and reload chunks."""
+
+    def encode(self, texts, batch_size=32):
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+@pytest.fixture
+def chroma_client(tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    return chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+
+
+def test_chroma_indexing_is_incremental_and_drops_stale_chunks(chroma_client):
+    source, name = "https://www.example.com/page/", "acme"
+    contextEmbeddingChroma(LengthModel(), ["one", "two"], chroma_client, None, source, name)
+    assert sorted(chromaIndex(chroma_client, name).texts) == ["one", "two"]
+
+    contextEmbeddingChroma(LengthModel(), ["one", "three"], chroma_client, None, source, name)
+    assert sorted(chromaIndex(chroma_client, name).texts) == ["one", "three"]
+    where = {"source": "https://www.example.com/page"}
+    assert sorted(chromaIndex(chroma_client, name, where).texts) == ["one", "three"]
+
+
+def test_chroma_indexing_an_empty_source_deletes_its_chunks(chroma_client):
+    source, name = "https://example.com/page", "acme"
+    contextEmbeddingChroma(LengthModel(), ["one", "two"], chroma_client, None, source, name)
+    contextEmbeddingChroma(LengthModel(), ["other"], chroma_client, None, "https://example.com/other", name)
+
+    assert contextEmbeddingChroma(LengthModel(), [], chroma_client, None, source, name) == []
+    assert chromaIndex(chroma_client, name).texts == ["other"]
@@ -0,0 +1,73 @@
+import asyncio
+import numpy as np
+import pytest
+import modules.sectionedAnalysis as sectioned
+from modules.llm import GroqCompletion
+from modules.sectionedAnalysis import SectionedAnalysis, REPORT_SECTIONS
+
+VOCABULARY = ["overview", "weaknesses", "alternatives", "market"]
+
+
+class KeywordModel:
+    """Embeds a text as the counts of a few keywords, so retrieval is predictable."""
+
+    def encode(self, texts, batch_size=32):
+        return np.array([[text.lower().count(word) + 0.01 for word in VOCABULARY] for text in texts])
+
+
+@pytest.fixture
+def analysis(tmp_path, monkeypatch):
+    prompts = tmp_path / "prompts.yml"
+    prompts.write_text("prompts:\n  business_analysis_section:\n    template: Write the section.\n")
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    (sources / "LLM_Instruction_1_Scrap_1.md").write_text("overview overview\n\nweaknesses weaknesses")
+    (sources / "Crunchbase_Scrap_1.md").write_text("alternatives alternatives\n\nmarket market")
+    (sources / "combinedReport.md").write_text("overview of a previous run")
+
+    monkeypatch.setattr(sectioned, "contextChunks",
+                        lambda text, chunk_size, chunk_overlap: text.split("\n\n"))
+    analysis = SectionedAnalysis("key", "llama3-70b-8192", "business", str(prompts), KeywordModel(), top_k=1)
+    analysis.index_sources(str(sources))
+    return analysis
+
+
+def test_index_sources_chunks_every_source_but_previous_reports(analysis):
+    assert len(analysis.index) == 4
+    assert all(text.startswith("[Source: ") for text in analysis.index.texts)
+    assert not any("combinedReport" in text for text in analysis.index.texts)
+
+
+def test_retrieve_gives_each_section_its_own_chunks(analysis):
+    context = analysis.retrieve("Acme")
+    assert list(context) == [key for key, _, _, _ in REPORT_SECTIONS]
+    assert context["overview"] == ["[Source: LLM_Instruction_1_Scrap_1.md]\noverview overview"]
+    assert context["swot"] == ["[Source: LLM_Instruction_1_Scrap_1.md]\nweaknesses weaknesses"]
+    assert context["competitors"] == ["[Source: Crunchbase_Scrap_1.md]\nalternatives alternatives"]
+    assert context["market_trends"] == ["[Source: Crunchbase_Scrap_1.md]\nmarket market"]
+
+
+def test_agenerate_writes_every_section_and_reports_failures(analysis, monkeypatch):
+    prompts = []
+
+    async def fake_completion(self, validate=None, use_cache=True):
+        prompts.append(self.user_content)
+        if "Section: Competitors" in self.user_content:
+            raise RuntimeError("rate limited")
+        return "Generated."
+
+    monkeypatch.setattr(GroqCompletion, "acreate_completion", fake_completion)
+    report = asyncio.run(analysis.agenerate("Acme"))
+
+    assert len(prompts) == len(REPORT_SECTIONS)
+    assert report.startswith("# Acme Business Analysis")
+    assert report.count("Generated.") == 3
+    assert "## Competitors\n\n_This section could not be generated: rate limited_" in report
+    assert any("Text Chunk <1>\n[Source: LLM_Instruction_1_Scrap_1.md]\noverview" in prompt for prompt in prompts)
+
+
+def test_agenerate_without_sources_returns_none(tmp_path, analysis):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    assert analysis.index_sources(str(empty)) == 0
+    assert asyncio.run(analysis.agenerate("Acme")) is None
@@ -0,0 +1,53 @@
+import json
+import pytest
+from modules.textCombiner import FileReader, TRUNCATION_MARKER
+
+
+@pytest.fixture
+def folder(tmp_path):
+    (tmp_path / "LLM_Instruction_1_Scrap_10.md").write_text("web ten")
+    (tmp_path / "LLM_Instruction_1_Scrap_2.md").write_text("web two")
+    (tmp_path / "Crunchbase_Scrap_1.md").write_text("crunchbase summary")
+    (tmp_path / "conciseG2.json").write_text(json.dumps({"productName": "Acme", "starRating": 4.5}, indent=4))
+    (tmp_path / "notes.md").write_text("other notes")
+    (tmp_path / "combinedReport.md").write_text("previous report")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    return tmp_path
+
+
+def test_sources_are_read_in_priority_and_natural_order(folder, word_counter):
+    reader = FileReader(str(folder), counter=word_counter)
+    assert [name for name, _ in reader.sources()] == [
+        "conciseG2.json", "Crunchbase_Scrap_1.md", "LLM_Instruction_1_Scrap_2.md",
+        "LLM_Instruction_1_Scrap_10.md", "notes.md"]
+
+
+def test_read_files_concatenates_and_compacts_json(folder, word_counter):
+    text = FileReader(str(folder), counter=word_counter).read_files()
+    assert text == ('{"productName":"Acme","starRating":4.5}\ncrunchbase summary\nweb two\nweb ten\n'
+                    'other notes\n')
+
+
+def test_source_tokens_truncate_each_source(folder, word_counter):
+    (folder / "Crunchbase_Scrap_1.md").write_text(" ".join(["fact"] * 20))
+    reader = FileReader(str(folder), source_tokens=6, counter=word_counter)
+    texts = dict(reader.iter_texts())
+    assert texts["Crunchbase_Scrap_1.md"] == "fact fact fact fact fact" + TRUNCATION_MARKER
+    assert reader.truncated == ["Crunchbase_Scrap_1.md"] and reader.skipped == []
+
+
+def test_token_budget_skips_the_lowest_priority_sources(folder, word_counter):
+    (folder / "LLM_Instruction_1_Scrap_2.md").write_text("web two with more words")
+    reader = FileReader(str(folder), token_budget=8, counter=word_counter)
+    texts = list(reader.iter_texts())
+    assert [name for name, _ in texts] == ["conciseG2.json", "Crunchbase_Scrap_1.md", "LLM_Instruction_1_Scrap_2.md"]
+    assert texts[-1][1] == "web two" + TRUNCATION_MARKER
+    assert reader.truncated == ["LLM_Instruction_1_Scrap_2.md"]
+    assert reader.skipped == ["LLM_Instruction_1_Scrap_10.md", "notes.md"]
+
+
+def test_write_to_streams_the_combined_report(folder, word_counter, tmp_path):
+    reader = FileReader(str(folder), counter=word_counter)
+    report = tmp_path / "out.txt"
+    reader.write_to(str(report))
+    assert report.read_text() == FileReader(str(folder), counter=word_counter).read_files()
@@ -0,0 +1,29 @@
+from modules.urlCanonicalizer import canonicalize_url, dedupe_key, UrlDeduper
+
+
+def test_canonicalize_url_normalizes_host_port_query_and_slashes():
+    assert canonicalize_url(" HTTPS://WWW.Example.com:443/Docs/?b=2&utm_source=x&a=1#top ") == \
+        "https://www.example.com/Docs?a=1&b=2"
+    assert canonicalize_url("http://example.com:8080/") == "http://example.com:8080/"
+    assert canonicalize_url("https://example.com/?gclid=1&Ref=abc") == "https://example.com/"
+
+
+def test_canonicalize_url_keeps_content_parameters():
+    assert canonicalize_url("https://example.com/search?q=jira&page=2") == "https://example.com/search?page=2&q=jira"
+
+
+def test_dedupe_key_treats_scheme_and_www_variants_as_one_page():
+    key = dedupe_key("https://example.com/pricing")
+    assert dedupe_key("http://www.example.com/pricing/") == key
+    assert dedupe_key("https://WWW.example.com/pricing?utm_medium=email") == key
+    assert dedupe_key("https://docs.example.com/pricing") != key
+    assert dedupe_key("https://example.com:8443/pricing") != key
+
+
+def test_url_deduper_claims_each_page_once():
+    deduper = UrlDeduper()
+    assert deduper.claim("https://www.example.com/a")
+    assert not deduper.claim("http://example.com/a/")
+    assert deduper.claim("https://example.com/b")
+    assert deduper.duplicates == 1
+    assert deduper.owners[dedupe_key("https://example.com/a")] == "https://www.example.com/a"
@@ -0,0 +1,56 @@
+from modules.validator import (ResultRouter, get_result_router, g2validator, crunchbaseValidator, g2_product_slug,
+                               G2_REVIEWS, CRUNCHBASE_ORGANIZATION, STATIC, BROWSER)
+
+
+def _results(*links):
+    return [{"title": link, "link": link} for link in links]
+
+
+def test_router_dispatches_by_host_and_path():
+    router = get_result_router()
+    assert router.route("https://www.g2.com/products/jira/reviews") == G2_REVIEWS
+    assert router.route("https://www.g2.com/categories/project-management") == BROWSER
+    assert router.route("https://www.crunchbase.com/organization/atlassian/people") == CRUNCHBASE_ORGANIZATION
+    assert router.route("https://uk.linkedin.com/company/atlassian") == BROWSER
+    assert router.route("https://jira.g2-networks.net/") == STATIC
+    assert router.static_fetchable("https://example.com/blog")
+    assert not router.static_fetchable("https://www.capterra.com/p/1/jira")
+
+
+def test_router_keeps_the_order_of_each_group():
+    routed = ResultRouter().classify(_results("https://a.com", "https://www.g2.com/x", "https://b.com"))
+    assert [item["link"] for item in routed[STATIC]] == ["https://a.com", "https://b.com"]
+    assert [item["link"] for item in routed[BROWSER]] == ["https://www.g2.com/x"]
+
+
+def test_custom_routes_take_the_first_match():
+    router = ResultRouter([("example.com", r"^/docs", "docs"), ("example.com", r"", "site")], default="other")
+    assert router.route("https://www.example.com/docs/intro") == "docs"
+    assert router.route("https://example.com/") == "site"
+    assert router.route("https://example.org/docs") == "other"
+
+
+def test_g2validator_keeps_one_canonical_url_per_product():
+    links = g2validator(_results(
+        "https://www.g2.com/products/jira/reviews?page=2",
+        "https://jira.g2-networks.net/",
+        "https://g2.com/products/Jira/reviews/",
+        "https://www.g2.com/products/jira-service-management/reviews",
+        "https://www.g2.com/products/jira/reviews",
+    ))
+    assert links == ["https://www.g2.com/products/jira/reviews",
+                     "https://www.g2.com/products/jira-service-management/reviews"]
+    assert g2_product_slug("https://www.g2.com/products/Trello/reviews") == "trello"
+    assert g2validator(_results("https://example.com/")) == "No valid G2 links found."
+
+
+def test_crunchbase_validator_returns_profile_roots():
+    links = crunchbaseValidator(_results(
+        "https://www.crunchbase.com/organization/atlassian/company_financials",
+        "https://www.crunchbase.com/organization/atlassian",
+        "https://www.crunchbase.com/hub/atlassian-companies",
+        "https://www.crunchbase.com/organization/trello",
+    ))
+    assert links == ["https://www.crunchbase.com/organization/atlassian",
+                     "https://www.crunchbase.com/organization/trello"]
+    assert crunchbaseValidator(_results("https://example.com/")) == "No valid Crunchbase links found."
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from modules.vectorStore import VectorStore
+
+
+def _vectors(count, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_round_trip_finds_each_vector(tmp_path, dtype):
+    vectors = _vectors(200)
+    store = VectorStore(str(tmp_path), dtype=dtype, nlist=4, nprobe=4)
+    store.add([f"id{idx}" for idx in range(200)], vectors, [f"text {idx}" for idx in range(200)],
+              [{"idx": idx} for idx in range(200)])
+    assert store.centroids is not None
+
+    reopened = VectorStore(str(tmp_path))
+    assert reopened.dtype == dtype and len(reopened) == 200
+    hits = reopened.search(vectors[[3, 150]], top_k=2)
+    assert [query_hits[0][0] for query_hits in hits] == ["id3", "id150"]
+    assert hits[0][0][1] == pytest.approx(1.0, abs=0.02)
+    assert hits[0][0][2:] == ("text 3", {"idx": 3})
+
+
+def test_add_replaces_ids_and_keeps_last_duplicate_of_a_batch(tmp_path):
+    vectors = _vectors(3)
+    store = VectorStore(str(tmp_path))
+    store.add(["a", "b"], vectors[:2], ["first a", "b"])
+    store.add(["a", "a"], vectors[1:3], ["second a", "third a"])
+
+    assert len(store) == 2
+    hits = store.search(vectors[2], top_k=3)[0]
+    assert [(item_id, text) for item_id, _, text, _ in hits][0] == ("a", "third a")
+    assert sorted(item_id for item_id, _, _, _ in hits) == ["a", "b"]
+
+
+def test_compact_drops_tombstones_and_keeps_results(tmp_path):
+    vectors = _vectors(200)
+    store = VectorStore(str(tmp_path), dtype="int8", nlist=4, nprobe=4)
+    store.add([f"id{idx}" for idx in range(200)], vectors, [f"text {idx}" for idx in range(200)])
+    store.delete([f"id{idx}" for idx in range(0, 200, 2)])
+    before = store.search(vectors[[1, 51]], top_k=5)
+
+    assert store.compact() == 100
+    assert store._count() == 100 and len(store) == 100
+    assert store.search(vectors[[1, 51]], top_k=5) == before
+    assert store.compact() == 0
+
+    store.add(["id1"], vectors[:1], ["replaced"])
+    assert store.search(vectors[0], top_k=1)[0][0][:1] == ("id1",)
+    assert store.search(vectors[0], top_k=1)[0][0][2] == "replaced"